@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import collections
 import functools
+import itertools
 import logging
 import random
 import secrets
 from argparse import Namespace
 from collections import Counter, deque
-from collections.abc import Collection, MutableSequence
+from array import array
+from collections.abc import Collection, MutableMapping, MutableSequence
 from enum import IntEnum, IntFlag
 from typing import (AbstractSet, Any, Callable, ClassVar, Dict, Iterable, Iterator, List, Mapping, NamedTuple,
                     Optional, Protocol, Set, Tuple, Union, TYPE_CHECKING)
@@ -20,6 +22,7 @@ import Utils
 
 if TYPE_CHECKING:
     from entrance_rando import ERPlacementState
+    from generation_profile import GenerationProfile
     from worlds import AutoWorld
 
 
@@ -67,6 +70,10 @@ class MultiWorld():
     is_race: bool = False
     precollected_items: Dict[int, List[Item]]
     state: CollectionState
+    sphere_index: Optional[SphereIndex] = None
+    """Spheres of the filled multiworld, shared by the stages after fill. See build_sphere_index."""
+    profile: Optional[GenerationProfile] = None
+    """Timings of this generation, if it is being profiled. See generation_profile."""
 
     plando_options: PlandoOptions
     early_items: Dict[int, Dict[str, int]]
@@ -76,6 +83,11 @@ class MultiWorld():
     progression_balancing: Dict[int, Options.ProgressionBalancing]
     completion_condition: Dict[int, Callable[[CollectionState], bool]]
     indirect_connections: Dict[Region, Set[Entrance]]
+    # player -> item name -> Entrances whose access rule read that item name, see World.incremental_reachability.
+    # Entrances whose reads could not be attributed to item names of their player are kept under None instead.
+    entrance_item_dependencies: Dict[int, Dict[Optional[str], Set[Entrance]]]
+    # game -> dense indices of item names, see World.indexed_item_counts and get_item_index
+    item_indexes: Dict[str, ItemIndex]
     exclude_locations: Dict[int, Options.ExcludeLocations]
     priority_locations: Dict[int, Options.PriorityLocations]
     start_inventory: Dict[int, Options.StartInventory]
@@ -159,6 +171,8 @@ class MultiWorld():
         self.early_items = {player: {} for player in self.player_ids}
         self.local_early_items = {player: {} for player in self.player_ids}
         self.indirect_connections = {}
+        self.entrance_item_dependencies = {}
+        self.item_indexes = {}
         self.start_inventory_from_pool: Dict[int, Options.StartInventoryPool] = {}
 
         for player in range(1, players + 1):
@@ -385,7 +399,17 @@ class MultiWorld():
     def player_ids(self) -> Tuple[int, ...]:
         return tuple(range(1, self.players + 1))
 
-    @Utils.cache_self1
+    def get_item_index(self, game: str) -> ItemIndex:
+        """Returns the item index of game, which assigns indices to the names of events and other unknown items on first
+        use. Scoped to this multiworld, so those names don't add up across generations."""
+        item_index = self.item_indexes.get(game, None)
+        if item_index is None:
+            from worlds import AutoWorld
+
+            item_names = AutoWorld.AutoWorldRegister.world_types[game].item_name_to_id
+            item_index = self.item_indexes[game] = ItemIndex(item_names)
+        return item_index
+
     def get_game_players(self, game_name: str) -> Tuple[int, ...]:
         return tuple(player for player in self.player_ids if self.game[player] == game_name)
 
@@ -477,6 +501,7 @@ class MultiWorld():
     def push_precollected(self, item: Item):
         self.precollected_items[item.player].append(item)
         self.state.collect(item, True)
+        self.sphere_index = None
 
     def push_item(self, location: Location, item: Item, collect: bool = True):
         location.item = item
@@ -558,12 +583,9 @@ class MultiWorld():
                           and location.item.advancement and location not in state.locations_checked}
 
         while prog_locations:
-            sphere: Set[Location] = set()
             # build up spheres of collection radius.
             # Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
-            for location in prog_locations:
-                if location.can_reach(state):
-                    sphere.add(location)
+            sphere = state.reachable_locations(prog_locations)
 
             if not sphere:
                 # ran out of places and did not finish yet, quit
@@ -578,6 +600,14 @@ class MultiWorld():
 
         return False
 
+    def build_sphere_index(self) -> SphereIndex:
+        """Sweeps the multiworld once and keeps the result as sphere_index, so get_spheres, get_sendable_spheres,
+        fulfills_accessibility and Spoiler.create_playthrough reuse it instead of sweeping again.
+        Placing an item at any location and push_precollected discard it, so it is only worth building once the
+        multiworld is filled."""
+        self.sphere_index = SphereIndex(self)
+        return self.sphere_index
+
     def get_spheres(self) -> Iterator[Set[Location]]:
         """
         yields a set of locations for each logical sphere
@@ -586,15 +616,16 @@ class MultiWorld():
         locations is followed by an empty set, and then a set of all of the
         unreachable locations.
         """
+        sphere_index = self.sphere_index
+        if sphere_index:
+            yield from sphere_index.get_filled_spheres()
+            return
+
         state = CollectionState(self)
         locations = set(self.get_filled_locations())
 
         while locations:
-            sphere: Set[Location] = set()
-
-            for location in locations:
-                if location.can_reach(state):
-                    sphere.add(location)
+            sphere = state.reachable_locations(locations)
             yield sphere
             if not sphere:
                 if locations:
@@ -621,6 +652,20 @@ class MultiWorld():
             else:
                 events.add(location)
 
+        sphere_index = self.sphere_index
+        sphere_numbers = sphere_index.sphere_numbers if sphere_index else None
+        sphere_number = 1
+
+        def can_reach(location: Location) -> bool:
+            if sphere_numbers is None:
+                return location.can_reach(state)
+            # state holds at least everything collected by the sphere index before the same sphere number,
+            # so locations of earlier index spheres are reachable and locations the index could not reach are not.
+            index_sphere_number = sphere_numbers.get(location, None)
+            if index_sphere_number is None:
+                return False
+            return index_sphere_number <= sphere_number or location.can_reach(state)
+
         while locations:
             sphere: Set[Location] = set()
 
@@ -629,13 +674,13 @@ class MultiWorld():
             while done_events:
                 done_events = set()
                 for event in events:
-                    if event.can_reach(state):
+                    if can_reach(event):
                         state.collect(event.item, True, event)
                         done_events.add(event)
                 events -= done_events
 
             for location in locations:
-                if location.can_reach(state):
+                if can_reach(location):
                     sphere.add(location)
 
             yield sphere
@@ -647,9 +692,12 @@ class MultiWorld():
             for location in sphere:
                 state.collect(location.item, True, location)
             locations -= sphere
+            sphere_number += 1
 
     def fulfills_accessibility(self, state: Optional[CollectionState] = None):
         """Check if accessibility rules are fulfilled with current or supplied state."""
+        # without a supplied state, the result follows from the spheres of the sphere index
+        sphere_index = self.sphere_index if state is None else None
         if not state:
             state = CollectionState(self)
         players: Dict[str, Set[int]] = {
@@ -679,6 +727,18 @@ class MultiWorld():
                 return False  # still locations required to be collected
             return True
 
+        if sphere_index:
+            # the sweep below ends with the same state and unreachable locations as the sphere index, as it only skips
+            # collecting items that are not advancement
+            beatable_fulfilled = self.has_beaten_game(sphere_index.states[-1])
+            locations = [location for location in sphere_index.unreachable if location_relevant(location)]
+            if all_done():
+                return True
+            if locations:
+                logging.warning(f"Could not access required locations for accessibility check."
+                                f" Missing: {locations}")
+            return False
+
         locations = [location for location in self.get_locations() if location_relevant(location)]
 
         while locations:
@@ -706,11 +766,252 @@ class MultiWorld():
         return False
 
 
+class SphereIndex:
+    """Logical spheres of all locations of a MultiWorld, from a single sweep collecting every item."""
+    spheres: List[Set[Location]]
+    """Locations reachable in each sphere, including unfilled locations"""
+    states: List[CollectionState]
+    """states[n] is the state before spheres[n], states[-1] the state after collecting every reachable item.
+    These are shared, so copy them before collecting into them."""
+    sphere_numbers: Dict[Location, int]
+    """Location -> number of its sphere, starting at 1"""
+    unreachable: Set[Location]
+
+    def __init__(self, multiworld: MultiWorld) -> None:
+        state = CollectionState(multiworld)
+        locations = set(multiworld.get_locations())
+        self.spheres = []
+        self.states = [state.copy()]
+        self.sphere_numbers = {}
+
+        while locations:
+            sphere = state.reachable_locations(locations)
+            if not sphere:
+                break
+            for location in sphere:
+                if location.item:
+                    state.collect(location.item, True, location)
+                self.sphere_numbers[location] = len(self.spheres) + 1
+            locations -= sphere
+            self.spheres.append(sphere)
+            self.states.append(state.copy())
+
+        self.unreachable = locations
+
+    def get_filled_spheres(self) -> Iterator[Set[Location]]:
+        """Same as MultiWorld.get_spheres"""
+        for sphere in self.spheres:
+            filled = {location for location in sphere if location.item}
+            # a sphere without items doesn't change state, so nothing can follow it
+            if not filled:
+                break
+            yield filled
+        unreachable = {location for location in self.unreachable if location.item}
+        if unreachable:
+            yield set()
+            yield unreachable
+
+    def get_progression_spheres(self) -> Tuple[List[Set[Location]], List[Optional[CollectionState]], Set[Location]]:
+        """Returns the spheres of locations with advancement items, the state before each of them,
+        with None for the starting state, and the unreachable locations with advancement items."""
+        spheres: List[Set[Location]] = []
+        for sphere in self.spheres:
+            progression = {location for location in sphere if location.advancement}
+            if not progression:
+                break
+            spheres.append(progression)
+        states: List[Optional[CollectionState]] = [None]
+        states.extend(self.states[1:len(spheres) + 1])
+        return spheres, states, {location for location in self.unreachable if location.advancement}
+
+
 PathValue = Tuple[str, Optional["PathValue"]]
 
 
+class RuleReads:
+    """What access rules read from a CollectionState while it records them, see World.incremental_reachability."""
+    __slots__ = ("items", "regions", "complete")
+    items: Set[Tuple[int, str]]
+    """player and item name of each item read through a TrackingCounter"""
+    regions: Set[Region]
+    """Regions that were found to be unreachable"""
+    complete: bool
+    """False if prog_items were read as a whole, for example by iterating, so the read item names are not known"""
+
+    def __init__(self) -> None:
+        self.items = set()
+        self.regions = set()
+        self.complete = True
+
+    def clear(self) -> None:
+        self.items.clear()
+        self.regions.clear()
+        self.complete = True
+
+
+class ReadRecorder:
+    """Holds the RuleReads a CollectionState currently records into. Shared by the state and its TrackingCounters,
+    so reads of any player's items are recorded."""
+    __slots__ = ("reads",)
+    reads: Optional[RuleReads]
+
+    def __init__(self) -> None:
+        self.reads = None
+
+
+class TrackingCounter(Counter):
+    """Counter of item names that records which names changed and, while its recorder has reads, which names were
+    read. Used by CollectionState for worlds with incremental reachability."""
+    changed: Set[str]
+    player: int
+    recorder: ReadRecorder
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.changed = set()
+        self.player = 0
+        self.recorder = ReadRecorder()
+        super().__init__(*args, **kwargs)
+
+    def __getitem__(self, item: str) -> int:
+        reads = self.recorder.reads
+        if reads is not None:
+            reads.items.add((self.player, item))
+        return super().__getitem__(item)
+
+    def get(self, item: str, default: Any = None) -> Any:
+        reads = self.recorder.reads
+        if reads is not None:
+            reads.items.add((self.player, item))
+        return super().get(item, default)
+
+    def __contains__(self, item: object) -> bool:
+        reads = self.recorder.reads
+        if reads is not None:
+            reads.items.add((self.player, item))
+        return super().__contains__(item)
+
+    def _read_all(self) -> None:
+        reads = self.recorder.reads
+        if reads is not None:
+            reads.complete = False
+
+    def __iter__(self) -> Iterator[str]:
+        self._read_all()
+        return super().__iter__()
+
+    def __len__(self) -> int:
+        self._read_all()
+        return super().__len__()
+
+    def keys(self):
+        self._read_all()
+        return super().keys()
+
+    def values(self):
+        self._read_all()
+        return super().values()
+
+    def items(self):
+        self._read_all()
+        return super().items()
+
+    def __setitem__(self, item: str, value: int) -> None:
+        self.changed.add(item)
+        super().__setitem__(item, value)
+
+    def __delitem__(self, item: str) -> None:
+        self.changed.add(item)
+        super().__delitem__(item)
+
+    def copy(self) -> TrackingCounter:
+        ret = TrackingCounter(self)
+        ret.changed = self.changed.copy()
+        ret.player = self.player
+        ret.recorder = self.recorder
+        return ret
+
+
+class ItemIndex:
+    """Dense integer indices for the item names of a game in a MultiWorld, used by ItemCounts.
+    Names that are not known at class registration, such as events, get the next free index on first use."""
+    names: List[str]
+    indices: Dict[str, int]
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self.names = list(names)
+        self.indices = {name: index for index, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def get(self, name: str) -> int:
+        """Returns the index of name, assigning a new one if name is not indexed yet."""
+        index = self.indices.get(name, None)
+        if index is None:
+            index = self.indices[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+
+class ItemCounts(MutableMapping):
+    """Counter-like mapping of item name to count, stored in an array indexed by an ItemIndex.
+    Missing names count as 0 and names with a count of 0 are not part of iteration, same as a Counter after deletion.
+    Used by CollectionState for worlds with indexed_item_counts."""
+    __slots__ = ("item_index", "counts")
+
+    item_index: ItemIndex
+    counts: array
+
+    def __init__(self, item_index: ItemIndex, counts: Optional[array] = None) -> None:
+        self.item_index = item_index
+        self.counts = array("i", [0]) * len(item_index) if counts is None else counts
+
+    def __getitem__(self, item: str) -> int:
+        index = self.item_index.indices.get(item, None)
+        if index is None or index >= len(self.counts):
+            return 0
+        return self.counts[index]
+
+    def __setitem__(self, item: str, value: int) -> None:
+        index = self.item_index.get(item)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend(array("i", [0]) * (len(self.item_index) - len(counts)))
+        counts[index] = value
+
+    def __delitem__(self, item: str) -> None:
+        index = self.item_index.indices.get(item, None)
+        if index is not None and index < len(self.counts):
+            self.counts[index] = 0
+
+    def __contains__(self, item: object) -> bool:
+        return bool(self[item]) if isinstance(item, str) else False
+
+    def __iter__(self) -> Iterator[str]:
+        names = self.item_index.names
+        return (names[index] for index, count in enumerate(self.counts) if count)
+
+    def __len__(self) -> int:
+        return len(self.counts) - self.counts.count(0)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self.items())})"
+
+    def total(self) -> int:
+        return sum(self.counts)
+
+    def update(self, other: Union[Mapping[str, int], Iterable[str]] = (), /, **kwargs: int) -> None:
+        """Adds counts like Counter.update, instead of replacing them like dict.update."""
+        counts = other.items() if isinstance(other, Mapping) else ((name, 1) for name in other)
+        for name, count in itertools.chain(counts, kwargs.items()):
+            self[name] += count
+
+    def copy(self) -> ItemCounts:
+        return ItemCounts(self.item_index, self.counts[:])
+
+
 class CollectionState():
-    prog_items: Dict[int, Counter[str]]
+    prog_items: Dict[int, Union[Counter[str], ItemCounts]]
     multiworld: MultiWorld
     reachable_regions: Dict[int, Set[Region]]
     blocked_connections: Dict[int, Set[Entrance]]
@@ -719,11 +1020,18 @@ class CollectionState():
     locations_checked: Set[Location]
     stale: Dict[int, bool]
     allow_partial_entrances: bool
+    # players whose reachable_regions and blocked_connections are not shared with a copy
+    _owned_players: Set[int]
+    # records what access rules read, for incremental reachability
+    _read_recorder: ReadRecorder
     additional_init_functions: List[Callable[[CollectionState, MultiWorld], None]] = []
     additional_copy_functions: List[Callable[[CollectionState, CollectionState], CollectionState]] = []
 
     def __init__(self, parent: MultiWorld, allow_partial_entrances: bool = False):
-        self.prog_items = {player: Counter() for player in parent.get_all_ids()}
+        self._read_recorder = ReadRecorder()
+        self.prog_items = {player: self._create_prog_items(parent, player, allow_partial_entrances,
+                                                           self._read_recorder)
+                           for player in parent.get_all_ids()}
         self.multiworld = parent
         self.reachable_regions = {player: set() for player in parent.get_all_ids()}
         self.blocked_connections = {player: set() for player in parent.get_all_ids()}
@@ -732,26 +1040,64 @@ class CollectionState():
         self.locations_checked = set()
         self.stale = {player: True for player in parent.get_all_ids()}
         self.allow_partial_entrances = allow_partial_entrances
+        self._owned_players = set(parent.get_all_ids())
         for function in self.additional_init_functions:
             function(self, parent)
         for items in parent.precollected_items.values():
             for item in items:
                 self.collect(item, True)
 
+    @staticmethod
+    def _create_prog_items(multiworld: MultiWorld, player: int, allow_partial_entrances: bool,
+                           recorder: ReadRecorder) -> Union[Counter[str], ItemCounts]:
+        world: Optional[AutoWorld.World] = multiworld.worlds.get(player, None)
+        if world:
+            if world.indexed_item_counts:
+                return ItemCounts(world.item_index)
+            if world.incremental_reachability and world.explicit_indirect_conditions and not allow_partial_entrances:
+                from worlds import AutoWorld
+                # overrides may change state other than prog_items, like LogicMixin attributes
+                if type(world).collect is AutoWorld.World.collect and type(world).remove is AutoWorld.World.remove:
+                    counter = TrackingCounter()
+                    counter.player = player
+                    counter.recorder = recorder
+                    return counter
+        return Counter()
+
+    def unshare_player(self, player: int) -> None:
+        """Copies reachable_regions and blocked_connections of player if they are still shared with a copy of this
+        state. Has to be called before modifying those directly, instead of through update_reachable_regions."""
+        if player not in self._owned_players:
+            self.reachable_regions[player] = self.reachable_regions[player].copy()
+            self.blocked_connections[player] = self.blocked_connections[player].copy()
+            self._owned_players.add(player)
+
+    def _unshared_region_sets(self, player: int) -> Tuple[Set[Region], Set[Entrance]]:
+        self.unshare_player(player)
+        return self.reachable_regions[player], self.blocked_connections[player]
+
     def update_reachable_regions(self, player: int):
         self.stale[player] = False
         world: AutoWorld.World = self.multiworld.worlds[player]
         reachable_regions = self.reachable_regions[player]
-        queue = deque(self.blocked_connections[player])
+        player_prog_items = self.prog_items[player]
+        incremental = isinstance(player_prog_items, TrackingCounter)
+        if incremental:
+            queue = deque(self._get_dependent_blocked_connections(player, player_prog_items))
+        else:
+            queue = deque(self.blocked_connections[player])
         start: Region = world.get_region(world.origin_region_name)
 
         # init on first call - this can't be done on construction since the regions don't exist yet
         if start not in reachable_regions:
+            reachable_regions, blocked_connections = self._unshared_region_sets(player)
             reachable_regions.add(start)
-            self.blocked_connections[player].update(start.exits)
+            blocked_connections.update(start.exits)
             queue.extend(start.exits)
 
-        if world.explicit_indirect_conditions:
+        if incremental:
+            self._update_reachable_regions_incremental(player, queue)
+        elif world.explicit_indirect_conditions:
             self._update_reachable_regions_explicit_indirect_conditions(player, queue)
         else:
             self._update_reachable_regions_auto_indirect_conditions(player, queue)
@@ -764,11 +1110,15 @@ class CollectionState():
             connection = queue.popleft()
             new_region = connection.connected_region
             if new_region in reachable_regions:
-                blocked_connections.remove(connection)
+                # while shared with a copy, leave the cleanup to a later update
+                if player in self._owned_players:
+                    blocked_connections.remove(connection)
             elif connection.can_reach(self):
                 if self.allow_partial_entrances and not new_region:
                     continue
                 assert new_region, f"tried to search through an Entrance \"{connection}\" with no connected Region"
+                if player not in self._owned_players:
+                    reachable_regions, blocked_connections = self._unshared_region_sets(player)
                 reachable_regions.add(new_region)
                 blocked_connections.remove(connection)
                 blocked_connections.update(new_region.exits)
@@ -780,6 +1130,64 @@ class CollectionState():
                     if new_entrance in blocked_connections and new_entrance not in queue:
                         queue.append(new_entrance)
 
+    def _get_dependent_blocked_connections(self, player: int, player_prog_items: TrackingCounter) -> List[Entrance]:
+        """Returns the blocked connections whose access rules read an item name that changed since the last update."""
+        changed = player_prog_items.changed
+        if not changed:
+            return []
+        dependencies = self.multiworld.entrance_item_dependencies.get(player, {})
+        blocked_connections = self.blocked_connections[player]
+        retest: Set[Entrance] = set(dependencies.get(None, ()))
+        for item_name in changed:
+            retest.update(dependencies.get(item_name, ()))
+        changed.clear()
+        return [connection for connection in retest if connection in blocked_connections]
+
+    def _update_reachable_regions_incremental(self, player: int, queue: deque):
+        reachable_regions = self.reachable_regions[player]
+        blocked_connections = self.blocked_connections[player]
+        dependencies = self.multiworld.entrance_item_dependencies.setdefault(player, {})
+        recorder = self._read_recorder
+        # this may run while an access rule is being recorded, which only depends on the resulting regions
+        outer_reads = recorder.reads
+        reads = RuleReads()
+        try:
+            # run BFS on the given connections, and record which item names keep the blocked ones blocked
+            while queue:
+                connection = queue.popleft()
+                new_region = connection.connected_region
+                if new_region in reachable_regions:
+                    if player in self._owned_players:
+                        blocked_connections.remove(connection)
+                    continue
+                reads.clear()
+                recorder.reads = reads
+                reachable = connection.can_reach(self)
+                recorder.reads = outer_reads
+                if reachable:
+                    assert new_region, f"tried to search through an Entrance \"{connection}\" with no connected Region"
+                    if player not in self._owned_players:
+                        reachable_regions, blocked_connections = self._unshared_region_sets(player)
+                    reachable_regions.add(new_region)
+                    blocked_connections.remove(connection)
+                    blocked_connections.update(new_region.exits)
+                    queue.extend(new_region.exits)
+                    self.path[new_region] = (new_region.name, self.path.get(connection, None))
+
+                    # Retry connections if the new region can unblock them
+                    for new_entrance in self.multiworld.indirect_connections.get(new_region, set()):
+                        if new_entrance in blocked_connections and new_entrance not in queue:
+                            queue.append(new_entrance)
+                elif reads.complete and all(read_player == player for read_player, _ in reads.items):
+                    for _, item_name in reads.items:
+                        dependencies.setdefault(item_name, set()).add(connection)
+                else:
+                    # the reads can't be tracked by item name, so re-test it after every change, as without
+                    # incremental reachability
+                    dependencies.setdefault(None, set()).add(connection)
+        finally:
+            recorder.reads = outer_reads
+
     def _update_reachable_regions_auto_indirect_conditions(self, player: int, queue: deque):
         reachable_regions = self.reachable_regions[player]
         blocked_connections = self.blocked_connections[player]
@@ -791,11 +1199,14 @@ class CollectionState():
                 connection = queue.popleft()
                 new_region = connection.connected_region
                 if new_region in reachable_regions:
-                    blocked_connections.remove(connection)
+                    if player in self._owned_players:
+                        blocked_connections.remove(connection)
                 elif connection.can_reach(self):
                     if self.allow_partial_entrances and not new_region:
                         continue
                     assert new_region, f"tried to search through an Entrance \"{connection}\" with no connected Region"
+                    if player not in self._owned_players:
+                        reachable_regions, blocked_connections = self._unshared_region_sets(player)
                     reachable_regions.add(new_region)
                     blocked_connections.remove(connection)
                     blocked_connections.update(new_region.exits)
@@ -806,16 +1217,27 @@ class CollectionState():
             queue.extend(blocked_connections)
 
     def copy(self) -> CollectionState:
-        ret = CollectionState(self.multiworld)
+        ret = CollectionState.__new__(CollectionState)
+        ret.multiworld = self.multiworld
+        # prog_items, path, advancements and locations_checked are modified directly by World implementations and
+        # callers, so they are always copied.
+        # Region sets are shared until either state updates them, see unshare_player.
+        ret._read_recorder = ReadRecorder()
         ret.prog_items = {player: counter.copy() for player, counter in self.prog_items.items()}
-        ret.reachable_regions = {player: region_set.copy() for player, region_set in
-                                 self.reachable_regions.items()}
-        ret.blocked_connections = {player: entrance_set.copy() for player, entrance_set in
-                                   self.blocked_connections.items()}
+        for counter in ret.prog_items.values():
+            if isinstance(counter, TrackingCounter):
+                counter.recorder = ret._read_recorder
+        ret.reachable_regions = self.reachable_regions.copy()
+        ret.blocked_connections = self.blocked_connections.copy()
         ret.advancements = self.advancements.copy()
         ret.path = self.path.copy()
         ret.locations_checked = self.locations_checked.copy()
+        ret.stale = {player: True for player in self.stale}
         ret.allow_partial_entrances = self.allow_partial_entrances
+        ret._owned_players = set()
+        self._owned_players = set()
+        for function in self.additional_init_functions:
+            function(ret, self.multiworld)
         for function in self.additional_copy_functions:
             ret = function(self, ret)
         return ret
@@ -836,6 +1258,19 @@ class CollectionState():
                 return self.can_reach_region(spot, player)
         return spot.can_reach(self)
 
+    def reachable_locations(self, locations: Iterable[Location]) -> Set[Location]:
+        """Returns the locations that can be reached in this state, same as filtering them with can_reach.
+        Checks each parent Region once and skips the access rules of all locations in unreachable Regions."""
+        locations_by_region: Dict[Region, List[Location]] = {}
+        for location in locations:
+            locations_by_region.setdefault(location.parent_region, []).append(location)
+        reachable: Set[Location] = set()
+        for region, region_locations in locations_by_region.items():
+            assert region, f"called can_reach on a Location \"{region_locations[0]}\" with no parent_region"
+            if region.can_reach(self):
+                reachable.update(location for location in region_locations if location.access_rule(self))
+        return reachable
+
     def can_reach_location(self, spot: str, player: int) -> bool:
         return self.multiworld.get_location(spot, player).can_reach(self)
 
@@ -853,18 +1288,76 @@ class CollectionState():
     def sweep_for_advancements(self, locations: Optional[Iterable[Location]] = None) -> None:
         if locations is None:
             locations = self.multiworld.get_filled_locations()
-        reachable_advancements = True
         # since the loop has a good chance to run more than once, only filter the advancements once
-        locations = {location for location in locations if location.advancement and location not in self.advancements}
+        pending = {location for location in locations if location.advancement and location not in self.advancements}
+        # locations that can't be reached yet are only checked again once something they depend on changed:
+        # their parent region became reachable, or, for worlds with incremental reachability, an item name or region
+        # their access rule read changed. Everything else is checked again on each pass.
+        waiting_for_region: Dict[Region, Set[Location]] = {}
+        waiting_for_items: Dict[int, Dict[str, Set[Location]]] = {}
+
+        while pending:
+            reachable_advancements: Set[Location] = set()
+            retry: Set[Location] = set()
+            locations_by_region: Dict[Region, List[Location]] = {}
+            for location in pending:
+                locations_by_region.setdefault(location.parent_region, []).append(location)
+            for region, region_locations in locations_by_region.items():
+                assert region, f"called can_reach on a Location \"{region_locations[0]}\" with no parent_region"
+                if not region.can_reach(self):
+                    waiting_for_region.setdefault(region, set()).update(region_locations)
+                    continue
+                for location in region_locations:
+                    reads = self._read_access_rule(location)
+                    if reads is True:
+                        reachable_advancements.add(location)
+                    elif reads is None:
+                        retry.add(location)
+                    else:
+                        for player, item_name in reads.items:
+                            waiting_for_items.setdefault(player, {}).setdefault(item_name, set()).add(location)
+                        for read_region in reads.regions:
+                            waiting_for_region.setdefault(read_region, set()).add(location)
 
-        while reachable_advancements:
-            reachable_advancements = {location for location in locations if location.can_reach(self)}
-            locations -= reachable_advancements
+            if not reachable_advancements:
+                break
             for advancement in reachable_advancements:
                 self.advancements.add(advancement)
                 assert isinstance(advancement.item, Item), "tried to collect Event with no Item"
                 self.collect(advancement.item, True, advancement)
 
+            pending = retry
+            if any(not isinstance(self.prog_items[advancement.item.player], TrackingCounter)
+                   for advancement in reachable_advancements):
+                # changes to the state of these players are not tracked, and access rules may read them
+                for player_waiting in waiting_for_items.values():
+                    for waiting in player_waiting.values():
+                        pending.update(waiting)
+                waiting_for_items.clear()
+            for player, player_waiting in waiting_for_items.items():
+                # update_reachable_regions clears changed, so this has to be read before checking any region
+                for item_name in self.prog_items[player].changed:
+                    pending.update(player_waiting.pop(item_name, ()))
+            for region in [region for region in waiting_for_region if region.can_reach(self)]:
+                pending.update(waiting_for_region.pop(region))
+            # a location waiting on several item names may have been collected through another one already
+            pending -= self.advancements
+
+    def _read_access_rule(self, location: Location) -> Union[bool, None, RuleReads]:
+        """Evaluates the access rule of location. Returns True if it passed. If it failed, returns what it read, if the
+        location's world has incremental reachability and all reads were recorded, otherwise None."""
+        if not isinstance(self.prog_items[location.player], TrackingCounter):
+            return True if location.access_rule(self) else None
+        recorder = self._read_recorder
+        outer_reads = recorder.reads
+        reads = recorder.reads = RuleReads()
+        try:
+            if location.access_rule(self):
+                return True
+        finally:
+            recorder.reads = outer_reads
+        return reads if reads.complete and (reads.items or reads.regions) else None
+
     # item name related
     def has(self, item: str, player: int, count: int = 1) -> bool:
         return self.prog_items[player][item] >= count
@@ -907,6 +1400,52 @@ class CollectionState():
     def count(self, item: str, player: int) -> int:
         return self.prog_items[player][item]
 
+    # index based variants of the above, for worlds with indexed_item_counts. Indices come from World.item_index and
+    # should be looked up once, when creating the rule, see worlds.generic.Rules.has_rule for example.
+    # prog_items that are not ItemCounts, like for states created without indexed_item_counts, are looked up by name.
+    def has_index(self, item_index: int, player: int, count: int = 1) -> bool:
+        try:
+            return self.prog_items[player].counts[item_index] >= count
+        except IndexError:  # indexed after the counts were created, so never collected
+            return count <= 0
+        except AttributeError:
+            return self.prog_items[player][self._get_index_name(item_index, player)] >= count
+
+    def has_all_indices(self, item_indices: Iterable[int], player: int) -> bool:
+        """Returns True if each item index of item_indices is in state at least once."""
+        player_prog_items = self.prog_items[player]
+        if not isinstance(player_prog_items, ItemCounts):
+            return all(player_prog_items[self._get_index_name(item_index, player)] for item_index in item_indices)
+        counts = player_prog_items.counts
+        size = len(counts)
+        for item_index in item_indices:
+            if item_index >= size or not counts[item_index]:
+                return False
+        return True
+
+    def has_any_index(self, item_indices: Iterable[int], player: int) -> bool:
+        """Returns True if at least one item index of item_indices is in state at least once."""
+        player_prog_items = self.prog_items[player]
+        if not isinstance(player_prog_items, ItemCounts):
+            return any(player_prog_items[self._get_index_name(item_index, player)] for item_index in item_indices)
+        counts = player_prog_items.counts
+        size = len(counts)
+        for item_index in item_indices:
+            if item_index < size and counts[item_index]:
+                return True
+        return False
+
+    def count_index(self, item_index: int, player: int) -> int:
+        try:
+            return self.prog_items[player].counts[item_index]
+        except IndexError:
+            return 0
+        except AttributeError:
+            return self.prog_items[player][self._get_index_name(item_index, player)]
+
+    def _get_index_name(self, item_index: int, player: int) -> str:
+        return self.multiworld.get_item_index(self.multiworld.game[player]).names[item_index]
+
     def has_from_list(self, items: Iterable[str], player: int, count: int) -> bool:
         """Returns True if the state contains at least `count` items matching any of the item names from a list."""
         found: int = 0
@@ -1005,6 +1544,7 @@ class CollectionState():
             # invalidate caches, nothing can be trusted anymore now
             self.reachable_regions[item.player] = set()
             self.blocked_connections[item.player] = set()
+            self._owned_players.add(item.player)
             self.stale[item.player] = True
 
 
@@ -1174,7 +1714,13 @@ class Region:
     def can_reach(self, state: CollectionState) -> bool:
         if state.stale[self.player]:
             state.update_reachable_regions(self.player)
-        return self in state.reachable_regions[self.player]
+        if self in state.reachable_regions[self.player]:
+            return True
+        # access rules being recorded depend on this region becoming reachable
+        reads = state._read_recorder.reads
+        if reads is not None:
+            reads.regions.add(self)
+        return False
 
     @property
     def hint_text(self) -> str:
@@ -1276,7 +1822,7 @@ class Location:
     always_allow: Callable[[CollectionState, Item], bool] = staticmethod(lambda state, item: False)
     access_rule: Callable[[CollectionState], bool] = staticmethod(lambda state: True)
     item_rule: Callable[[Item], bool] = staticmethod(lambda item: True)
-    item: Optional[Item] = None
+    _item: Optional[Item] = None
 
     def __init__(self, player: int, name: str = '', address: Optional[int] = None, parent: Optional[Region] = None):
         self.player = player
@@ -1284,6 +1830,18 @@ class Location:
         self.address = address
         self.parent_region = parent
 
+    @property
+    def item(self) -> Optional[Item]:
+        return self._item
+
+    @item.setter
+    def item(self, item: Optional[Item]) -> None:
+        self._item = item
+        # any placed, removed or moved item can change the spheres
+        multiworld = self.parent_region.multiworld if self.parent_region else None
+        if multiworld and multiworld.sphere_index:
+            multiworld.sphere_index = None
+
     def can_fill(self, state: CollectionState, item: Item, check_access: bool = True) -> bool:
         return ((
             self.always_allow(state, item)
@@ -1473,46 +2031,56 @@ class Spoiler:
         from itertools import chain
         # get locations containing progress items
         multiworld = self.multiworld
-        prog_locations = {location for location in multiworld.get_filled_locations() if location.item.advancement}
-        state_cache: List[Optional[CollectionState]] = [None]
-        collection_spheres: List[Set[Location]] = []
-        state = CollectionState(multiworld)
-        sphere_candidates = set(prog_locations)
-        logging.debug('Building up collection spheres.')
-        while sphere_candidates:
-
-            # build up spheres of collection radius.
-            # Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
-
-            sphere = {location for location in sphere_candidates if state.can_reach(location)}
-
-            for location in sphere:
-                state.collect(location.item, True, location)
+        sphere_index = multiworld.sphere_index
+        if sphere_index:
+            # culling below temporarily removes items, which discards the index, its spheres are taken before that
+            collection_spheres, state_cache, sphere_candidates = sphere_index.get_progression_spheres()
+        else:
+            prog_locations = {location for location in multiworld.get_filled_locations()
+                              if location.item.advancement}
+            state_cache: List[Optional[CollectionState]] = [None]
+            collection_spheres: List[Set[Location]] = []
+            state = CollectionState(multiworld)
+            sphere_candidates = set(prog_locations)
+            logging.debug('Building up collection spheres.')
+            while sphere_candidates:
+
+                # build up spheres of collection radius.
+                # Everything in each sphere is independent from each other in dependencies and only depends on lower
+                # spheres
+
+                sphere = state.reachable_locations(sphere_candidates)
+                if not sphere:
+                    break
 
-            sphere_candidates -= sphere
-            collection_spheres.append(sphere)
-            state_cache.append(state.copy())
+                for location in sphere:
+                    state.collect(location.item, True, location)
 
-            logging.debug('Calculated sphere %i, containing %i of %i progress items.', len(collection_spheres),
-                          len(sphere),
-                          len(prog_locations))
-            if not sphere:
-                logging.debug('The following items could not be reached: %s', ['%s (Player %d) at %s (Player %d)' % (
-                    location.item.name, location.item.player, location.name, location.player) for location in
-                                                                               sphere_candidates])
-                if any([multiworld.worlds[location.item.player].options.accessibility != 'minimal' for location in sphere_candidates]):
-                    raise RuntimeError(f'Not all progression items reachable ({sphere_candidates}). '
-                                       f'Something went terribly wrong here.')
-                else:
-                    self.unreachables = sphere_candidates
-                    break
+                sphere_candidates -= sphere
+                collection_spheres.append(sphere)
+                state_cache.append(state.copy())
+
+                logging.debug('Calculated sphere %i, containing %i of %i progress items.', len(collection_spheres),
+                              len(sphere),
+                              len(prog_locations))
+
+        if sphere_candidates:
+            logging.debug('The following items could not be reached: %s', ['%s (Player %d) at %s (Player %d)' % (
+                location.item.name, location.item.player, location.name, location.player) for location in
+                                                                           sphere_candidates])
+            if any([multiworld.worlds[location.item.player].options.accessibility != 'minimal' for location in sphere_candidates]):
+                raise RuntimeError(f'Not all progression items reachable ({sphere_candidates}). '
+                                   f'Something went terribly wrong here.')
+            else:
+                self.unreachables = sphere_candidates
 
         # in the second phase, we cull each sphere such that the game is still beatable,
         # reducing each range of influence to the bare minimum required inside it
         restore_later: Dict[Location, Item] = {}
         for num, sphere in reversed(tuple(enumerate(collection_spheres))):
             to_delete: Set[Location] = set()
-            for location in sphere:
+            # in a fixed order, as which of several interchangeable items is kept depends on the order they're checked
+            for location in sorted(sphere):
                 # we remove the item at location and check if game is still beatable
                 logging.debug('Checking if %s (Player %d) is required to beat the game.', location.item.name,
                               location.item.player)
@@ -1556,7 +2124,7 @@ class Spoiler:
         state = CollectionState(multiworld)
         collection_spheres = []
         while required_locations:
-            sphere = set(filter(state.can_reach, required_locations))
+            sphere = state.reachable_locations(required_locations)
 
             for location in sphere:
                 state.collect(location.item, True, location)
@@ -7,6 +7,7 @@ from collections import Counter, deque
 from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld
 from Options import Accessibility
 
+from generation_profile import enter_phase
 from worlds.AutoWorld import call_all
 from worlds.generic.Rules import add_item_rule
 
@@ -33,11 +34,38 @@ def sweep_from_pool(base_state: CollectionState, itempool: typing.Sequence[Item]
     return new_state
 
 
+def _find_fillable_location(locations: typing.List[Location], state: CollectionState, item: Item,
+                            check_access: bool, single_player_placement: bool,
+                            reachable: typing.Dict[Location, bool]) -> typing.Optional[int]:
+    """
+    Returns the index of the first location in locations that can be filled with item, like the search in
+    fill_restrictive, but only evaluates the access rule of each location once while reachable is kept.
+
+    :param reachable: Location -> reachability in state, filled in as locations are checked.
+    Has to be cleared whenever state changes.
+    """
+    for i, location in enumerate(locations):
+        if single_player_placement and location.player != item.player:
+            continue
+        if check_access:
+            location_reachable = reachable.get(location, None)
+            if location_reachable is None:
+                location_reachable = reachable[location] = location.can_reach(state)
+            if not location_reachable:
+                # only always_allow can still accept an item in an unreachable location
+                if location.always_allow is not Location.always_allow and location.can_fill(state, item, True):
+                    return i
+                continue
+        if location.can_fill(state, item, False):
+            return i
+    return None
+
+
 def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locations: typing.List[Location],
                      item_pool: typing.List[Item], single_player_placement: bool = False, lock: bool = False,
                      swap: bool = True, on_place: typing.Optional[typing.Callable[[Location], None]] = None,
                      allow_partial: bool = False, allow_excluded: bool = False, one_item_per_player: bool = True,
-                     name: str = "Unknown") -> None:
+                     name: str = "Unknown", fast_fill: bool = False) -> None:
     """
     :param multiworld: Multiworld to be filled.
     :param base_state: State assumed before fill.
@@ -50,6 +78,9 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
     :param allow_partial: only place what is possible. Remaining items will be in the item_pool list.
     :param allow_excluded: if true and placement fails, it is re-attempted while ignoring excluded on Locations
     :param name: name of this fill step for progress logging purposes
+    :param fast_fill: if true, reachability of locations is only checked once per maximum exploration state and then
+    reused for all items placed with that state, skipping unreachable locations for the following items.
+    Placements may differ from a regular fill, but are still valid.
     """
     unplaced_items: typing.List[Item] = []
     placements: typing.List[Location] = []
@@ -62,6 +93,8 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
     # for progress logging
     total = min(len(item_pool), len(locations))
     placed = 0
+    # reachability of locations in the current maximum_exploration_state, for fast_fill
+    reachable_locations: typing.Dict[Location, bool] = {}
 
     while any(reachable_items.values()) and locations:
         if one_item_per_player:
@@ -85,6 +118,7 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             if single_player_placement else None)
 
         has_beaten_game = multiworld.has_beaten_game(maximum_exploration_state)
+        reachable_locations.clear()
 
         while items_to_place:
             # if we have run out of locations to fill,break out of this loop
@@ -103,15 +137,22 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             else:
                 perform_access_check = True
 
-            for i, location in enumerate(locations):
-                if (not single_player_placement or location.player == item_to_place.player) \
-                        and location.can_fill(maximum_exploration_state, item_to_place, perform_access_check):
-                    # popping by index is faster than removing by content,
-                    spot_to_fill = locations.pop(i)
-                    # skipping a scan for the element
-                    break
-
+            if fast_fill:
+                spot_index = _find_fillable_location(locations, maximum_exploration_state, item_to_place,
+                                                     perform_access_check, single_player_placement,
+                                                     reachable_locations)
+                if spot_index is not None:
+                    spot_to_fill = locations.pop(spot_index)
             else:
+                for i, location in enumerate(locations):
+                    if (not single_player_placement or location.player == item_to_place.player) \
+                            and location.can_fill(maximum_exploration_state, item_to_place, perform_access_check):
+                        # popping by index is faster than removing by content,
+                        spot_to_fill = locations.pop(i)
+                        # skipping a scan for the element
+                        break
+
+            if spot_to_fill is None:
                 # we filled all reachable spots.
                 if swap:
                     # try swapping this item with previously placed items in a safe way then in an unsafe way
@@ -208,7 +249,7 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             for location in excluded_locations:
                 location.progress_type = location.progress_type.DEFAULT
             fill_restrictive(multiworld, base_state, excluded_locations, unplaced_items, single_player_placement, lock,
-                             swap, on_place, allow_partial, False)
+                             swap, on_place, allow_partial, False, fast_fill=fast_fill)
             for location in excluded_locations:
                 if not location.item:
                     location.progress_type = location.progress_type.EXCLUDED
@@ -456,7 +497,8 @@ def distribute_early_items(multiworld: MultiWorld,
 
 
 def distribute_items_restrictive(multiworld: MultiWorld,
-                                 panic_method: typing.Literal["swap", "raise", "start_inventory"] = "swap") -> None:
+                                 panic_method: typing.Literal["swap", "raise", "start_inventory"] = "swap",
+                                 fast_fill: bool = False) -> None:
     fill_locations = sorted(multiworld.get_unfilled_locations())
     multiworld.random.shuffle(fill_locations)
     # get items to distribute
@@ -498,31 +540,36 @@ def distribute_items_restrictive(multiworld: MultiWorld,
 
     single_player = multiworld.players == 1 and not multiworld.groups
 
+    enter_phase(multiworld, "priority")
     if prioritylocations:
         # "priority fill"
         fill_restrictive(multiworld, multiworld.state, prioritylocations, progitempool,
                          single_player_placement=single_player, swap=False, on_place=mark_for_locking,
-                         name="Priority", one_item_per_player=True, allow_partial=True)
+                         name="Priority", one_item_per_player=True, allow_partial=True, fast_fill=fast_fill)
 
         if prioritylocations:
             # retry with one_item_per_player off because some priority fills can fail to fill with that optimization
             fill_restrictive(multiworld, multiworld.state, prioritylocations, progitempool,
                             single_player_placement=single_player, swap=False, on_place=mark_for_locking,
-                            name="Priority Retry", one_item_per_player=False)
+                            name="Priority Retry", one_item_per_player=False, fast_fill=fast_fill)
         accessibility_corrections(multiworld, multiworld.state, prioritylocations, progitempool)
         defaultlocations = prioritylocations + defaultlocations
 
+    enter_phase(multiworld, "progression")
     if progitempool:
         # "advancement/progression fill"
         if panic_method == "swap":
             fill_restrictive(multiworld, multiworld.state, defaultlocations, progitempool, swap=True,
-                             name="Progression", single_player_placement=single_player)
+                             name="Progression", single_player_placement=single_player,
+                             fast_fill=fast_fill)
         elif panic_method == "raise":
             fill_restrictive(multiworld, multiworld.state, defaultlocations, progitempool, swap=False,
-                             name="Progression", single_player_placement=single_player)
+                             name="Progression", single_player_placement=single_player,
+                             fast_fill=fast_fill)
         elif panic_method == "start_inventory":
             fill_restrictive(multiworld, multiworld.state, defaultlocations, progitempool, swap=False,
-                             allow_partial=True, name="Progression", single_player_placement=single_player)
+                             allow_partial=True, name="Progression", single_player_placement=single_player,
+                             fast_fill=fast_fill)
             if progitempool:
                 for item in progitempool:
                     logging.debug(f"Moved {item} to start_inventory to prevent fill failure.")
@@ -548,6 +595,7 @@ def distribute_items_restrictive(multiworld: MultiWorld,
             location.locked = True
     del mark_for_locking, lock_later
 
+    enter_phase(multiworld, "remaining")
     inaccessible_location_rules(multiworld, multiworld.state, defaultlocations)
 
     remaining_fill(multiworld, excludedlocations, filleritempool, "Remaining Excluded",
@@ -700,7 +748,7 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
 
         def get_sphere_locations(sphere_state: CollectionState,
                                  locations: typing.Set[Location]) -> typing.Set[Location]:
-            return {loc for loc in locations if sphere_state.can_reach(loc)}
+            return sphere_state.reachable_locations(locations)
 
         def item_percentage(player: int, num: int) -> float:
             return num / total_locations_count[player]
@@ -13,6 +13,7 @@ import worlds
 from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld, Region
 from Fill import FillError, balance_multiworld_progression, distribute_items_restrictive, distribute_planned, \
     flood_items
+from generation_profile import GenerationProfile, enter_phase
 from Options import StartInventoryPool
 from Utils import __version__, output_path, version_tuple, get_settings
 from settings import get_settings
@@ -23,6 +24,18 @@ __all__ = ["main"]
 
 
 def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = None):
+    if not args.profile_report:
+        return _main(args, seed, baked_server_options)
+
+    with GenerationProfile() as profile:
+        multiworld = _main(args, seed, baked_server_options, profile)
+    profile.write(args.profile_report, multiworld)
+    logging.info(f"Wrote generation profile to {args.profile_report}")
+    return multiworld
+
+
+def _main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = None,
+          profile: Optional[GenerationProfile] = None):
     if not baked_server_options:
         baked_server_options = get_settings().server_options.as_dict()
     assert isinstance(baked_server_options, dict)
@@ -33,6 +46,7 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     start = time.perf_counter()
     # initialize the multiworld
     multiworld = MultiWorld(args.multi)
+    multiworld.profile = profile
 
     logger = logging.getLogger()
     multiworld.set_seed(seed, args.race, str(args.outputname) if args.outputname else None)
@@ -192,6 +206,9 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     if any(multiworld.item_links.values()):
         multiworld._all_state = None
 
+    enter_phase(multiworld, "plando")
+    if profile:
+        profile.start_rule_timing(multiworld)
     logger.info("Running Item Plando.")
 
     distribute_planned(multiworld)
@@ -200,20 +217,28 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
 
     AutoWorld.call_all(multiworld, "pre_fill")
 
+    enter_phase(multiworld, "fill")
     logger.info(f'Filling the multiworld with {len(multiworld.itempool)} items.')
 
     if multiworld.algorithm == 'flood':
         flood_items(multiworld)  # different algo, biased towards early game progress items
     elif multiworld.algorithm == 'balanced':
-        distribute_items_restrictive(multiworld, get_settings().generator.panic_method)
+        distribute_items_restrictive(multiworld, get_settings().generator.panic_method,
+                                     get_settings().generator.fast_fill)
 
+    enter_phase(multiworld, "post_fill")
     AutoWorld.call_all(multiworld, 'post_fill')
 
+    enter_phase(multiworld, "balancing")
     if multiworld.players > 1 and not args.skip_prog_balancing:
         balance_multiworld_progression(multiworld)
     else:
         logger.info("Progression balancing skipped.")
 
+    enter_phase(multiworld, "output")
+    if profile:
+        profile.stop_rule_timing()
+
     # we're about to output using multithreading, so we're removing the global random state to prevent accidental use
     multiworld.random.passthrough = False
 
@@ -222,6 +247,8 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
         return multiworld
 
     logger.info(f'Beginning output...')
+    # spheres are final from here on, share them between accessibility check, multidata and spoiler
+    multiworld.build_sphere_index()
     outfilebase = 'AP_' + multiworld.seed_name
 
     output = tempfile.TemporaryDirectory()
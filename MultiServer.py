@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import bisect
 import collections
+import concurrent.futures
 import contextlib
 import copy
 import datetime
@@ -13,6 +15,7 @@ import itertools
 import logging
 import math
 import operator
+import os
 import pickle
 import random
 import shlex
@@ -111,6 +114,8 @@ modify_functions = {
     "pop": pop_from_container,
     "update": update_dict,
 }
+# modify functions that change the value they are given, instead of returning a new one
+in_place_modify_functions = {"remove", "pop", "update"}
 
 
 def get_saving_second(seed_name: str, interval: int = 60) -> int:
@@ -119,6 +124,105 @@ def get_saving_second(seed_name: str, interval: int = 60) -> int:
     return int(hashlib.sha256(seed_name.encode()).hexdigest(), 16) % interval
 
 
+class SavedState(typing.NamedTuple):
+    """What was last written of the save data entries that are saved incrementally, see Context.get_save_delta."""
+    received_items: typing.Dict[typing.Tuple[int, int, bool], int] = {}
+    """number of items per received_items list"""
+    location_checks: typing.Dict[team_slot, int] = {}
+    """number of checked locations per slot, they are only ever added to"""
+    hints: typing.Dict[team_slot, typing.FrozenSet[Hint]] = {}
+
+    @classmethod
+    def of(cls, ctx: Context) -> SavedState:
+        return cls({key: len(items) for key, items in list(ctx.received_items.items())},
+                   {key: len(locations) for key, locations in list(ctx.location_checks.items())},
+                   {key: frozenset(hints) for key, hints in list(ctx.hints.items())})
+
+
+def apply_save_delta(savedata: dict, delta: dict) -> None:
+    """Updates save data, as returned by Context.get_save, with a delta returned by Context.get_save_delta."""
+    for key, value in delta.items():
+        if key == "received_items":
+            received_items = savedata.setdefault(key, {})
+            for items_key, (start, items) in value.items():
+                received_items.setdefault(items_key, [])[start:start + len(items)] = items
+        elif key == "location_checks":
+            location_checks = savedata.setdefault(key, {})
+            for slot_key, locations in value.items():
+                location_checks[slot_key] = location_checks.get(slot_key, set()) | locations
+        elif key in ("hints", "stored_data", "stored_data_versions"):
+            savedata.setdefault(key, {}).update(value)
+        else:
+            savedata[key] = value
+
+
+UNKNOWN_ITEM_NAME = "Unknown item (ID:{})"
+UNKNOWN_LOCATION_NAME = "Unknown location (ID:{})"
+
+
+def build_name_tables(game_package: typing.Dict[str, typing.Any],
+                      archipelago_package: typing.Dict[str, typing.Any]) \
+        -> typing.Tuple[Utils.NameTable, Utils.NameTable]:
+    """Returns the item and location names by id of a game's data package, including those of Archipelago."""
+    item_names = {item_id: item_name for item_name, item_id in game_package["item_name_to_id"].items()}
+    location_names = {location_id: location_name
+                      for location_name, location_id in game_package["location_name_to_id"].items()}
+    item_names.update((item_id, item_name)
+                      for item_name, item_id in archipelago_package.get("item_name_to_id", {}).items())
+    location_names.update((location_id, location_name)
+                          for location_name, location_id in archipelago_package.get("location_name_to_id", {}).items())
+    return (Utils.NameTable.build(item_names, UNKNOWN_ITEM_NAME),
+            Utils.NameTable.build(location_names, UNKNOWN_LOCATION_NAME))
+
+
+class ReceivedItemsCache:
+    """Encoded items of ReceivedItems packets that start at index 0, per team, slot and items handling, so that
+    clients (re)connecting all at once, like after a room restart, don't encode the same items over and over.
+    Entries are extended by the items received since they were last used, and the least recently used entries are
+    dropped once more than max_size characters are cached."""
+    max_size: int
+    size: int
+    """characters currently cached"""
+    entries: collections.OrderedDict[typing.Tuple[int, int, bool, bool],
+                                     typing.Tuple[typing.List[NetworkItem], typing.List[NetworkItem], int, str]]
+    """(team, slot, remote_items, remote_start_inventory) ->
+    (start inventory, received items, number of items encoded, encoded items), least recently used first"""
+
+    def __init__(self, max_size: int = 64 * 1024 * 1024) -> None:
+        self.max_size = max_size
+        self.size = 0
+        self.entries = collections.OrderedDict()
+
+    def get_msg(self, ctx: Context, client: Client) -> typing.Tuple[typing.Optional[str], int]:
+        """Returns the encoded ReceivedItems message with all items of client, or None if there are none,
+        and the number of items."""
+        start_inventory = get_start_inventory(ctx, client.slot, client.remote_start_inventory)
+        items = get_received_items(ctx, client.team, client.slot, client.remote_items)
+        count = len(start_inventory) + len(items)
+        if not count:
+            return None, 0
+        key = client.team, client.slot, client.remote_items, client.remote_start_inventory
+        entry = self.entries.pop(key, None)
+        if entry:
+            self.size -= len(entry[3])
+        # received items are only ever appended to, but their lists are replaced when a save is loaded.
+        # Without remote start inventory, get_start_inventory returns a new empty list each time.
+        if entry and (entry[0] is start_inventory or not (entry[0] or start_inventory)) and entry[1] is items \
+                and entry[2] <= count:
+            encoded_count, encoded = entry[2:]
+        else:
+            encoded_count, encoded = 0, ""
+        if encoded_count < count:
+            new_items = start_inventory[encoded_count:] + items[max(0, encoded_count - len(start_inventory)):]
+            new_encoded = ctx.dumper(new_items)[1:-1]
+            encoded = f"{encoded},{new_encoded}" if encoded else new_encoded
+        self.entries[key] = start_inventory, items, count, encoded
+        self.size += len(encoded)
+        while self.size > self.max_size:
+            self.size -= len(self.entries.popitem(last=False)[1][3])
+        return f'[{{"cmd":"ReceivedItems","index":0,"items":[{encoded}]}}]', count
+
+
 class Client(Endpoint):
     version = Version(0, 0, 0)
     tags: typing.List[str]
@@ -137,6 +241,8 @@ class Client(Endpoint):
         self.tags = []
         self.messageprocessor = client_message_processor(ctx, self)
         self.ctx = weakref.ref(ctx)
+        self.outgoing: typing.List[str] = []
+        self.outgoing_sent: typing.Optional[asyncio.Future[bool]] = None
 
     @property
     def items_handling(self):
@@ -185,21 +291,41 @@ class Context:
     groups: typing.Dict[int, typing.Set[int]]
     save_version = 2
     stored_data: typing.Dict[str, object]
+    stored_data_keys: typing.List[str]
+    """keys of stored_data in sorted order, for prefix queries"""
+    stored_data_versions: typing.Dict[str, int]
+    """version of the value of each key of stored_data, 0 for keys last set before there were versions"""
+    stored_data_version: int
+    """last version given to a value, versions only ever increase, also across restarts"""
     read_data: typing.Dict[str, object]
     stored_data_notification_clients: typing.Dict[str, typing.Set[Client]]
+    stored_data_prefix_notification_clients: typing.Dict[str, typing.Set[Client]]
     slot_info: typing.Dict[int, NetworkSlot]
     generator_version = Version(0, 0, 0)
     checksums: typing.Dict[str, str]
-    item_names: typing.Dict[str, typing.Dict[int, str]]
+    item_names: typing.Dict[str, typing.Mapping[int, str]]
     item_name_groups: typing.Dict[str, typing.Dict[str, typing.Set[str]]]
-    location_names: typing.Dict[str, typing.Dict[int, str]]
+    location_names: typing.Dict[str, typing.Mapping[int, str]]
     location_name_groups: typing.Dict[str, typing.Dict[str, typing.Set[str]]]
-    all_item_and_group_names: typing.Dict[str, typing.Set[str]]
-    all_location_and_group_names: typing.Dict[str, typing.Set[str]]
+    all_item_and_group_names: typing.Dict[str, Utils.FuzzyIndex]
+    all_location_and_group_names: typing.Dict[str, Utils.FuzzyIndex]
+    item_name_indexes: typing.Dict[str, Utils.FuzzyIndex]
+    location_name_indexes: typing.Dict[str, Utils.FuzzyIndex]
     non_hintable_names: typing.Dict[str, typing.AbstractSet[str]]
     spheres: typing.List[typing.Dict[int, typing.Set[int]]]
     """ each sphere is { player: { location_id, ... } } """
+    location_spheres: typing.Dict[int, typing.Dict[int, int]]
+    """ { player: { location_id: index of its sphere, ... } } """
     logger: logging.Logger
+    max_outgoing_size: int = 64 * 1024 * 1024
+    """characters of messages that may be waiting to be sent to a client, before it gets disconnected for falling
+    behind. Includes the messages that were sent, but not yet written to the network."""
+    outgoing_clients: typing.Dict[Client, None]
+    """clients with queued messages, in the order they were queued"""
+    received_items_cache: ReceivedItemsCache
+    worker_pool: typing.Optional[concurrent.futures.Executor] = None
+    """runs CPU heavy parts of commands, like name matching, outside the event loop. State is only changed on the loop.
+    None to run them on the loop."""
 
     def __init__(self, host: str, port: int, server_password: str, password: str, location_check_points: int,
                  hint_cost: int, item_cheat: bool, release_mode: str = "disabled", collect_mode="disabled",
@@ -216,6 +342,11 @@ class Context:
         self.data_filename = None
         self.save_filename = None
         self.saving = False
+        self.saved_state = SavedState()
+        self.stored_data_changed: typing.Set[str] = set()
+        self.journal_generation = 0
+        self.snapshot_size = 0
+        self.journal_size = 0
         self.player_names: typing.Dict[team_slot, str] = {}
         self.player_name_lookup: typing.Dict[str, team_slot] = {}
         self.connect_names = {}  # names of slots clients can connect to
@@ -227,6 +358,7 @@ class Context:
         self.server = None
         self.countdown_timer = 0
         self.received_items = {}
+        self.received_items_cache = ReceivedItemsCache()
         self.start_inventory = {}
         self.name_aliases: typing.Dict[team_slot, str] = {}
         self.location_checks = collections.defaultdict(set)
@@ -234,6 +366,8 @@ class Context:
         self.location_check_points = location_check_points
         self.hints_used = collections.defaultdict(int)
         self.hints: typing.Dict[team_slot, typing.Set[Hint]] = collections.defaultdict(set)
+        # (team, finding player, location) -> latest version of the hint for that location
+        self.hint_index: typing.Dict[typing.Tuple[int, int, int], Hint] = {}
         self.release_mode: str = release_mode
         self.remaining_mode: str = remaining_mode
         self.collect_mode: str = collect_mode
@@ -260,9 +394,16 @@ class Context:
         self.group_collected: typing.Dict[int, typing.Set[int]] = {}
         self.random = random.Random()
         self.stored_data = {}
+        self.stored_data_keys = []
+        self.stored_data_versions = {}
+        # versions given out before a restart may not have been saved, so start above any of them
+        self.stored_data_version = time.time_ns() // 1000
         self.stored_data_notification_clients = collections.defaultdict(weakref.WeakSet)
+        self.stored_data_prefix_notification_clients = collections.defaultdict(weakref.WeakSet)
         self.read_data = {}
         self.spheres = []
+        self.location_spheres = {}
+        self.outgoing_clients = {}
 
         # init empty to satisfy linter, I suppose
         self.gamespackage = {}
@@ -271,10 +412,10 @@ class Context:
         self.location_name_groups = {}
         self.all_item_and_group_names = {}
         self.all_location_and_group_names = {}
-        self.item_names = collections.defaultdict(
-            lambda: Utils.KeyedDefaultDict(lambda code: f'Unknown item (ID:{code})'))
-        self.location_names = collections.defaultdict(
-            lambda: Utils.KeyedDefaultDict(lambda code: f'Unknown location (ID:{code})'))
+        self.item_name_indexes = {}
+        self.location_name_indexes = {}
+        self.item_names = collections.defaultdict(lambda: Utils.NameTable.build({}, UNKNOWN_ITEM_NAME))
+        self.location_names = collections.defaultdict(lambda: Utils.NameTable.build({}, UNKNOWN_LOCATION_NAME))
         self.non_hintable_names = collections.defaultdict(frozenset)
 
         self._load_game_data()
@@ -300,21 +441,20 @@ class Context:
         for game_name, game_package in self.gamespackage.items():
             if "checksum" in game_package:
                 self.checksums[game_name] = game_package["checksum"]
-            for item_name, item_id in game_package["item_name_to_id"].items():
-                self.item_names[game_name][item_id] = item_name
-            for location_name, location_id in game_package["location_name_to_id"].items():
-                self.location_names[game_name][location_id] = location_name
+            self.item_names[game_name], self.location_names[game_name] = self.get_name_tables(game_name)
+            item_names = frozenset(game_package["item_name_to_id"])
+            location_names = frozenset(game_package["location_name_to_id"])
+            self.item_name_indexes[game_name] = Utils.FuzzyIndex(item_names)
+            self.location_name_indexes[game_name] = Utils.FuzzyIndex(location_names)
             self.all_item_and_group_names[game_name] = \
-                set(game_package["item_name_to_id"]) | set(self.item_name_groups[game_name])
+                Utils.FuzzyIndex(item_names | frozenset(self.item_name_groups[game_name]))
             self.all_location_and_group_names[game_name] = \
-                set(game_package["location_name_to_id"]) | set(self.location_name_groups.get(game_name, []))
+                Utils.FuzzyIndex(location_names | frozenset(self.location_name_groups.get(game_name, [])))
 
-        archipelago_item_names = self.item_names["Archipelago"]
-        archipelago_location_names = self.location_names["Archipelago"]
-        for game in [game_name for game_name in self.gamespackage if game_name != "Archipelago"]:
-            # Add Archipelago items and locations to each data package.
-            self.item_names[game].update(archipelago_item_names)
-            self.location_names[game].update(archipelago_location_names)
+    def get_name_tables(self, game: str) -> typing.Tuple[Utils.NameTable, Utils.NameTable]:
+        """Returns the item and location names by id of game, which include those of Archipelago."""
+        archipelago_package = self.gamespackage.get("Archipelago", {}) if game != "Archipelago" else {}
+        return build_name_tables(self.gamespackage[game], archipelago_package)
 
     def item_names_for_game(self, game: str) -> typing.Optional[typing.Dict[str, int]]:
         return self.gamespackage[game]["item_name_to_id"] if game in self.gamespackage else None
@@ -323,49 +463,84 @@ class Context:
         return self.gamespackage[game]["location_name_to_id"] if game in self.gamespackage else None
 
     # General networking
-    async def send_msgs(self, endpoint: Endpoint, msgs: typing.Iterable[dict]) -> bool:
+    def queue_encoded_msgs(self, endpoint: Client, msg: str) -> bool:
+        """Queues encoded messages to be sent to endpoint. All messages queued for a client during the same event loop
+        iteration are sent together in one frame, in the order they were queued."""
         if not endpoint.socket or not endpoint.socket.open:
             return False
-        msg = self.dumper(msgs)
-        try:
-            await endpoint.socket.send(msg)
-        except websockets.ConnectionClosed:
-            self.logger.exception(f"Exception during send_msgs, could not send {msg}")
-            await self.disconnect(endpoint)
+        if not self.outgoing_clients:
+            asyncio.get_running_loop().call_soon(self._send_outgoing)
+        endpoint.outgoing.append(msg)
+        self.outgoing_clients[endpoint] = None
+        return True
+
+    def queue_msgs(self, endpoint: Client, msgs: typing.Iterable[dict]) -> bool:
+        if not endpoint.socket or not endpoint.socket.open:
             return False
-        else:
-            if self.log_network:
-                self.logger.info(f"Outgoing message: {msg}")
+        return self.queue_encoded_msgs(endpoint, self.dumper(msgs))
+
+    def _send_outgoing(self) -> None:
+        clients, self.outgoing_clients = self.outgoing_clients, {}
+        for client in clients:
+            sent, client.outgoing_sent = client.outgoing_sent, None
+            try:
+                result = self._send_outgoing_to(client)
+            except Exception as e:
+                # only this client's messages are lost, the other clients still get theirs
+                self.logger.exception(e)
+                result = False
+            if sent:
+                sent.set_result(result)
+
+    def _send_outgoing_to(self, client: Client) -> bool:
+        msgs, client.outgoing = [msg for msg in client.outgoing if msg != "[]"], []
+        if not client.socket.open:
+            return False  # the connection handler disconnects the client
+        if not msgs:
             return True
+        # each message is a list of commands, so they can be merged into one list
+        msg = msgs[0] if len(msgs) == 1 else f"[{','.join(msg[1:-1] for msg in msgs)}]"
+        if client.socket.transport.get_write_buffer_size() + len(msg) > self.max_outgoing_size:
+            self.logger.warning(f"Disconnecting client at {client.socket.remote_address}, "
+                                f"as it fell too far behind receiving messages.")
+            async_start(client.socket.close(1008, "Too many messages waiting to be received."))
+            return False
+        # websockets.broadcast writes without waiting, which keeps the order of messages to each client
+        websockets.broadcast((client.socket,), msg)
+        if self.log_network:
+            self.logger.info(f"Outgoing message: {msg}")
+        return True
 
-    async def send_encoded_msgs(self, endpoint: Endpoint, msg: str) -> bool:
-        if not endpoint.socket or not endpoint.socket.open:
+    async def send_msgs(self, endpoint: Endpoint, msgs: typing.Iterable[dict]) -> bool:
+        """Queues msgs like queue_msgs and waits until they were written.
+        Returns False if they could not be, as the connection is closed or too far behind."""
+        if not self.queue_msgs(endpoint, msgs):
             return False
-        try:
-            await endpoint.socket.send(msg)
-        except websockets.ConnectionClosed:
-            self.logger.exception("Exception during send_encoded_msgs")
-            await self.disconnect(endpoint)
+        return await self._wait_sent(endpoint)
+
+    async def send_encoded_msgs(self, endpoint: Endpoint, msg: str) -> bool:
+        """Queues msg like queue_encoded_msgs and waits until it was written.
+        Returns False if it could not be, as the connection is closed or too far behind."""
+        if not self.queue_encoded_msgs(endpoint, msg):
             return False
-        else:
-            if self.log_network:
-                self.logger.info(f"Outgoing message: {msg}")
-            return True
+        return await self._wait_sent(endpoint)
+
+    async def _wait_sent(self, endpoint: Client) -> bool:
+        """Waits for the next _send_outgoing to endpoint and returns if it wrote the queued messages."""
+        if not endpoint.outgoing_sent:
+            endpoint.outgoing_sent = asyncio.get_running_loop().create_future()
+        return await endpoint.outgoing_sent
 
     async def broadcast_send_encoded_msgs(self, endpoints: typing.Iterable[Endpoint], msg: str) -> bool:
-        sockets = []
+        """Queues msg for all endpoints and waits until it was written. Returns False if it could not be to all."""
+        results = await asyncio.gather(*(self.send_encoded_msgs(endpoint, msg) for endpoint in endpoints))
+        return all(results)
+
+    def broadcast_encoded(self, endpoints: typing.Iterable[Client], msg: str) -> None:
+        """Queues msg for all endpoints. Messages going to more than one client should be encoded once and sent
+        through here, instead of being encoded for each of them."""
         for endpoint in endpoints:
-            if endpoint.socket and endpoint.socket.open:
-                sockets.append(endpoint.socket)
-        try:
-            websockets.broadcast(sockets, msg)
-        except RuntimeError:
-            self.logger.exception("Exception during broadcast_send_encoded_msgs")
-            return False
-        else:
-            if self.log_network:
-                self.logger.info(f"Outgoing broadcast: {msg}")
-            return True
+            self.queue_encoded_msgs(endpoint, msg)
 
     def broadcast_all(self, msgs: typing.List[dict]):
         msg_is_text = all(msg["cmd"] == "PrintJSON" for msg in msgs)
@@ -375,7 +550,7 @@ class Context:
             for endpoint in self.endpoints
             if endpoint.auth and not (msg_is_text and endpoint.no_text)
         )
-        async_start(self.broadcast_send_encoded_msgs(endpoints, data))
+        self.broadcast_encoded(endpoints, data)
 
     def broadcast_text_all(self, text: str, additional_arguments: dict = {}):
         self.logger.info("Notice (all): %s" % text)
@@ -389,11 +564,10 @@ class Context:
             for endpoint in itertools.chain.from_iterable(self.clients[team].values())
             if not (msg_is_text and endpoint.no_text)
         )
-        async_start(self.broadcast_send_encoded_msgs(endpoints, data))
+        self.broadcast_encoded(endpoints, data)
 
     def broadcast(self, endpoints: typing.Iterable[Client], msgs: typing.List[dict]):
-        msgs = self.dumper(msgs)
-        async_start(self.broadcast_send_encoded_msgs(endpoints, msgs))
+        self.broadcast_encoded(endpoints, self.dumper(msgs))
 
     async def disconnect(self, endpoint: Client):
         if endpoint in self.endpoints:
@@ -406,14 +580,13 @@ class Context:
         if not client.auth or client.no_text:
             return
         self.logger.info("Notice (Player %s in team %d): %s" % (client.name, client.team + 1, text))
-        async_start(self.send_msgs(client, [{"cmd": "PrintJSON", "data": [{ "text": text }], **additional_arguments}]))
+        self.queue_msgs(client, [{"cmd": "PrintJSON", "data": [{ "text": text }], **additional_arguments}])
 
     def notify_client_multiple(self, client: Client, texts: typing.List[str], additional_arguments: dict = {}):
         if not client.auth or client.no_text:
             return
-        async_start(self.send_msgs(client,
-                                   [{"cmd": "PrintJSON", "data": [{ "text": text }], **additional_arguments}
-                                    for text in texts]))
+        self.queue_msgs(client, [{"cmd": "PrintJSON", "data": [{ "text": text }], **additional_arguments}
+                                 for text in texts])
 
     # loading
     def load(self, multidatapath: str, use_embedded_server_options: bool = False):
@@ -435,10 +608,15 @@ class Context:
 
     @staticmethod
     def decompress(data: bytes) -> dict:
+        return restricted_loads(Context.decompress_pickle(data))
+
+    @staticmethod
+    def decompress_pickle(data: bytes) -> bytes:
+        """Returns the pickle inside of compressed multidata."""
         format_version = data[0]
         if format_version > 3:
             raise Utils.VersionException("Incompatible multidata.")
-        return restricted_loads(zlib.decompress(data[1:]))
+        return zlib.decompress(data[1:])
 
     def _load(self, decoded_obj: dict, game_data_packages: typing.Dict[str, typing.Any],
               use_embedded_server_options: bool):
@@ -491,6 +669,7 @@ class Context:
 
         for slot, hints in decoded_obj["precollected_hints"].items():
             self.hints[0, slot].update(hints)
+            self.index_hints(0, (hint for hint in hints if hint.finding_player == slot))
 
         # declare slots that aren't players as done
         for slot, slot_info in self.slot_info.items():
@@ -521,6 +700,10 @@ class Context:
 
         # sorted access spheres
         self.spheres = decoded_obj.get("spheres", [])
+        self.location_spheres = {}
+        for i, sphere in enumerate(self.spheres):
+            for player, locations in sphere.items():
+                self.location_spheres.setdefault(player, {}).update(dict.fromkeys(locations, i))
 
     # saving
 
@@ -536,30 +719,86 @@ class Context:
         return False
 
     def _save(self, exit_save: bool = False) -> bool:
+        # only what changed since the last save is appended to the journal,
+        # until the journal gets larger than a full save, which then replaces the journal
+        stored_data_changed, self.stored_data_changed = self.stored_data_changed, set()
+        saved_state = SavedState.of(self)
         try:
-            encoded_save = pickle.dumps(self.get_save())
-            with open(self.save_filename, "wb") as f:
-                f.write(zlib.compress(encoded_save))
+            if exit_save or self.journal_size >= self.snapshot_size:
+                generation = self.journal_generation + 1
+                save_data = self.get_save()
+                save_data["journal_generation"] = generation
+                encoded_save = zlib.compress(pickle.dumps(save_data))
+                with open(self.save_filename + ".tmp", "wb") as f:
+                    f.write(encoded_save)
+                os.replace(self.save_filename + ".tmp", self.save_filename)
+                self.journal_generation = generation
+                self.snapshot_size = len(encoded_save)
+                self.journal_size = 0
+                # records of older generations are skipped when loading, so clearing them is only to save space
+                with open(self.journal_filename, "wb"):
+                    pass
+            else:
+                delta = self.get_save_delta(self.saved_state, stored_data_changed)
+                delta["journal_generation"] = self.journal_generation
+                encoded_delta = zlib.compress(pickle.dumps(delta))
+                with open(self.journal_filename, "ab") as f:
+                    f.write(len(encoded_delta).to_bytes(4, "big") + encoded_delta)
+                self.journal_size += 4 + len(encoded_delta)
         except Exception as e:
+            self.stored_data_changed |= stored_data_changed
             self.logger.exception(e)
             return False
         else:
+            self.saved_state = saved_state
             return True
 
+    @property
+    def journal_filename(self) -> str:
+        return self.save_filename + "_journal"
+
+    def _load_journal(self, save_data: dict) -> None:
+        """Applies the records of the journal that were written after save_data to it, and drops a partially written
+        record at its end."""
+        generation = save_data.get("journal_generation", 0)
+        with open(self.journal_filename, "rb") as f:
+            journal = f.read()
+        position = 0
+        while position + 4 <= len(journal):
+            end = position + 4 + int.from_bytes(journal[position:position + 4], "big")
+            if end > len(journal):
+                break
+            delta = restricted_loads(zlib.decompress(journal[position + 4:end]))
+            if delta["journal_generation"] == generation:
+                apply_save_delta(save_data, delta)
+            position = end
+        if position < len(journal):
+            self.logger.warning(f"Dropping incomplete record at the end of save journal {self.journal_filename}")
+            with open(self.journal_filename, "r+b") as f:
+                f.truncate(position)
+        self.journal_generation = generation
+        self.journal_size = position
+
     def init_save(self, enabled: bool = True):
         self.saving = enabled
         if self.saving:
             if not self.save_filename:
-                import os
                 name, ext = os.path.splitext(self.data_filename)
                 self.save_filename = name + '.apsave' if ext.lower() in ('.archipelago', '.zip') \
                     else self.data_filename + '_' + 'apsave'
             try:
                 with open(self.save_filename, 'rb') as f:
-                    save_data = restricted_loads(zlib.decompress(f.read()))
-                    self.set_save(save_data)
+                    encoded_save = f.read()
+                save_data = restricted_loads(zlib.decompress(encoded_save))
+                self.snapshot_size = len(encoded_save)
+                if os.path.exists(self.journal_filename):
+                    self._load_journal(save_data)
+                self.set_save(save_data)
             except FileNotFoundError:
                 self.logger.error('No save data found, starting a new game')
+                if os.path.exists(self.journal_filename):
+                    # left over from another save, so it can't be applied to the next one by accident
+                    os.remove(self.journal_filename)
             except Exception as e:
                 self.logger.exception(e)
             self._start_async_saving()
@@ -613,6 +852,7 @@ class Context:
             "random_state": self.random.getstate(),
             "group_collected": dict(self.group_collected),
             "stored_data": self.stored_data,
+            "stored_data_versions": self.stored_data_versions,
             "game_options": {"hint_cost": self.hint_cost, "location_check_points": self.location_check_points,
                              "server_password": self.server_password, "password": self.password,
                              "release_mode": self.release_mode,
@@ -623,6 +863,23 @@ class Context:
 
         return d
 
+    def get_save_delta(self, saved_state: SavedState, stored_data_changed: typing.AbstractSet[str]) -> dict:
+        """Returns the save data that changed since saved_state, in the format of get_save.
+        Includes only the new items of received_items, and the changed entries of location_checks, hints and
+        stored_data. The remaining save data is small, so it is always included."""
+        d = self.get_save()
+        d["received_items"] = {
+            key: (saved_state.received_items.get(key, 0), items[saved_state.received_items.get(key, 0):])
+            for key, items in d["received_items"].items() if len(items) > saved_state.received_items.get(key, 0)}
+        d["location_checks"] = {key: locations for key, locations in d["location_checks"].items()
+                                if len(locations) > saved_state.location_checks.get(key, 0)}
+        d["hints"] = {key: hints for key, hints in d["hints"].items()
+                      if hints != saved_state.hints.get(key, frozenset())}
+        d["stored_data"] = {key: self.stored_data[key] for key in stored_data_changed if key in self.stored_data}
+        d["stored_data_versions"] = {key: self.stored_data_versions[key] for key in stored_data_changed
+                                     if key in self.stored_data_versions}
+        return d
+
     def set_save(self, savedata: dict):
         if self.connect_names != savedata["connect_names"]:
             raise Exception("This savegame does not appear to match the loaded multiworld.")
@@ -631,6 +888,10 @@ class Context:
         self.received_items = savedata["received_items"]
         self.hints_used.update(savedata["hints_used"])
         self.hints.update(savedata["hints"])
+        self.hint_index.clear()
+        for (team, slot), hints in self.hints.items():
+            # the finding player's hints are the ones kept up to date
+            self.index_hints(team, (hint for hint in hints if hint.finding_player == slot))
 
         self.name_aliases.update(savedata["name_aliases"])
         self.client_game_state.update(savedata["client_game_state"])
@@ -659,6 +920,11 @@ class Context:
 
         if "stored_data" in savedata:
             self.stored_data = savedata["stored_data"]
+        self.stored_data_keys = sorted(self.stored_data)
+        self.stored_data_versions = savedata.get("stored_data_versions", {})
+        self.stored_data_version = max(self.stored_data_version, max(self.stored_data_versions.values(), default=0))
+        self.saved_state = SavedState.of(self)
+        self.stored_data_changed.clear()
         # count items and slots from lists for items_handling = remote
         self.logger.info(
             f'Loaded save file with {sum([len(v) for k, v in self.received_items.items() if k[2]])} received items '
@@ -688,6 +954,7 @@ class Context:
                 new_hints.add(new_hint)
                 if hint == new_hint:
                     continue
+                self.index_hints(hint_team, (new_hint,))
                 for player in self.slot_set(hint.receiving_player) | {hint.finding_player}:
                     if changed is not None:
                         changed.add((hint_team,player))
@@ -695,6 +962,23 @@ class Context:
                         self.replace_hint(hint_team, player, hint, new_hint)
             self.hints[hint_team, hint_slot] = new_hints
 
+    def recheck_location_hints(self, team: int, slot: int, locations: typing.Iterable[int],
+                               changed: typing.Optional[typing.Set[team_slot]] = None) -> None:
+        """Refreshes the hints for locations of slot, like recheck_hints does for all hints of a slot.
+        Adds each (team, slot) pair that has at least one hint modified to 'changed', if passed."""
+        for location in locations:
+            hint = self.hint_index.get((team, slot, location))
+            if not hint:
+                continue
+            new_hint = hint.re_check(self, team)
+            if hint == new_hint:
+                continue
+            for player in self.slot_set(hint.receiving_player) | {hint.finding_player}:
+                if changed is not None:
+                    changed.add((team, player))
+                self.replace_hint(team, player, hint, new_hint)
+            self.index_hints(team, (new_hint,))
+
     def get_rechecked_hints(self, team: int, slot: int):
         self.recheck_hints(team, slot)
         return self.hints[team, slot]
@@ -702,11 +986,11 @@ class Context:
     def get_sphere(self, player: int, location_id: int) -> int:
         """Get sphere of a location, -1 if spheres are not available."""
         if self.spheres:
-            for i, sphere in enumerate(self.spheres):
-                if location_id in sphere.get(player, set()):
-                    return i
-            raise KeyError(f"No Sphere found for location ID {location_id} belonging to player {player}. "
-                           f"Location or player may not exist.")
+            try:
+                return self.location_spheres[player][location_id]
+            except KeyError:
+                raise KeyError(f"No Sphere found for location ID {location_id} belonging to player {player}. "
+                               f"Location or player may not exist.") from None
         return -1
 
     def get_players_package(self):
@@ -752,7 +1036,8 @@ class Context:
         new_hint_events: typing.Set[int] = set()
         concerns = collections.defaultdict(list)
         for hint in sorted(hints, key=operator.attrgetter('found'), reverse=True):
-            data = (hint, hint.as_network_message())
+            # encoded once without the surrounding list, to be shared by the messages of all concerned slots
+            data = (hint, self.dumper([hint.as_network_message()])[1:-1])
             for player in self.slot_set(hint.receiving_player):
                 concerns[player].append(data)
             if not hint.local and data not in concerns[hint.finding_player]:
@@ -764,6 +1049,7 @@ class Context:
                 # we can check once if hint already exists
                 if hint not in self.hints[team, hint.finding_player]:
                     self.hints[team, hint.finding_player].add(hint)
+                    self.index_hints(team, (hint,))
                     new_hint_events.add(hint.finding_player)
                     for player in self.slot_set(hint.receiving_player):
                         self.hints[team, player].add(hint)
@@ -774,23 +1060,62 @@ class Context:
             self.on_new_hint(team, slot)
         for slot, hint_data in concerns.items():
             if recipients is None or slot in recipients:
-                clients = filter(lambda c: not c.no_text, self.clients[team].get(slot, []))
+                clients = [client for client in self.clients[team].get(slot, []) if not client.no_text]
                 if not clients:
                     continue
-                client_hints = [datum[1] for datum in sorted(hint_data, key=lambda x: x[0].finding_player != slot)]
-                for client in clients:
-                    async_start(self.send_msgs(client, client_hints))
+                client_hints = ",".join(datum[1] for datum in
+                                        sorted(hint_data, key=lambda x: x[0].finding_player != slot))
+                self.broadcast_encoded(clients, f"[{client_hints}]")
+
+    async def get_intended_text(self, input_text: str, possible_answers: typing.Collection[str]) \
+            -> typing.Tuple[str, bool, str]:
+        """Utils.get_intended_text, run in the worker pool if there is one, so other clients are served meanwhile."""
+        if self.worker_pool:
+            if not isinstance(possible_answers, Utils.FuzzyIndex):
+                possible_answers = tuple(possible_answers)
+            return await asyncio.get_running_loop().run_in_executor(self.worker_pool, get_intended_text,
+                                                                    input_text, possible_answers)
+        return get_intended_text(input_text, possible_answers)
+
+    # data storage
+
+    def set_stored_data(self, key: str, value: typing.Any) -> None:
+        """Stores value for key under a new version."""
+        if key not in self.stored_data:
+            bisect.insort(self.stored_data_keys, key)
+        self.stored_data[key] = value
+        self.stored_data_version += 1
+        self.stored_data_versions[key] = self.stored_data_version
+        self.stored_data_changed.add(key)
+
+    def get_stored_data_keys(self, prefix: str) -> typing.List[str]:
+        """Returns the keys of stored_data that start with prefix, in sorted order."""
+        start = end = bisect.bisect_left(self.stored_data_keys, prefix)
+        while end < len(self.stored_data_keys) and self.stored_data_keys[end].startswith(prefix):
+            end += 1
+        return self.stored_data_keys[start:end]
+
+    def get_stored_data_notification_clients(self, key: str) -> typing.Set[Client]:
+        """Returns the clients that registered for changes of key, by the key itself or a prefix of it."""
+        targets: typing.Set[Client] = set(self.stored_data_notification_clients.get(key, ()))
+        if self.stored_data_prefix_notification_clients:
+            for end in range(len(key) + 1):
+                targets.update(self.stored_data_prefix_notification_clients.get(key[:end], ()))
+        return targets
 
     def get_hint(self, team: int, finding_player: int, seeked_location: int) -> typing.Optional[Hint]:
-        for hint in self.hints[team, finding_player]:
-            if hint.location == seeked_location:
-                return hint
-        return None
-    
+        return self.hint_index.get((team, finding_player, seeked_location), None)
+
+    def index_hints(self, team: int, hints: typing.Iterable[Hint]) -> None:
+        """Makes hints the ones get_hint returns for their locations."""
+        for hint in hints:
+            self.hint_index[team, hint.finding_player, hint.location] = hint
+
     def replace_hint(self, team: int, slot: int, old_hint: Hint, new_hint: Hint) -> None:
         if old_hint in self.hints[team, slot]:
             self.hints[team, slot].remove(old_hint)
             self.hints[team, slot].add(new_hint)
+            self.index_hints(team, (new_hint,))
     
     # "events"
 
@@ -813,16 +1138,24 @@ class Context:
 
     def on_changed_hints(self, team: int, slot: int):
         key: str = f"_read_hints_{team}_{slot}"
-        targets: typing.Set[Client] = set(self.stored_data_notification_clients[key])
+        targets: typing.Set[Client] = self.get_stored_data_notification_clients(key)
         if targets:
             self.broadcast(targets, [{"cmd": "SetReply", "key": key, "value": self.hints[team, slot]}])
 
     def on_client_status_change(self, team: int, slot: int):
         key: str = f"_read_client_status_{team}_{slot}"
-        targets: typing.Set[Client] = set(self.stored_data_notification_clients[key])
+        targets: typing.Set[Client] = self.get_stored_data_notification_clients(key)
         if targets:
             self.broadcast(targets, [{"cmd": "SetReply", "key": key, "value": self.client_game_state[team, slot]}])
 
+    def on_new_location_checks(self, team: int, slot: int, locations: typing.AbstractSet[int]):
+        """Called after locations of slot were checked for the first time."""
+        pass
+
+    def on_new_items(self, team: int, slot: int, items: typing.Sequence[NetworkItem]):
+        """Called after items were added to the received items of slot, from checks or server commands."""
+        pass
+
 
 def update_aliases(ctx: Context, team: int):
     cmd = ctx.dumper([{"cmd": "RoomUpdate",
@@ -830,7 +1163,7 @@ def update_aliases(ctx: Context, team: int):
 
     for clients in ctx.clients[team].values():
         for client in clients:
-            async_start(ctx.send_encoded_msgs(client, cmd))
+            ctx.queue_encoded_msgs(client, cmd)
 
 
 async def server(websocket: "ServerConnection", path: str = "/", ctx: Context = None) -> None:
@@ -1012,6 +1345,16 @@ def get_start_inventory(ctx: Context, player: int, remote_start_inventory: bool)
     return ctx.start_inventory.setdefault(player, []) if remote_start_inventory else []
 
 
+async def send_all_items(ctx: Context, client: Client) -> None:
+    """Sends all items of client from index 0, if it has any."""
+    msg, count = ctx.received_items_cache.get_msg(ctx, client)
+    if msg:
+        client.send_index = count
+        await ctx.send_encoded_msgs(client, msg)
+    else:
+        client.send_index = 0
+
+
 def send_new_items(ctx: Context):
     for team, clients in ctx.clients.items():
         for slot, clients in clients.items():
@@ -1022,10 +1365,10 @@ def send_new_items(ctx: Context):
                 items = get_received_items(ctx, team, slot, client.remote_items)
                 if len(start_inventory) + len(items) > client.send_index:
                     first_new_item = max(0, client.send_index - len(start_inventory))
-                    async_start(ctx.send_msgs(client, [{
+                    ctx.queue_msgs(client, [{
                         "cmd": "ReceivedItems",
                         "index": client.send_index,
-                        "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
+                        "items": start_inventory[client.send_index:] + items[first_new_item:]}])
                     client.send_index = len(start_inventory) + len(items)
 
 
@@ -1074,6 +1417,7 @@ def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem
             if item.player != target_slot:
                 get_received_items(ctx, team, target, False).append(item)
             get_received_items(ctx, team, target, True).append(item)
+        ctx.on_new_items(team, target, items)
 
 
 def register_location_checks(ctx: Context, team: int, slot: int, locations: typing.Iterable[int],
@@ -1111,6 +1455,7 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
         del sortable
 
         ctx.location_checks[team, slot] |= new_locations
+        ctx.on_new_location_checks(team, slot, new_locations)
         send_new_items(ctx)
         ctx.broadcast(ctx.clients[team][slot], [{
             "cmd": "RoomUpdate",
@@ -1118,7 +1463,7 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
             "checked_locations": new_locations,  # send back new checks only
         }])
         updated_slots: typing.Set[tuple[int, int]] = set()
-        ctx.recheck_hints(team, slot, updated_slots)
+        ctx.recheck_location_hints(team, slot, new_locations, updated_slots)
         for hint_team, hint_slot in updated_slots:
             ctx.on_changed_hints(hint_team, hint_slot)
         ctx.save()
@@ -1135,7 +1480,7 @@ def collect_hints(ctx: Context, team: int, slot: int, item: typing.Union[int, st
     seeked_item_id = item if isinstance(item, int) else ctx.item_names_for_game(ctx.games[slot])[item]
     for finding_player, location_id, item_id, receiving_player, item_flags \
             in ctx.locations.find_item(slots, seeked_item_id):
-        prev_hint = ctx.get_hint(team, slot, location_id)
+        prev_hint = ctx.get_hint(team, finding_player, location_id)
         if prev_hint:
             hints.append(prev_hint)
         else:
@@ -1571,13 +1916,14 @@ class ClientMessageProcessor(CommonCommandProcessor):
         return False
 
     @mark_raw
-    def _cmd_getitem(self, item_name: str) -> bool:
+    async def _cmd_getitem(self, item_name: str) -> bool:
         """Cheat in an item, if it is enabled on this server"""
         if self.ctx.item_cheat:
-            names = self.ctx.item_names_for_game(self.ctx.games[self.client.slot])
-            item_name, usable, response = get_intended_text(
+            game = self.ctx.games[self.client.slot]
+            names = self.ctx.item_names_for_game(game)
+            item_name, usable, response = await self.ctx.get_intended_text(
                 item_name,
-                names
+                self.ctx.item_name_indexes[game]
             )
             if usable:
                 new_item = NetworkItem(names[item_name], -1, self.client.slot)
@@ -1596,14 +1942,15 @@ class ClientMessageProcessor(CommonCommandProcessor):
             self.output("Cheating is disabled.")
             return False
 
-    def get_hints(self, input_text: str, for_location: bool = False) -> bool:
+    async def get_hints(self, input_text: str, for_location: bool = False) -> bool:
         points_available = get_client_points(self.ctx, self.client)
         cost = self.ctx.get_hint_cost(self.client.slot)
         auto_status = HintStatus.HINT_UNSPECIFIED if for_location else HintStatus.HINT_PRIORITY
         if not input_text:
-            hints = {hint.re_check(self.ctx, self.client.team) for hint in
-                     self.ctx.hints[self.client.team, self.client.slot]}
+            old_hints = self.ctx.hints[self.client.team, self.client.slot]
+            hints = {hint.re_check(self.ctx, self.client.team) for hint in old_hints}
             self.ctx.hints[self.client.team, self.client.slot] = hints
+            self.ctx.index_hints(self.client.team, hints - old_hints)
             self.ctx.notify_hints(self.client.team, list(hints), recipients=(self.client.slot,))
             self.output(f"A hint costs {self.ctx.get_hint_cost(self.client.slot)} points. "
                         f"You have {points_available} points.")
@@ -1637,7 +1984,9 @@ class ClientMessageProcessor(CommonCommandProcessor):
             names = self.ctx.all_location_and_group_names[game] \
                 if for_location else \
                 self.ctx.all_item_and_group_names[game]
-            hint_name, usable, response = get_intended_text(input_text, names)
+            hint_name, usable, response = await self.ctx.get_intended_text(input_text, names)
+            # other clients may have been served while matching
+            points_available = get_client_points(self.ctx, self.client)
 
             if usable:
                 if hint_name in self.ctx.non_hintable_names[game]:
@@ -1727,18 +2076,18 @@ class ClientMessageProcessor(CommonCommandProcessor):
             return False
 
     @mark_raw
-    def _cmd_hint(self, item_name: str = "") -> bool:
+    async def _cmd_hint(self, item_name: str = "") -> bool:
         """Use !hint {item_name},
         for example !hint Lamp to get a spoiler peek for that item.
         If hint costs are on, this will only give you one new result,
         you can rerun the command to get more in that case."""
-        return self.get_hints(item_name)
+        return await self.get_hints(item_name)
 
     @mark_raw
-    def _cmd_hint_location(self, location: str = "") -> bool:
+    async def _cmd_hint_location(self, location: str = "") -> bool:
         """Use !hint_location {location_name},
         for example !hint_location atomic-bomb to get a spoiler peek for that location."""
-        return self.get_hints(location, True)
+        return await self.get_hints(location, True)
 
 
 def get_checked_checks(ctx: Context, team: int, slot: int) -> typing.List[int]:
@@ -1833,18 +2182,15 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                 "slot_info": ctx.slot_info,
                 "hint_points": get_slot_points(ctx, team, slot),
             }
-            reply = [connected_packet]
-            start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
-            items = get_received_items(ctx, client.team, client.slot, client.remote_items)
-            if (start_inventory or items) and not client.no_items:
-                reply.append({"cmd": 'ReceivedItems', "index": 0, "items": start_inventory + items})
-                client.send_index = len(start_inventory) + len(items)
+            if args.get("slot_data", True):
+                connected_packet["slot_data"] = ctx.slot_data[client.slot]
+            # queued before the messages of joining, so the client receives them after being connected
+            await ctx.send_msgs(client, [connected_packet])
+            if not client.no_items:
+                await send_all_items(ctx, client)
             if not client.auth:  # if this was a Re-Connect, don't print to console
                 client.auth = True
                 await on_client_joined(ctx, client)
-            if args.get("slot_data", True):
-                connected_packet["slot_data"] = ctx.slot_data[client.slot]
-            await ctx.send_msgs(client, reply)
 
     elif cmd == "GetDataPackage":
         exclusions = args.get("exclusions", [])
@@ -1877,14 +2223,10 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             if args.get('items_handling', None) is not None and client.items_handling != args['items_handling']:
                 try:
                     client.items_handling = args['items_handling']
-                    start_inventory = get_start_inventory(ctx, client.slot, client.remote_start_inventory)
-                    items = get_received_items(ctx, client.team, client.slot, client.remote_items)
-                    if (items or start_inventory) and not client.no_items:
-                        client.send_index = len(start_inventory) + len(items)
-                        await ctx.send_msgs(client, [{"cmd": "ReceivedItems", "index": 0,
-                                                      "items": start_inventory + items}])
-                    else:
+                    if client.no_items:
                         client.send_index = 0
+                    else:
+                        await send_all_items(ctx, client)
                 except (ValueError, TypeError) as err:
                     await ctx.send_msgs(client, [{'cmd': 'InvalidPacket', 'type': 'arguments',
                                                   'text': f'Invalid items_handling: {err}',
@@ -1905,12 +2247,8 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                         {"type": "TagsChanged", "team": client.team, "slot": client.slot, "tags": client.tags})
 
         elif cmd == 'Sync':
-            start_inventory = get_start_inventory(ctx, client.slot, client.remote_start_inventory)
-            items = get_received_items(ctx, client.team, client.slot, client.remote_items)
-            if (start_inventory or items) and not client.no_items:
-                client.send_index = len(start_inventory) + len(items)
-                await ctx.send_msgs(client, [{"cmd": "ReceivedItems", "index": 0,
-                                              "items": start_inventory + items}])
+            if not client.no_items:
+                await send_all_items(ctx, client)
 
         elif cmd == 'LocationChecks':
             if client.no_locations:
@@ -1993,7 +2331,13 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                                               "original_cmd": cmd}])
                 return
 
-            client.messageprocessor(args["text"])
+            result = client.messageprocessor(args["text"])
+            if inspect.isawaitable(result):
+                # the client's next messages wait for the command, other clients are served while it waits
+                try:
+                    await result
+                except Exception as e:
+                    client.messageprocessor._error_parsing_command(e)
 
         elif cmd == "Bounce":
             games = set(args.get("games", []))
@@ -2009,7 +2353,11 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                     await ctx.send_encoded_msgs(bounceclient, msg)
 
         elif cmd == "Get":
-            if "keys" not in args or type(args["keys"]) != list:
+            prefixes = args.get("prefixes", [])
+            known_versions = args.get("known_versions", None)
+            if "keys" not in args or type(args["keys"]) != list or type(prefixes) != list or \
+                    not all(isinstance(prefix, str) for prefix in prefixes) or \
+                    (known_versions is not None and type(known_versions) != dict):
                 await ctx.send_msgs(client, [{'cmd': 'InvalidPacket', "type": "arguments",
                                               "text": 'Retrieve', "original_cmd": cmd}])
                 return
@@ -2020,6 +2368,15 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                      ctx.stored_data.get(key, None)
                 for key in keys
             }
+            for prefix in prefixes:
+                for key in ctx.get_stored_data_keys(prefix):
+                    args["keys"][key] = ctx.stored_data[key]
+            if known_versions is not None:
+                args["versions"] = {key: ctx.stored_data_versions.get(key, 0) for key in args["keys"]
+                                    if key in ctx.stored_data}
+                for key, version in args["versions"].items():
+                    if known_versions.get(key, None) == version:
+                        del args["keys"][key]
             await ctx.send_msgs(client, [args])
 
         elif cmd == "Set":
@@ -2030,26 +2387,36 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                 return
             args["cmd"] = "SetReply"
             value = ctx.stored_data.get(args["key"], args.get("default", 0))
-            args["original_value"] = copy.copy(value)
+            targets = ctx.get_stored_data_notification_clients(args["key"])
+            if args.get("want_reply", True):
+                targets.add(client)
+            # only a value that is changed in place has to be copied to be able to tell its original
+            if targets and any(operation["operation"] in in_place_modify_functions
+                               for operation in args["operations"]):
+                args["original_value"] = copy.copy(value)
+            else:
+                args["original_value"] = value
             args["slot"] = client.slot
             for operation in args["operations"]:
                 func = modify_functions[operation["operation"]]
                 value = func(value, operation["value"])
-            ctx.stored_data[args["key"]] = args["value"] = value
-            targets = set(ctx.stored_data_notification_clients[args["key"]])
-            if args.get("want_reply", True):
-                targets.add(client)
+            ctx.set_stored_data(args["key"], value)
+            args["value"] = value
             if targets:
                 ctx.broadcast(targets, [args])
             ctx.save()
 
         elif cmd == "SetNotify":
-            if "keys" not in args or type(args["keys"]) != list:
+            prefixes = args.get("prefixes", [])
+            if "keys" not in args or type(args["keys"]) != list or type(prefixes) != list or \
+                    not all(isinstance(prefix, str) for prefix in prefixes):
                 await ctx.send_msgs(client, [{'cmd': 'InvalidPacket', "type": "arguments",
                                               "text": 'SetNotify', "original_cmd": cmd}])
                 return
             for key in args["keys"]:
                 ctx.stored_data_notification_clients[key].add(client)
+            for prefix in prefixes:
+                ctx.stored_data_prefix_notification_clients[prefix].add(client)
 
 
 def update_client_status(ctx: Context, client: Client, new_status: ClientStatus):
@@ -2212,8 +2579,9 @@ class ServerCommandProcessor(CommonCommandProcessor):
         if usable:
             team, slot = self.ctx.player_name_lookup[seeked_player]
             item_name = " ".join(item_name)
-            names = self.ctx.item_names_for_game(self.ctx.games[slot])
-            item_name, usable, response = get_intended_text(item_name, names)
+            game = self.ctx.games[slot]
+            names = self.ctx.item_names_for_game(game)
+            item_name, usable, response = get_intended_text(item_name, self.ctx.item_name_indexes[game])
             if usable:
                 amount: int = int(amount)
                 if amount > 100:
@@ -2248,7 +2616,7 @@ class ServerCommandProcessor(CommonCommandProcessor):
             if full_name.isnumeric():
                 location, usable, response = int(full_name), True, None
             elif self.ctx.location_names_for_game(game) is not None:
-                location, usable, response = get_intended_text(full_name, self.ctx.location_names_for_game(game))
+                location, usable, response = get_intended_text(full_name, self.ctx.location_name_indexes[game])
             else:
                 self.output("Can't look up location for unknown game. Send by ID instead.")
                 return False
@@ -2468,6 +2836,9 @@ def parse_args() -> argparse.Namespace:
     #0 -> recommended for tournaments to force a level playing field, only allow an exact version match
     """)
     parser.add_argument('--log_network', default=defaults["log_network"], action="store_true")
+    parser.add_argument('--worker_processes', default=defaults["worker_processes"], type=int,
+                        help="number of processes to run CPU heavy parts of commands in, like name matching for !hint. "
+                             "0 to run them in the server process.")
     args = parser.parse_args()
     return args
 
@@ -2515,6 +2886,8 @@ async def main(args: argparse.Namespace):
                   args.hint_cost, not args.disable_item_cheat, args.release_mode, args.collect_mode,
                   args.remaining_mode,
                   args.auto_shutdown, args.compatibility, args.log_network)
+    if args.worker_processes:
+        ctx.worker_pool = concurrent.futures.ProcessPoolExecutor(args.worker_processes)
     data_filename = args.multidata
 
     if not data_filename:
@@ -2561,6 +2934,8 @@ async def main(args: argparse.Namespace):
     console_task.cancel()
     if ctx.shutdown_task:
         await ctx.shutdown_task
+    if ctx.worker_pool:
+        ctx.worker_pool.shutdown(cancel_futures=True)
 
 
 client_message_processor = ClientMessageProcessor
@@ -5,6 +5,11 @@ import enum
 import warnings
 from json import JSONEncoder, JSONDecoder
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 if typing.TYPE_CHECKING:
     from websockets import WebSocketServerProtocol as ServerConnection
 
@@ -113,7 +118,47 @@ _encode = JSONEncoder(
 ).encode
 
 
+if orjson:
+    _int_TypedTuple_templates: typing.Dict[type, bytes] = {}
+    """NamedTuple type -> its encoding, with %d in place of the values"""
+
+    def _orjson_default(obj: typing.Any) -> typing.Any:
+        """Called by orjson for objects it can't encode itself, converting them like _scan_for_TypedTuples does."""
+        if isinstance(obj, tuple):
+            if hasattr(obj, "_fields"):
+                for value in obj:
+                    if type(value) is not int:
+                        break
+                else:
+                    # fast path for tuples of plain ints, like NetworkItem
+                    template = _int_TypedTuple_templates.get(obj.__class__)
+                    if template is None:
+                        template = _int_TypedTuple_templates[obj.__class__] = (
+                            "{" + "".join(f'"{field}":%d,' for field in obj._fields) +
+                            f'"class":"{obj.__class__.__name__}"}}').encode()
+                    return orjson.Fragment(template % obj)
+                data = obj._asdict()
+                data["class"] = obj.__class__.__name__
+                return data
+            return list(obj)
+        if isinstance(obj, (set, frozenset)):
+            return list(obj)
+        raise TypeError
+
+    _orjson_options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
 def encode(obj: typing.Any) -> str:
+    if orjson:
+        try:
+            data = orjson.dumps(obj, default=_orjson_default, option=_orjson_options)
+        except TypeError:
+            pass  # let JSONEncoder handle or reject it, e.g. integers beyond 64 bit
+        else:
+            # orjson writes floats below 1e-4 differently and NaN and Infinity as null,
+            # so leave output that may contain those to JSONEncoder, to stay byte for byte the same
+            if b"e-" not in data and b"0.0000" not in data and b"null" not in data:
+                return data.decode()
     return _encode(_scan_for_TypedTuples(obj))
 
 
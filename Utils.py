@@ -481,6 +481,124 @@ class KeyedDefaultDict(collections.defaultdict):
         return value
 
 
+class NameTable(typing.Mapping[int, str]):
+    """
+    Immutable mapping of ids to names stored in one buffer: the sorted ids, the offsets of the names and the names.
+    Unknown ids are looked up as unknown formatted with the id, like a KeyedDefaultDict, but without being added.
+    Tables returned by share_name_tables are backed by a mapped file, which other processes map again when unpickling.
+    """
+    buffer: memoryview
+    unknown: str
+    _source: Optional[typing.Tuple[str, int, int]]
+    """(path, offset, length) of the buffer in a shared file"""
+
+    def __init__(self, buffer: typing.Union[bytes, memoryview], unknown: str,
+                 source: Optional[typing.Tuple[str, int, int]] = None) -> None:
+        self.buffer = memoryview(buffer)
+        self.unknown = unknown
+        self._source = source
+        count = self.buffer[:8].cast("Q")[0]
+        ids_end = 8 + 8 * count
+        offsets_end = ids_end + 8 * (count + 1)
+        self._ids = self.buffer[8:ids_end].cast("q")
+        self._offsets = self.buffer[ids_end:offsets_end].cast("Q")
+        self._names = self.buffer[offsets_end:]
+
+    @classmethod
+    def build(cls, names: typing.Mapping[int, str], unknown: str) -> NameTable:
+        import array
+
+        ids = array.array("q", sorted(names))
+        encoded = [names[name_id].encode("utf-8") for name_id in ids]
+        offsets = array.array("Q", itertools.accumulate(map(len, encoded), initial=0))
+        return cls(b"".join((array.array("Q", [len(ids)]).tobytes(), ids.tobytes(), offsets.tobytes(), *encoded)),
+                   unknown)
+
+    def __reduce__(self):
+        if self._source:
+            return _map_name_table, (*self._source, self.unknown)
+        return self.__class__, (self.buffer.tobytes(), self.unknown)
+
+    def _find(self, key: object) -> int:
+        import bisect
+
+        try:
+            index = bisect.bisect_left(self._ids, key)
+        except TypeError:  # not an int
+            return -1
+        return index if index < len(self._ids) and self._ids[index] == key else -1
+
+    def __getitem__(self, key: int) -> str:
+        index = self._find(key)
+        if index < 0:
+            return self.unknown.format(key)
+        return str(self._names[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+    def __contains__(self, key: object) -> bool:
+        return self._find(key) >= 0
+
+    def get(self, key: int, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def __iter__(self) -> typing.Iterator[int]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+@functools.lru_cache(maxsize=None)
+def _map_file(path: str) -> "mmap.mmap":
+    import mmap
+
+    with open(path, "rb") as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _map_name_table(path: str, offset: int, length: int, unknown: str) -> NameTable:
+    return NameTable(memoryview(_map_file(path))[offset:offset + length], unknown, (path, offset, length))
+
+
+def share_name_tables(tables: typing.Mapping[T, NameTable], folder: str,
+                      max_age: float = 7 * 24 * 60 * 60) -> Dict[T, NameTable]:
+    """
+    Writes tables into one file in folder and returns them backed by a read-only mapping of it. Processes that unpickle
+    them map the same file, so the operating system keeps only one copy of them in memory.
+    Files in folder that were not shared for max_age seconds, like those of outdated data packages, are deleted.
+    """
+    import hashlib
+    import time
+
+    if not tables:
+        return {}
+    content = bytearray()
+    layout: typing.List[typing.Tuple[T, int, int, str]] = []
+    for key, table in tables.items():
+        layout.append((key, len(content), len(table.buffer), table.unknown))
+        content += table.buffer
+        content += bytes(-len(content) % 8)  # keep the ids of the next table aligned
+    # named by content, so a file that is already mapped elsewhere never needs to be replaced
+    path = os.path.join(folder, f"names_{hashlib.sha256(content).hexdigest()[:32]}.bin")
+    if not os.path.exists(path):
+        os.makedirs(folder, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}"
+        with open(temp_path, "wb") as file:
+            file.write(content)
+        os.replace(temp_path, path)
+    else:
+        os.utime(path)  # shared again, so it's not deleted below
+    cutoff = time.time() - max_age
+    for entry in os.scandir(folder):
+        if entry.name.startswith("names_") and entry.path != path:
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    # processes that mapped it keep their mapping
+                    os.remove(entry.path)
+            except OSError:
+                pass  # removed by another process, or still mapped on Windows
+    return {key: _map_name_table(path, offset, length, unknown) for key, offset, length, unknown in layout}
+
+
 def get_text_between(text: str, start: str, end: str) -> str:
     return text[text.index(start) + len(start): text.rindex(end)]
 
@@ -645,8 +763,108 @@ def get_fuzzy_results(input_word: str, word_list: typing.Collection[str], limit:
     )
 
 
+class FuzzyIndex:
+    """
+    Fixed collection of names, that finds the same results as get_fuzzy_results with a limit without comparing the
+    input to all of them: names are only compared if the difference in length and the number of shared pairs of
+    letters still allow them to be among the best results. Built on first use, as most indexes are never searched.
+    """
+    names: typing.FrozenSet[str]
+    _folded: Optional[Dict[str, str]] = None
+    """lowercase name -> name"""
+    _entries: typing.List[typing.Tuple[str, str, int]]
+    """(name, lowercase name, length of name)"""
+    _bigrams: Dict[str, typing.List[typing.List[int]]]
+    """pair of letters -> [[index of each entry that has the pair at least once], [... at least twice], ...]"""
+
+    def __init__(self, names: typing.FrozenSet[str]) -> None:
+        self.names = names
+
+    def __reduce__(self):
+        # send only the names to other processes, which then keep their own index, see get_fuzzy_index
+        return get_fuzzy_index, (self.names,)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.names
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _build(self) -> Dict[str, str]:
+        folded: Dict[str, str] = {}
+        self._entries = []
+        self._bigrams = {}
+        for index, name in enumerate(self.names):
+            lower = name.lower()
+            folded.setdefault(lower, name)
+            self._entries.append((name, lower, len(name)))
+            for bigram, count in collections.Counter(lower[i:i + 2] for i in range(len(lower) - 1)).items():
+                postings = self._bigrams.setdefault(bigram, [])
+                for times in range(count):
+                    if times == len(postings):
+                        postings.append([])
+                    postings[times].append(index)
+        self._folded = folded
+        return folded
+
+    def get_exact(self, input_word: str) -> Optional[str]:
+        """Returns the name that matches input_word, ignoring case."""
+        folded = self._folded if self._folded is not None else self._build()
+        return folded.get(input_word.lower(), None)
+
+    def get_fuzzy_results(self, input_word: str, limit: int) -> typing.List[typing.Tuple[str, int]]:
+        import jellyfish
+
+        if self._folded is None:
+            self._build()
+        distance = jellyfish.damerau_levenshtein_distance
+        length = len(input_word)
+        word = input_word.lower()
+        word_bigrams = max(len(word) - 1, 0)
+        shared: typing.Counter[int] = collections.Counter()
+        for bigram, count in collections.Counter(word[i:i + 2] for i in range(len(word) - 1)).items():
+            for postings in self._bigrams.get(bigram, [])[:count]:
+                shared.update(postings)
+
+        # the distance can't be smaller than the difference in length, and each edit changes at most 3 pairs
+        candidates = []
+        for index, (name, lower, name_length) in enumerate(self._entries):
+            unshared = max(word_bigrams, len(lower) - 1) - shared[index]
+            least_distance = max(abs(len(lower) - len(word)), -(-unshared // 3))
+            candidates.append((1 - least_distance / max(name_length, length), index))
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+        best: typing.List[typing.Tuple[str, float]] = []
+        for highest_ratio, index in candidates:
+            if len(best) >= limit and highest_ratio <= best[-1][1]:
+                break
+            name, lower, name_length = self._entries[index]
+            ratio = 1 - distance(word, lower) / max(name_length, length)
+            if len(best) < limit or ratio > best[-1][1]:
+                best.append((name, ratio))
+                best.sort(key=lambda element: element[1], reverse=True)
+                del best[limit:]
+        return [(name, int(ratio * 100)) for name, ratio in best]
+
+
+@functools.lru_cache(maxsize=16)
+def get_fuzzy_index(names: typing.FrozenSet[str]) -> FuzzyIndex:
+    """Returns the FuzzyIndex of names, used for indexes sent to other processes, so a worker process builds each of
+    the few indexes it recently searched only once. Owners of indexes, like MultiServer's Context, keep their own."""
+    return FuzzyIndex(names)
+
+
 def get_intended_text(input_text: str, possible_answers) -> typing.Tuple[str, bool, str]:
-    picks = get_fuzzy_results(input_text, possible_answers, limit=2)
+    if isinstance(possible_answers, FuzzyIndex):
+        exact = possible_answers.get_exact(input_text)
+        if exact is not None and len(possible_answers) > 1:
+            return exact, True, "Perfect Match"
+        picks = possible_answers.get_fuzzy_results(input_text, limit=2)
+    else:
+        picks = get_fuzzy_results(input_text, possible_answers, limit=2)
     if len(picks) > 1:
         dif = picks[0][1] - picks[1][1]
         if picks[0][1] == 100:
@@ -25,7 +25,7 @@ if not os.path.exists(configpath):  # fall back to config.yaml in home
 
 
 def get_app() -> "Flask":
-    from WebHostLib import register, cache, app as raw_app
+    from WebHostLib import register, cache, notifications, app as raw_app
     from WebHostLib.models import db
 
     app = raw_app
@@ -51,6 +51,7 @@ def get_app() -> "Flask":
     cache.init_app(app)
     db.bind(**app.config["PONY"])
     db.generate_mapping(create_tables=True)
+    notifications.configure(app.config["PONY"])
     return app
 
 
@@ -46,6 +46,9 @@ app.config['SESSION_PERMANENT'] = True
 # waitress uses one thread for I/O, these are for processing of views that then get sent
 # archipelago.gg uses gunicorn + nginx; ignoring this option
 app.config["WAITRESS_THREADS"] = 10
+# maximum concurrent live tracker event streams per process, 0 to disable them.
+# each open stream keeps a view thread busy, so keep this well below WAITRESS_THREADS
+app.config["TRACKER_EVENT_STREAMS"] = 0
 # a default that just works. archipelago.gg runs on mariadb
 app.config["PONY"] = {
     'provider': 'sqlite',
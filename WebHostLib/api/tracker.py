@@ -0,0 +1,239 @@
+import datetime
+import functools
+import logging
+import queue
+import threading
+import time
+from typing import AbstractSet, Any, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+from uuid import UUID
+
+from flask import abort, jsonify, request, Response
+from pony.orm import db_session, max as pony_max, select
+
+from NetUtils import Hint
+from . import api_endpoints
+from .. import app
+from ..models import Room, RoomEvent
+from ..tracker import LRUCache, TrackerData
+
+# number of checked locations and hints of the slot snapshots kept to answer requests for changes
+SNAPSHOT_CACHE_SIZE = 4 * 1024 * 1024
+# seconds between checks for new events of rooms that have open event streams
+EVENT_POLL_INTERVAL = 1
+# seconds after which an idle event stream sends a comment, so proxies don't close it
+EVENT_KEEP_ALIVE = 15
+
+
+class _SlotSnapshot(NamedTuple):
+    status: int
+    checked_locations: AbstractSet[int]
+    received_items_count: int
+    hints: AbstractSet[Hint]
+
+
+_snapshot_cache = LRUCache(SNAPSHOT_CACHE_SIZE)
+"""(room id, version) -> {(team, player): _SlotSnapshot}"""
+
+
+def get_save_version(room: Room) -> int:
+    """Returns the version of the room's save, which changes every time the room saves."""
+    last_activity = room.last_activity
+    if last_activity.tzinfo is None:
+        last_activity = last_activity.replace(tzinfo=datetime.timezone.utc)
+    return int(last_activity.timestamp() * 1000000)
+
+
+def _take_snapshot(tracker_data: TrackerData) -> Tuple[Dict[Tuple[int, int], _SlotSnapshot], int]:
+    snapshot = {
+        (team, player): _SlotSnapshot(tracker_data.get_player_client_status(team, player),
+                                      tracker_data.get_player_checked_locations(team, player),
+                                      len(tracker_data.get_player_received_items(team, player)),
+                                      tracker_data.get_player_hints(team, player))
+        for team, players in tracker_data.get_all_slots().items() for player in players
+    }
+    return snapshot, sum(len(slot.checked_locations) + len(slot.hints) + 1 for slot in snapshot.values())
+
+
+def _hint_to_json(hint: Hint) -> Dict[str, Any]:
+    return {
+        "receiving_player": hint.receiving_player,
+        "finding_player": hint.finding_player,
+        "location": hint.location,
+        "item": hint.item,
+        "found": hint.found,
+        "entrance": hint.entrance,
+        "item_flags": hint.item_flags,
+        "status": hint.status,
+    }
+
+
+@api_endpoints.route('/tracker/<suuid:tracker>')
+def tracker_info(tracker: UUID) -> Response:
+    """Returns the checked locations, received items, hints and status of each slot of the room.
+    With a since argument of a version returned earlier, only slots that changed since that version are returned,
+    with only their new locations and items, if that version is still known. Otherwise, everything is returned."""
+    room: Optional[Room] = Room.get(tracker=tracker)
+    if not room:
+        return abort(404)
+    since: Optional[int] = request.args.get("since", None, type=int)
+    if "since" in request.args and since is None:
+        return abort(400)
+
+    version = get_save_version(room)
+    response = Response(mimetype="application/json")
+    response.set_etag(str(version), weak=since is not None)
+    if request.if_none_match.contains_weak(str(version)):
+        response.status_code = 304
+        return response
+
+    tracker_data = TrackerData(room)
+    snapshot: Dict[Tuple[int, int], _SlotSnapshot] = _snapshot_cache.get(
+        (room.id, version), lambda: _take_snapshot(tracker_data))
+    previous: Optional[Dict[Tuple[int, int], _SlotSnapshot]] = None
+    if since is not None:
+        previous = snapshot if since == version else _snapshot_cache.find((room.id, since))
+
+    slots: List[Dict[str, Any]] = []
+    for (team, player), slot in snapshot.items():
+        old = previous.get((team, player), None) if previous is not None else None
+        if old == slot:
+            continue
+        slot_data: Dict[str, Any] = {"team": team, "player": player, "status": slot.status}
+        if old:
+            slot_data["checked_locations"] = sorted(slot.checked_locations - old.checked_locations)
+            start = old.received_items_count
+        else:
+            slot_data["checked_locations"] = sorted(slot.checked_locations)
+            start = 0
+        slot_data["received_items_index"] = start
+        slot_data["received_items"] = tracker_data.get_player_received_items(team, player)[start:]
+        if not old or old.hints != slot.hints:
+            slot_data["hints"] = [_hint_to_json(hint) for hint in slot.hints]
+        slots.append(slot_data)
+
+    response.set_data(jsonify({
+        "version": version,
+        "full": previous is None,
+        "slots": slots,
+    }).get_data())
+    return response
+
+
+class _EventRelay:
+    """Checks the database for new RoomEvents once for all event streams of this process
+    and hands them to the streams of their room. Only runs while there are streams."""
+    listeners: Dict[int, Set["queue.SimpleQueue[Tuple[int, str]]"]]
+    streams: int
+
+    def __init__(self) -> None:
+        self.listeners = {}
+        self.streams = 0
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+
+    def subscribe(self, room_id: int, max_streams: int) -> Optional["queue.SimpleQueue[Tuple[int, str]]"]:
+        """Returns the queue of a new stream of room_id, or None if there are max_streams already."""
+        events: "queue.SimpleQueue[Tuple[int, str]]" = queue.SimpleQueue()
+        with self.lock:
+            if self.streams >= max_streams:
+                return None
+            self.streams += 1
+            self.listeners.setdefault(room_id, set()).add(events)
+            if not self.thread:
+                self.thread = threading.Thread(target=self.run, name="RoomEventRelay", daemon=True)
+                self.thread.start()
+        return events
+
+    def unsubscribe(self, room_id: int, events: "queue.SimpleQueue[Tuple[int, str]]") -> None:
+        with self.lock:
+            room_listeners = self.listeners.get(room_id, set())
+            if events in room_listeners:
+                self.streams -= 1
+                room_listeners.discard(events)
+            if not room_listeners:
+                self.listeners.pop(room_id, None)
+
+    def run(self) -> None:
+        with db_session:
+            last_id: int = pony_max(event.id for event in RoomEvent) or 0
+        while True:
+            time.sleep(EVENT_POLL_INTERVAL)
+            with self.lock:
+                if not self.listeners:
+                    # stop querying, the next subscribe starts a new thread
+                    self.thread = None
+                    return
+            try:
+                last_id = self.relay(last_id)
+            except Exception as e:
+                logging.exception(e)
+
+    def relay(self, last_id: int) -> int:
+        """Hands events newer than last_id to the streams of their room, returns the id of the newest event."""
+        with db_session:
+            new_events = select((event.id, event.room.id) for event in RoomEvent if event.id > last_id)[:]
+            if not new_events:
+                return last_id
+            with self.lock:
+                rooms = {room_id: set(self.listeners[room_id])
+                         for _, room_id in new_events if room_id in self.listeners}
+            for event_id, room_id in sorted(new_events):
+                if room_id in rooms:
+                    data = RoomEvent[event_id].data
+                    for events in rooms[room_id]:
+                        events.put((event_id, data))
+        return max(event_id for event_id, _ in new_events)
+
+
+_event_relay = _EventRelay()
+
+
+def _format_event(event_id: int, data: str) -> str:
+    return f"id: {event_id}\ndata: {data}\n\n"
+
+
+@api_endpoints.route('/tracker/<suuid:tracker>/events')
+def tracker_events(tracker: UUID) -> Response:
+    """Streams the changes of the room as server-sent events, each a JSON list of events published in a second.
+    An event of type "saved" means the room saved and the tracker reflects the events before it."""
+    room: Optional[Room] = Room.get(tracker=tracker)
+    if not room or app.config["TRACKER_EVENT_STREAMS"] <= 0:
+        return abort(404)
+    room_id: int = room.id
+    events = _event_relay.subscribe(room_id, app.config["TRACKER_EVENT_STREAMS"])
+    if events is None:
+        # each stream keeps a view thread busy, so they are limited. Trackers still refresh periodically.
+        response = Response("Too many tracker event streams.", status=503, mimetype="text/plain")
+        response.headers["Retry-After"] = str(EVENT_KEEP_ALIVE)
+        return response
+    last_event_id: Optional[int] = request.headers.get("Last-Event-ID", None, type=int)
+    missed: List[Tuple[int, str]] = []
+    if last_event_id is not None:
+        try:
+            missed = select((event.id, event.data) for event in RoomEvent
+                            if event.room == room and event.id > last_event_id).order_by(1)[:]
+        except BaseException:
+            _event_relay.unsubscribe(room_id, events)
+            raise
+
+    def stream() -> Iterator[str]:
+        last_sent = last_event_id or 0
+        for event_id, data in missed:
+            last_sent = event_id
+            yield _format_event(event_id, data)
+        while True:
+            try:
+                event_id, data = events.get(timeout=EVENT_KEEP_ALIVE)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            if event_id > last_sent:  # may have been sent already from the missed events
+                last_sent = event_id
+                yield _format_event(event_id, data)
+
+    response = Response(stream(), mimetype="text/event-stream")
+    # also called if the client disconnects before the stream started, unlike a finally in stream
+    response.call_on_close(functools.partial(_event_relay.unsubscribe, room_id, events))
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 import logging
 import multiprocessing
+import time
 import typing
 from datetime import timedelta, datetime
 from threading import Event, Thread
@@ -12,9 +13,17 @@ from uuid import UUID
 from pony.orm import db_session, select, commit
 
 from Utils import restricted_loads
+from . import notifications
 from .locker import Locker, AlreadyRunningException
 
 _stop_event = Event()
+# seconds between checks of the database that are not prompted by a notification, see notifications
+ROOM_CHECK_INTERVAL = 5
+GENERATION_CHECK_INTERVAL = 5
+# seconds between deletions of old RoomEvents and the age at which they are deleted,
+# event streams that reconnect later than that miss them, see WebHostLib.api.tracker
+EVENT_CLEANUP_INTERVAL = 60
+EVENT_LIFETIME = timedelta(minutes=5)
 
 
 def stop():
@@ -23,6 +32,7 @@ def stop():
     stop_event = _stop_event
     _stop_event = Event()  # new event for new threads
     stop_event.set()
+    notifications.wake_up()
 
 
 def handle_generation_success(seed_id):
@@ -86,6 +96,13 @@ def cleanup():
         logging.info(f"{rooms} Rooms, {seeds} Seeds and {slots} Slots have been deleted.")
 
 
+def cleanup_events():
+    """delete RoomEvents that live trackers have had time to receive"""
+    with db_session:
+        cutoff = datetime.utcnow() - EVENT_LIFETIME
+        select(event for event in RoomEvent if event.time < cutoff).delete(bulk=True)
+
+
 def autohost(config: dict):
     def keep_running():
         stop_event = _stop_event
@@ -98,7 +115,15 @@ def autohost(config: dict):
                     hosters.append(hoster)
                     hoster.start()
 
-                while not stop_event.wait(0.1):
+                last_event_cleanup = 0.0
+                while not stop_event.is_set():
+                    version = notifications.get_version(notifications.ROOMS)
+                    if time.monotonic() - last_event_cleanup > EVENT_CLEANUP_INTERVAL:
+                        last_event_cleanup = time.monotonic()
+                        try:
+                            cleanup_events()
+                        except Exception as e:
+                            logging.exception(e)
                     with db_session:
                         rooms = select(
                             room for room in Room if
@@ -107,6 +132,7 @@ def autohost(config: dict):
                             # we have to filter twice, as the per-room timeout can't currently be PonyORM transpiled.
                             if room.last_activity >= datetime.utcnow() - timedelta(seconds=room.timeout + 5):
                                 hosters[room.id.int % len(hosters)].start_room(room.id)
+                    notifications.wait(notifications.ROOMS, version, ROOM_CHECK_INTERVAL)
 
         except AlreadyRunningException:
             logging.info("Autohost reports as already running, not starting another.")
@@ -137,7 +163,8 @@ def autogen(config: dict):
                             commit()
                         select(generation for generation in Generation if generation.state == STATE_ERROR).delete()
 
-                    while not stop_event.wait(0.1):
+                    while not stop_event.is_set():
+                        version = notifications.get_version(notifications.GENERATIONS)
                         with db_session:
                             # for update locks the database row(s) during transaction, preventing writes from elsewhere
                             to_start = select(
@@ -145,6 +172,7 @@ def autogen(config: dict):
                                 if generation.state == STATE_QUEUED).for_update()
                             for generation in to_start:
                                 launch_generator(generator_pool, generation)
+                        notifications.wait(notifications.GENERATIONS, version, GENERATION_CHECK_INTERVAL)
         except AlreadyRunningException:
             logging.info("Autogen reports as already running, not starting another.")
 
@@ -200,6 +228,6 @@ class MultiworldInstance():
         self.process = None
 
 
-from .models import Room, Generation, STATE_QUEUED, STATE_STARTED, STATE_ERROR, db, Seed, Slot
+from .models import Room, RoomEvent, Generation, STATE_QUEUED, STATE_STARTED, STATE_ERROR, db, Seed, Slot
 from .customserver import run_server_process, get_static_server_data
 from .generate import gen_game
@@ -19,10 +19,13 @@ from pony.orm import commit, db_session, select
 
 import Utils
 
-from MultiServer import Context, server, auto_shutdown, ServerCommandProcessor, ClientMessageProcessor, load_server_cert
+from MultiServer import Context, server, auto_shutdown, ServerCommandProcessor, ClientMessageProcessor, \
+    load_server_cert, SavedState, apply_save_delta, build_name_tables
+from NetUtils import NetworkItem, encode
 from Utils import restricted_loads, cache_argsless
+from . import notifications
 from .locker import Locker
-from .models import Command, GameDataPackage, Room, db
+from .models import Command, GameDataPackage, Room, RoomEvent, SaveDelta, db
 
 
 class CustomClientMessageProcessor(ClientMessageProcessor):
@@ -59,6 +62,15 @@ class DBCommandProcessor(ServerCommandProcessor):
 
 class WebHostContext(Context):
     room_id: int
+    command_check_interval = 5
+    """seconds between checks for commands that are not prompted by a notification, see notifications"""
+    notified_command_check_interval = 30
+    """command_check_interval if notifications reach the processes on all machines"""
+    events: typing.List[dict]
+    """events for live trackers, that were not yet written to the database"""
+    item_name_tables: typing.Dict[typing.Tuple[str, str, str], Utils.NameTable]
+    """(game, checksum, Archipelago checksum) -> item names of static data packages, see get_static_server_data"""
+    location_name_tables: typing.Dict[typing.Tuple[str, str, str], Utils.NameTable]
 
     def __init__(self, static_server_data: dict, logger: logging.Logger):
         # static server data is used during _load_game_data to load required data,
@@ -71,6 +83,7 @@ class WebHostContext(Context):
         self.main_loop = asyncio.get_running_loop()
         self.video = {}
         self.tags = ["AP", "WebHost"]
+        self.events = []
 
     def __del__(self):
         try:
@@ -86,10 +99,24 @@ class WebHostContext(Context):
             setattr(self, key, value)
         self.non_hintable_names = collections.defaultdict(frozenset, self.non_hintable_names)
 
+    def get_name_tables(self, game: str) -> typing.Tuple[Utils.NameTable, Utils.NameTable]:
+        key = (game, self.gamespackage[game].get("checksum"), self.gamespackage.get("Archipelago", {}).get("checksum"))
+        if key in self.item_name_tables:
+            # static data package, the tables are shared with all rooms and hosters
+            return self.item_name_tables[key], self.location_name_tables[key]
+        # custom data package, the tables are only for this room
+        return super().get_name_tables(game)
+
     def listen_to_db_commands(self):
         cmdprocessor = DBCommandProcessor(self)
+        channel = notifications.room_channel(notifications.COMMANDS, self.room_id)
+        if notifications.reaches_all_machines():
+            check_interval = self.notified_command_check_interval
+        else:
+            check_interval = self.command_check_interval
 
         while not self.exit_event.is_set():
+            version = notifications.get_version(channel)
             with db_session:
                 commands = select(command for command in Command if command.room.id == self.room_id)
                 if commands:
@@ -97,7 +124,43 @@ class WebHostContext(Context):
                         self.main_loop.call_soon_threadsafe(cmdprocessor, command.commandtext)
                         command.delete()
                     commit()
-            time.sleep(5)
+            notifications.wait(channel, version, check_interval)
+        notifications.stop_listening(channel)
+
+    def publish_event(self, event: dict):
+        """Queues event to be streamed to live trackers, see WebHostLib.api.tracker."""
+        self.events.append(event)
+
+    def publish_events(self):
+        # one row per second at most, so a release of many locations doesn't become many writes
+        # old events are deleted by the autohost, see WebHostLib.autolauncher.cleanup_events
+        while not self.exit_event.is_set():
+            time.sleep(1)
+            events, self.events = self.events, []
+            if events:
+                try:
+                    with db_session:
+                        RoomEvent(room=Room.get(id=self.room_id), data=encode(events))
+                except Exception as e:
+                    # live trackers miss these events, but keep publishing later ones
+                    self.logger.exception(e)
+
+    def on_new_location_checks(self, team: int, slot: int, locations: typing.AbstractSet[int]):
+        super().on_new_location_checks(team, slot, locations)
+        self.publish_event({"type": "checks", "team": team, "slot": slot, "locations": sorted(locations)})
+
+    def on_new_items(self, team: int, slot: int, items: typing.Sequence[NetworkItem]):
+        super().on_new_items(team, slot, items)
+        self.publish_event({"type": "items", "team": team, "slot": slot, "items": list(items)})
+
+    def on_changed_hints(self, team: int, slot: int):
+        super().on_changed_hints(team, slot)
+        self.publish_event({"type": "hints", "team": team, "slot": slot, "hints": list(self.hints[team, slot])})
+
+    def on_client_status_change(self, team: int, slot: int):
+        super().on_client_status_change(team, slot)
+        self.publish_event({"type": "status", "team": team, "slot": slot,
+                            "status": self.client_game_state[team, slot]})
 
     @db_session
     def load(self, room_id: int):
@@ -147,19 +210,45 @@ class WebHostContext(Context):
     def init_save(self, enabled: bool = True):
         self.saving = enabled
         if self.saving:
-            savegame_data = Room.get(id=self.room_id).multisave
+            room = Room.get(id=self.room_id)
+            savegame_data = room.multisave
             if savegame_data:
-                self.set_save(restricted_loads(Room.get(id=self.room_id).multisave))
+                save_data = restricted_loads(savegame_data)
+                self.snapshot_size = len(savegame_data)
+                for delta in room.save_deltas.order_by(SaveDelta.id):
+                    apply_save_delta(save_data, restricted_loads(delta.data))
+                    self.journal_size += len(delta.data)
+                self.set_save(save_data)
             self._start_async_saving(atexit_save=False)
         threading.Thread(target=self.listen_to_db_commands, daemon=True).start()
+        threading.Thread(target=self.publish_events, daemon=True).start()
 
     @db_session
     def _save(self, exit_save: bool = False) -> bool:
-        room = Room.get(id=self.room_id)
-        room.multisave = pickle.dumps(self.get_save())
-        # saving only occurs on activity, so we can "abuse" this information to mark this as last_activity
-        if not exit_save:  # we don't want to count a shutdown as activity, which would restart the server again
-            room.last_activity = datetime.datetime.utcnow()
+        # like Context._save, only what changed is saved, until the deltas get larger than a full multisave
+        stored_data_changed, self.stored_data_changed = self.stored_data_changed, set()
+        saved_state = SavedState.of(self)
+        try:
+            room = Room.get(id=self.room_id)
+            if exit_save or self.journal_size >= self.snapshot_size:
+                room.multisave = pickle.dumps(self.get_save())
+                select(delta for delta in SaveDelta if delta.room == room).delete(bulk=True)
+                snapshot_size, journal_size = len(room.multisave), 0
+            else:
+                delta = SaveDelta(room=room, data=pickle.dumps(self.get_save_delta(self.saved_state,
+                                                                                   stored_data_changed)))
+                snapshot_size, journal_size = self.snapshot_size, self.journal_size + len(delta.data)
+            # saving only occurs on activity, so we can "abuse" this information to mark this as last_activity
+            if not exit_save:  # we don't want to count a shutdown as activity, which would restart the server again
+                room.last_activity = datetime.datetime.utcnow()
+            commit()
+            # trackers can load the new save now
+            self.publish_event({"type": "saved"})
+        except BaseException:
+            self.stored_data_changed |= stored_data_changed
+            raise
+        self.saved_state = saved_state
+        self.snapshot_size, self.journal_size = snapshot_size, journal_size
         return True
 
     def get_save(self) -> dict:
@@ -168,6 +257,16 @@ class WebHostContext(Context):
         return d
 
 
+def load_room_save(room: Room) -> typing.Optional[dict]:
+    """Returns the save data of room, including the deltas saved since its last full multisave."""
+    if not room.multisave:
+        return None
+    save_data = restricted_loads(room.multisave)
+    for delta in room.save_deltas.order_by(SaveDelta.id):
+        apply_save_delta(save_data, restricted_loads(delta.data))
+    return save_data
+
+
 def get_random_port():
     return random.randint(49152, 65535)
 
@@ -198,6 +297,18 @@ def get_static_server_data() -> dict:
         },
     }
 
+    # names by id, which would otherwise be built by each room, in files each hoster process maps
+    gamespackage = data["gamespackage"]
+    archipelago_package = gamespackage["Archipelago"]
+    item_name_tables = {}
+    location_name_tables = {}
+    for game, game_package in gamespackage.items():
+        key = game, game_package["checksum"], archipelago_package["checksum"]
+        item_name_tables[key], location_name_tables[key] = \
+            build_name_tables(game_package, archipelago_package if game != "Archipelago" else {})
+    data["item_name_tables"] = Utils.share_name_tables(item_name_tables, Utils.cache_path("name_tables"))
+    data["location_name_tables"] = Utils.share_name_tables(location_name_tables, Utils.cache_path("name_tables"))
+
     return data
 
 
@@ -239,6 +350,7 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
     # establish DB connection for multidata and multisave
     db.bind(**ponyconfig)
     db.generate_mapping(check_tables=False)
+    notifications.configure(ponyconfig)
 
     if "worlds" in sys.modules:
         raise Exception("Worlds system should not be loaded in the custom server.")
@@ -15,7 +15,7 @@ from BaseClasses import get_seed, seeddigits
 from Generate import PlandoOptions, handle_name
 from Main import main as ERmain
 from Utils import __version__
-from WebHostLib import app
+from WebHostLib import app, notifications
 from settings import ServerOptions, GeneratorOptions
 from worlds.alttp.EntranceRandomizer import parse_arguments
 from .check import get_yaml_data, roll_options
@@ -90,6 +90,7 @@ def start_generation(options: Dict[str, Union[dict, str]], meta: Dict[str, Any])
             state=STATE_QUEUED,
             owner=session["_id"])
         commit()
+        notifications.notify(notifications.GENERATIONS)
 
         return redirect(url_for("wait_seed", seed=gen.id))
     else:
@@ -135,6 +136,7 @@ def gen_game(gen_options: dict, meta: Optional[Dict[str, Any]] = None, owner=Non
                                                                        {"bosses", "items", "connections", "texts"}))
         erargs.skip_prog_balancing = False
         erargs.skip_output = False
+        erargs.profile_report = None
         erargs.csv_output = False
 
         name_counter = Counter()
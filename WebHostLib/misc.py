@@ -8,7 +8,7 @@ from pony.orm import count, commit, db_session
 from werkzeug.utils import secure_filename
 
 from worlds.AutoWorld import AutoWorldRegister
-from . import app, cache
+from . import app, cache, notifications
 from .models import Seed, Room, Command, UUID, uuid4
 
 
@@ -114,6 +114,7 @@ def new_room(seed: UUID):
         abort(404)
     room = Room(seed=seed, owner=session["_id"], tracker=uuid4())
     commit()
+    notifications.notify(notifications.ROOMS)
     return redirect(url_for("host_room", room=room.id))
 
 
@@ -163,6 +164,7 @@ def host_room_command(room: UUID):
         if cmd:
             Command(room=room, commandtext=cmd)
             commit()
+            notifications.notify(notifications.room_channel(notifications.COMMANDS, room.id))
     return redirect(url_for("host_room", room=room.id))
 
 
@@ -173,11 +175,14 @@ def host_room(room: UUID):
         return abort(404)
 
     now = datetime.datetime.utcnow()
+    timed_out = room.last_activity < now - datetime.timedelta(seconds=room.timeout)
     # indicate that the page should reload to get the assigned port
-    should_refresh = ((not room.last_port and now - room.creation_time < datetime.timedelta(seconds=3))
-                      or room.last_activity < now - datetime.timedelta(seconds=room.timeout))
+    should_refresh = (not room.last_port and now - room.creation_time < datetime.timedelta(seconds=3)) or timed_out
     with db_session:
         room.last_activity = now  # will trigger a spinup, if it's not already running
+    if timed_out:
+        commit()
+        notifications.notify(notifications.ROOMS)
 
     browser_tokens = "Mozilla", "Chrome", "Safari"
     automated = ("update" in request.args
@@ -26,6 +26,8 @@ class Room(db.Entity):
     commands = Set('Command')
     seed = Required('Seed', index=True)
     multisave = Optional(buffer, lazy=True)
+    save_deltas = Set('SaveDelta', cascade_delete=True)
+    events = Set('RoomEvent', cascade_delete=True)
     show_spoiler = Required(int, default=0)  # 0 -> never, 1 -> after completion, -> 2 always
     timeout = Required(int, default=lambda: 2 * 60 * 60)  # seconds since last activity to shutdown
     tracker = Optional(UUID, index=True)
@@ -33,6 +35,21 @@ class Room(db.Entity):
     last_port = Optional(int, default=lambda: 0)
 
 
+class SaveDelta(db.Entity):
+    """Changes to a Room's multisave since it was last saved in full, see MultiServer.Context.get_save_delta"""
+    id = PrimaryKey(int, auto=True)
+    room = Required(Room, index=True)
+    data = Required(buffer, lazy=True)
+
+
+class RoomEvent(db.Entity):
+    """Changes of a running Room for live trackers, see WebHostLib.customserver.WebHostContext.publish_event"""
+    id = PrimaryKey(int, auto=True)
+    room = Required(Room, index=True)
+    time = Required(datetime, default=lambda: datetime.utcnow(), index=True)
+    data = Required(LongStr)  # JSON list of the events published during one second
+
+
 class Seed(db.Entity):
     id = PrimaryKey(UUID, default=uuid4)
     rooms = Set(Room)
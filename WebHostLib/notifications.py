@@ -0,0 +1,266 @@
+"""Wakes up the loops that wait for changes in the database, like autohost and autogen, when something changed.
+
+With PostgreSQL, LISTEN/NOTIFY reaches every process using the database. Otherwise, a file per channel is replaced on
+each notification, which reaches every process on the same machine. Waiters still check the database after a timeout,
+as changes made on other machines or by older versions are not notified."""
+from __future__ import annotations
+
+import abc
+import collections
+import logging
+import os
+import threading
+import time
+import typing
+from uuid import UUID
+
+import Utils
+
+ROOMS = "ap_rooms"
+"""a room should be started"""
+GENERATIONS = "ap_generations"
+"""a generation was queued"""
+COMMANDS = "ap_commands"
+"""a command was queued for a room, use with room_channel"""
+
+
+def room_channel(channel: str, room_id: UUID) -> str:
+    """Returns the channel of a single room, so the hosts of other rooms aren't woken up by its notifications."""
+    return f"{channel}_{room_id.hex}"
+
+
+class Notifier(abc.ABC):
+    """Counts the notifications of each channel received by this process, so waiters can tell if they missed one."""
+    versions: typing.Counter[str]
+    channels: typing.Set[str]
+    reaches_all_machines: bool = False
+    """if notifications reach the processes on other machines, otherwise waiters should check the database often"""
+
+    def __init__(self) -> None:
+        self.versions = collections.Counter()
+        self.channels = set()
+        self.wake_ups = 0
+        self.condition = threading.Condition()
+        self.thread: typing.Optional[threading.Thread] = None
+
+    @abc.abstractmethod
+    def notify(self, channel: str) -> None:
+        """Notifies the waiters of channel in all processes. Call after the change was committed."""
+
+    @abc.abstractmethod
+    def listen(self, channel: str) -> None:
+        """Starts receiving notifications of channel, called with the condition held."""
+
+    @abc.abstractmethod
+    def unlisten(self, channel: str) -> None:
+        """Stops receiving notifications of channel, called with the condition held."""
+
+    @abc.abstractmethod
+    def run(self) -> None:
+        """Receives notifications of the listened channels and calls received for each."""
+
+    def received(self, *channels: str) -> None:
+        with self.condition:
+            self.versions.update(channels)
+            self.condition.notify_all()
+
+    def get_version(self, channel: str) -> int:
+        """Returns the version of channel to pass to wait, get it before checking the database."""
+        with self.condition:
+            if channel not in self.channels:
+                try:
+                    self.listen(channel)
+                except Exception as e:
+                    logging.exception(e)  # run retries, waits end by timeout until then
+                self.channels.add(channel)
+            if not self.thread:
+                self.thread = threading.Thread(target=self.run, name="NotificationListener", daemon=True)
+                self.thread.start()
+            return self.versions[channel]
+
+    def stop_listening(self, channel: str) -> None:
+        """Stops receiving notifications of channel, for channels that are no longer waited on, like a closed room's."""
+        with self.condition:
+            if channel in self.channels:
+                self.channels.remove(channel)
+                del self.versions[channel]
+                try:
+                    self.unlisten(channel)
+                except Exception as e:
+                    logging.exception(e)
+
+    def wait(self, channel: str, version: int, timeout: float) -> bool:
+        """Waits up to timeout seconds for a notification of channel after version, or until wake_up is called.
+        Returns if there was a notification."""
+        with self.condition:
+            wake_ups = self.wake_ups
+            self.condition.wait_for(lambda: self.versions[channel] != version or self.wake_ups != wake_ups, timeout)
+            return self.versions[channel] != version
+
+    def wake_up(self) -> None:
+        """Ends all current waits of this process, for example to let them see a stop event."""
+        with self.condition:
+            self.wake_ups += 1
+            self.condition.notify_all()
+
+
+class FileNotifier(Notifier):
+    """Replaces a file per channel to notify, and checks the files for changes to receive."""
+    folder: str
+    check_interval = 0.1
+    stats: typing.Dict[str, typing.Optional[typing.Tuple[int, int]]]
+
+    def __init__(self, folder: typing.Optional[str] = None) -> None:
+        super().__init__()
+        self.folder = folder or Utils.cache_path("file_notifications")
+        self.stats = {}
+
+    def _stat(self, channel: str) -> typing.Optional[typing.Tuple[int, int]]:
+        try:
+            stat = os.stat(os.path.join(self.folder, channel))
+        except FileNotFoundError:
+            return None
+        # replacing creates a new file, so the inode changes even if the time doesn't
+        return stat.st_ino, stat.st_mtime_ns
+
+    def notify(self, channel: str) -> None:
+        os.makedirs(self.folder, exist_ok=True)
+        path = os.path.join(self.folder, channel)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}"
+        with open(temp_path, "wb"):
+            pass
+        os.replace(temp_path, path)
+
+    def listen(self, channel: str) -> None:
+        self.stats[channel] = self._stat(channel)
+
+    def unlisten(self, channel: str) -> None:
+        del self.stats[channel]
+        try:
+            os.remove(os.path.join(self.folder, channel))
+        except FileNotFoundError:
+            pass
+
+    def run(self) -> None:
+        while True:
+            time.sleep(self.check_interval)
+            with self.condition:
+                changed = []
+                for channel in self.channels:
+                    stat = self._stat(channel)
+                    if stat != self.stats[channel]:
+                        self.stats[channel] = stat
+                        changed.append(channel)
+                if changed:
+                    self.received(*changed)
+
+
+class PostgresNotifier(Notifier):
+    """Uses LISTEN/NOTIFY of PostgreSQL, on a connection of its own."""
+    reaches_all_machines = True
+    reconnect_interval = 5
+
+    def __init__(self, pony_config: typing.Dict[str, typing.Any]) -> None:
+        super().__init__()
+        self.connection_args = {key: value for key, value in pony_config.items() if key != "provider"}
+        self.connection: typing.Any = None
+
+    def notify(self, channel: str) -> None:
+        from pony.orm import db_session
+        from .models import db
+
+        with db_session:
+            db.execute(f"NOTIFY {channel}")
+
+    def listen(self, channel: str) -> None:
+        if not self.connection:
+            import psycopg2.extensions
+            self.connection = psycopg2.connect(**self.connection_args)
+            self.connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {channel}")
+
+    def unlisten(self, channel: str) -> None:
+        if self.connection:  # otherwise run reconnects, without this channel
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"UNLISTEN {channel}")
+
+    def run(self) -> None:
+        import select
+
+        while True:
+            try:
+                if select.select([self.connection], [], [], self.reconnect_interval)[0]:
+                    self.connection.poll()
+                    channels = [notification.channel for notification in self.connection.notifies]
+                    self.connection.notifies.clear()
+                    self.received(*channels)
+            except Exception as e:
+                logging.exception(e)
+                time.sleep(self.reconnect_interval)
+                try:
+                    with self.condition:
+                        self.connection = None
+                        for channel in self.channels:
+                            self.listen(channel)
+                except Exception as e:
+                    logging.exception(e)
+                else:
+                    # notifications during the reconnect were lost
+                    self.received(*list(self.channels))
+
+
+_pony_config: typing.Dict[str, typing.Any] = {}
+_notifier: typing.Optional[Notifier] = None
+_notifier_pid: typing.Optional[int] = None
+
+
+def configure(pony_config: typing.Dict[str, typing.Any]) -> None:
+    """Chooses how to notify based on the database in use."""
+    global _pony_config, _notifier
+    _pony_config = pony_config
+    _notifier = None
+
+
+def get_notifier() -> Notifier:
+    global _notifier, _notifier_pid
+    if not _notifier or _notifier_pid != os.getpid():  # a forked process can't use its parent's thread and connection
+        _notifier = PostgresNotifier(_pony_config) if _pony_config.get("provider") == "postgres" else FileNotifier()
+        _notifier_pid = os.getpid()
+    return _notifier
+
+
+def notify(channel: str) -> None:
+    """Notifies the waiters of channel in all processes. Call after the change was committed."""
+    try:
+        get_notifier().notify(channel)
+    except Exception as e:
+        # waiters will still find the change eventually
+        logging.exception(e)
+
+
+def get_version(channel: str) -> int:
+    """Returns the version of channel to pass to wait, get it before checking the database."""
+    return get_notifier().get_version(channel)
+
+
+def stop_listening(channel: str) -> None:
+    """Stops receiving notifications of channel, for channels that are no longer waited on, like a closed room's."""
+    get_notifier().stop_listening(channel)
+
+
+def reaches_all_machines() -> bool:
+    """Returns if notifications reach the processes on other machines, otherwise waiters should check the database
+    often."""
+    return get_notifier().reaches_all_machines
+
+
+def wait(channel: str, version: int, timeout: float) -> bool:
+    """Waits up to timeout seconds for a notification of channel after version, or until wake_up is called.
+    Returns if there was a notification."""
+    return get_notifier().wait(channel, version, timeout)
+
+
+def wake_up() -> None:
+    """Ends all current waits of this process, for example to let them see a stop event."""
+    get_notifier().wake_up()
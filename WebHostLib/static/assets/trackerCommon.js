@@ -169,6 +169,19 @@ window.addEventListener('load', () => {
     }
     let updater = setTimeout(update, getSleepTimeSeconds() * 1000);
 
+    // Refresh as soon as the room saved, if the host enabled event streams. The timer above stays as a fallback.
+    const trackerWrapper = document.getElementById('tracker-wrapper');
+    const tracker = trackerWrapper.getAttribute('data-tracker');
+    if (tracker && trackerWrapper.getAttribute('data-events') === "True" && window.EventSource) {
+        const events = new EventSource(`/api/tracker/${tracker.split('/')[0]}/events`);
+        events.addEventListener('message', (event) => {
+            if (JSON.parse(event.data).some((roomEvent) => roomEvent.type === "saved")) {
+                clearTimeout(updater);
+                update();
+            }
+        });
+    }
+
     window.addEventListener('resize', () => {
         adjustTableHeight();
         tables.draw();
@@ -1,5 +1,7 @@
 import datetime
 import collections
+import functools
+import threading
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Optional, Set, Tuple, NamedTuple, Counter
 from uuid import UUID
@@ -10,14 +12,19 @@ from werkzeug.exceptions import abort
 
 from MultiServer import Context, get_saving_second
 from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType
-from Utils import restricted_loads, KeyedDefaultDict
+from Utils import restricted_loads, KeyedDefaultDict, NameTable
 from . import app, cache
-from .models import GameDataPackage, Room
+from .customserver import load_room_save
+from .models import GameDataPackage, Room, Seed
 
 # Multisave is currently updated, at most, every minute.
 TRACKER_CACHE_TIMEOUT_IN_SECONDS = 60
+# Decoded data is shared by all trackers of this process, up to these sizes of its uncompressed pickles.
+# The decoded objects take several times the size of their pickle in memory.
+MULTIDATA_CACHE_PICKLE_BYTES = 16 * 1024 * 1024
+DATAPACKAGE_CACHE_PICKLE_BYTES = 16 * 1024 * 1024
+MULTISAVE_CACHE_PICKLE_BYTES = 16 * 1024 * 1024
 
-_multidata_cache = {}
 _multiworld_trackers: Dict[str, Callable] = {}
 _player_trackers: Dict[str, Callable] = {}
 
@@ -41,6 +48,89 @@ def _cache_results(func: Callable) -> Callable:
     return method_wrapper
 
 
+class LRUCache:
+    """Keeps the most recently used values, until their total size exceeds max_size.
+    Values are shared by all threads, so they must not be changed after they were loaded."""
+    max_size: int
+    size: int
+    entries: "collections.OrderedDict[Any, Tuple[Any, Any, int]]"
+    """key -> (version, value, size)"""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.size = 0
+        self.entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def find(self, key: Any, version: Any = None) -> Any:
+        """Returns the value of key if it's cached for version, otherwise None."""
+        with self._lock:
+            entry = self.entries.get(key, None)
+            if entry and entry[0] == version:
+                self.entries.move_to_end(key)
+                return entry[1]
+        return None
+
+    def get(self, key: Any, load: Callable[[], Tuple[Any, int]], version: Any = None) -> Any:
+        """Returns the value of key, or loads it if it's not cached or was cached for a different version.
+        load returns the value and its size."""
+        value = self.find(key, version)
+        if value is not None:
+            return value
+
+        value, size = load()
+        with self._lock:
+            entry = self.entries.pop(key, None)
+            if entry:
+                self.size -= entry[2]
+            self.entries[key] = version, value, size
+            self.size += size
+            while self.size > self.max_size and len(self.entries) > 1:
+                self.size -= self.entries.popitem(last=False)[1][2]
+        return value
+
+
+class _DataPackageTables(NamedTuple):
+    item_id_to_name: NameTable
+    location_id_to_name: NameTable
+    item_name_to_id: Dict[str, int]
+    location_name_to_id: Dict[str, int]
+
+
+def _load_multidata(seed: Seed) -> Tuple[Dict[str, Any], int]:
+    data = Context.decompress_pickle(seed.multidata)
+    return restricted_loads(data), len(data)
+
+
+def _load_datapackage_tables(checksum: str) -> Tuple[_DataPackageTables, int]:
+    data = GameDataPackage.get(checksum=checksum).data
+    game_package = restricted_loads(data)
+    # NameTable doesn't insert unknown ids on lookup, so the shared tables stay unchanged
+    return _DataPackageTables(
+        NameTable.build({id: name for name, id in game_package["item_name_to_id"].items()},
+                        "Unknown Item (ID: {})"),
+        NameTable.build({id: name for name, id in game_package["location_name_to_id"].items()},
+                        "Unknown Location (ID: {})"),
+        game_package["item_name_to_id"],
+        game_package["location_name_to_id"],
+    ), len(data)
+
+
+def _load_multisave(room: Room) -> Tuple[Dict[str, Any], int]:
+    # the deltas are small compared to the multisave
+    return load_room_save(room) or {}, len(room.multisave or b"")
+
+
+# The cached values are shared by all trackers and threads of this process, so they are read-only:
+# TrackerData and the tracker views must copy anything they change.
+_multidata_cache = LRUCache(MULTIDATA_CACHE_PICKLE_BYTES)
+"""seed id -> multidata"""
+_datapackage_cache = LRUCache(DATAPACKAGE_CACHE_PICKLE_BYTES)
+"""checksum -> _DataPackageTables"""
+_multisave_cache = LRUCache(MULTISAVE_CACHE_PICKLE_BYTES)
+"""room id -> save data, for the last_activity of the room it was loaded at, which changes with each save"""
+
+
 @dataclass
 class TrackerData:
     """A helper dataclass that is instantiated each time an HTTP request comes in for tracker data.
@@ -56,8 +146,8 @@ class TrackerData:
     def __init__(self, room: Room):
         """Initialize a new RoomMultidata object for the current room."""
         self.room = room
-        self._multidata = Context.decompress(room.seed.multidata)
-        self._multisave = restricted_loads(room.multisave) if room.multisave else {}
+        self._multidata = _multidata_cache.get(room.seed.id, functools.partial(_load_multidata, room.seed))
+        self._multisave = _multisave_cache.get(room.id, functools.partial(_load_multisave, room), room.last_activity)
         self._tracker_cache = {}
 
         self.item_name_to_id: Dict[str, Dict[str, int]] = {}
@@ -71,15 +161,14 @@ class TrackerData:
             game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Location (ID: {code})")
         })
         for game, game_package in self._multidata["datapackage"].items():
-            game_package = restricted_loads(GameDataPackage.get(checksum=game_package["checksum"]).data)
-            self.item_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})", {
-                id: name for name, id in game_package["item_name_to_id"].items()})
-            self.location_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})", {
-                id: name for name, id in game_package["location_name_to_id"].items()})
+            checksum = game_package["checksum"]
+            tables = _datapackage_cache.get(checksum, functools.partial(_load_datapackage_tables, checksum))
+            self.item_id_to_name[game] = tables.item_id_to_name
+            self.location_id_to_name[game] = tables.location_id_to_name
 
             # Normal lookup tables as well.
-            self.item_name_to_id[game] = game_package["item_name_to_id"]
-            self.location_name_to_id[game] = game_package["location_name_to_id"]
+            self.item_name_to_id[game] = tables.item_name_to_id
+            self.location_name_to_id[game] = tables.location_name_to_id
 
     def get_seed_name(self) -> str:
         """Retrieves the seed name."""
@@ -0,0 +1,232 @@
+"""Optional profiling of a generation, enabled through Generate.py --profile_report. Records wall time per phase, per
+World stage call and per access rule, as well as how often reachability is checked, and writes it to a report."""
+from __future__ import annotations
+
+import functools
+import html
+import json
+import time
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING, Tuple, Union
+
+from BaseClasses import CollectionState, Entrance, Location, Region
+
+if TYPE_CHECKING:
+    from BaseClasses import MultiWorld
+
+__all__ = ["GenerationProfile", "enter_phase"]
+
+counted_methods: Tuple[Tuple[type, str], ...] = (
+    (Region, "can_reach"),
+    (Location, "can_reach"),
+    (Entrance, "can_reach"),
+    (CollectionState, "update_reachable_regions"),
+)
+
+
+class _TimedRule:
+    """Stands in for the access rule of a Location or Entrance while rules are timed."""
+    __slots__ = ("rule", "spot", "calls", "seconds")
+
+    rule: Callable[[CollectionState], bool]
+    spot: Union[Location, Entrance]
+    calls: int
+    seconds: float
+
+    def __init__(self, rule: Callable[[CollectionState], bool], spot: Union[Location, Entrance]) -> None:
+        self.rule = rule
+        self.spot = spot
+        self.calls = 0
+        self.seconds = 0.0
+
+    def __call__(self, state: CollectionState) -> bool:
+        start = time.perf_counter()
+        try:
+            return self.rule(state)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.calls += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        rule = self.rule
+        code = getattr(rule, "__code__", None)
+        multiworld = self.spot.parent_region.multiworld if self.spot.parent_region else None
+        return {
+            "spot": self.spot.name,
+            "type": type(self.spot).__name__,
+            "player": self.spot.player,
+            "game": multiworld.game[self.spot.player] if multiworld else None,
+            "rule": getattr(rule, "__qualname__", type(rule).__qualname__),
+            "source": f"{code.co_filename}:{code.co_firstlineno}" if code else None,
+            "calls": self.calls,
+            "seconds": self.seconds,
+        }
+
+
+class GenerationProfile:
+    """Collects timings of a single generation. Use as context manager around the generation, to count reachability
+    checks for its duration. Counts may be slightly low for phases that check reachability on several threads."""
+    top_rules: int
+    """number of slowest access rules to include in the report"""
+    phases: Dict[str, float]
+    """phase name -> seconds, in order of the phases"""
+    calls: Dict[str, Counter[str]]
+    """phase name -> counted method name -> number of calls"""
+    player_stages: Dict[int, Dict[str, float]]
+    """player -> World method name -> seconds"""
+    world_type_stages: Dict[str, Dict[str, float]]
+    """game -> stage method name -> seconds"""
+
+    _phase: str
+    _phase_start: float
+    _timed_rules: List[_TimedRule]
+    _slowest_rules: List[_TimedRule]
+    _originals: List[Tuple[type, str, Callable[..., Any]]]
+
+    def __init__(self, top_rules: int = 50) -> None:
+        self.top_rules = top_rules
+        self.phases = {}
+        self.calls = defaultdict(Counter)
+        self.player_stages = defaultdict(lambda: defaultdict(float))
+        self.world_type_stages = defaultdict(lambda: defaultdict(float))
+        self._timed_rules = []
+        self._slowest_rules = []
+        self._originals = []
+        self._phase_start = time.perf_counter()
+        self._phase = "setup"
+
+    def __enter__(self) -> GenerationProfile:
+        try:
+            for cls, method_name in counted_methods:
+                method = cls.__dict__[method_name]
+                self._originals.append((cls, method_name, method))
+                setattr(cls, method_name, self._counted(f"{cls.__name__}.{method_name}", method))
+        except BaseException:
+            self._restore_methods()
+            raise
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        try:
+            self.stop_rule_timing()
+            self.end_phase()
+        finally:
+            self._restore_methods()
+
+    def _restore_methods(self) -> None:
+        for cls, method_name, method in self._originals:
+            setattr(cls, method_name, method)
+        self._originals.clear()
+
+    def _counted(self, name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+        calls = self.calls
+
+        @functools.wraps(method)
+        def counted(*args: Any, **kwargs: Any) -> Any:
+            calls[self._phase][name] += 1
+            return method(*args, **kwargs)
+
+        return counted
+
+    def enter_phase(self, name: str) -> None:
+        """Ends the current phase and starts the named one."""
+        now = time.perf_counter()
+        self.phases[self._phase] = self.phases.get(self._phase, 0.0) + now - self._phase_start
+        self._phase = name
+        self._phase_start = now
+
+    def end_phase(self) -> None:
+        """Ends the current phase, which has to be done before writing the report."""
+        if self._phase:
+            self.enter_phase("")
+
+    def add_call(self, method: Callable[..., Any], seconds: float, player: Optional[int] = None) -> None:
+        """Records the time taken by a World method of player, or by a stage method of a World type."""
+        if player:
+            self.player_stages[player][method.__name__] += seconds
+        else:
+            game = getattr(getattr(method, "__self__", None), "game", "")
+            self.world_type_stages[game][method.__name__] += seconds
+
+    def start_rule_timing(self, multiworld: MultiWorld) -> None:
+        """Times the access rules of all Locations and Entrances, until stop_rule_timing."""
+        for spot in [*multiworld.get_locations(), *multiworld.get_entrances()]:
+            timed_rule = _TimedRule(spot.access_rule, spot)
+            spot.access_rule = timed_rule
+            self._timed_rules.append(timed_rule)
+
+    def stop_rule_timing(self) -> None:
+        for timed_rule in self._timed_rules:
+            spot = timed_rule.spot
+            # leave rules alone that were replaced while timing, the new rule may be calling the timed one
+            if spot.access_rule is timed_rule:
+                spot.access_rule = timed_rule.rule
+        if self._timed_rules:
+            self._slowest_rules = sorted((timed_rule for timed_rule in self._timed_rules if timed_rule.calls),
+                                         key=lambda timed_rule: timed_rule.seconds, reverse=True)[:self.top_rules]
+            self._timed_rules.clear()
+
+    def to_dict(self, multiworld: MultiWorld) -> Dict[str, Any]:
+        return {
+            "seed": multiworld.seed_name,
+            "total": sum(self.phases.values()),
+            "phases": self.phases,
+            "calls": {phase: dict(calls) for phase, calls in self.calls.items()},
+            "players": {
+                player: {
+                    "name": multiworld.player_name[player],
+                    "game": multiworld.game[player],
+                    "total": sum(self.player_stages[player].values()),
+                    "stages": dict(self.player_stages[player]),
+                } for player in multiworld.player_ids
+            },
+            "world_types": {game: dict(stages) for game, stages in self.world_type_stages.items()},
+            "slowest_rules": [timed_rule.to_dict() for timed_rule in self._slowest_rules],
+        }
+
+    def write(self, path: str, multiworld: MultiWorld) -> None:
+        """Writes the report as HTML if path ends in .html, otherwise as JSON."""
+        report = self.to_dict(multiworld)
+        with open(path, "w", encoding="utf-8") as f:
+            if path.lower().endswith(".html"):
+                f.write(_to_html(report))
+            else:
+                json.dump(report, f, indent=2)
+
+
+def enter_phase(multiworld: MultiWorld, name: str) -> None:
+    """Starts the named phase in the profile of multiworld, if it is being profiled."""
+    if multiworld.profile:
+        multiworld.profile.enter_phase(name)
+
+
+def _table(headers: List[str], rows: List[List[Any]]) -> str:
+    def cell(value: Any) -> str:
+        return html.escape(f"{value:.4f}" if isinstance(value, float) else str(value))
+
+    return "<table><tr>" + "".join(f"<th>{cell(header)}</th>" for header in headers) + "</tr>" + "".join(
+        "<tr>" + "".join(f"<td>{cell(value)}</td>" for value in row) + "</tr>" for row in rows) + "</table>"
+
+
+def _to_html(report: Dict[str, Any]) -> str:
+    stage_names = list(dict.fromkeys(stage for player in report["players"].values() for stage in player["stages"]))
+    counted_names = [f"{cls.__name__}.{method_name}" for cls, method_name in counted_methods]
+    sections = [
+        ("Phases", _table(["Phase", "Seconds"], [[phase, seconds] for phase, seconds in report["phases"].items()])),
+        ("Reachability checks", _table(["Phase", *counted_names], [
+            [phase, *(calls.get(name, 0) for name in counted_names)] for phase, calls in report["calls"].items()])),
+        ("Players", _table(["Player", "Name", "Game", "Total", *stage_names], [
+            [player, data["name"], data["game"], data["total"],
+             *(data["stages"].get(stage, 0.0) for stage in stage_names)]
+            for player, data in sorted(report["players"].items(), key=lambda item: item[1]["total"], reverse=True)])),
+        ("World types", _table(["Game", "Stage", "Seconds"], [
+            [game, stage, seconds]
+            for game, stages in report["world_types"].items() for stage, seconds in stages.items()])),
+        ("Slowest access rules", _table(["Spot", "Type", "Player", "Game", "Rule", "Source", "Calls", "Seconds"], [
+            list(rule.values()) for rule in report["slowest_rules"]])),
+    ]
+    title = f"Generation Profile {html.escape(report['seed'])}"
+    return (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{title}</title>"
+            f"</head><body><h1>{title}</h1>"
+            f"<p>Total: {report['total']:.4f} seconds</p>" +
+            "".join(f"<h2>{title}</h2>{table}" for title, table in sections) + "</body></html>")
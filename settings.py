@@ -597,6 +597,12 @@ class ServerOptions(Group):
         OFF = 0
         ON = 1
 
+    class WorkerProcesses(int):
+        """
+        Number of processes to run CPU heavy parts of commands in, like name matching for !hint,
+        so other players don't have to wait for them. 0 to run them in the server process.
+        """
+
     host: Optional[str] = None
     port: int = 38281
     password: Optional[str] = None
@@ -615,6 +621,7 @@ class ServerOptions(Group):
     auto_shutdown: AutoShutdown = AutoShutdown(0)
     compatibility: Compatibility = Compatibility(2)
     log_network: LogNetwork = LogNetwork(0)
+    worker_processes: WorkerProcesses = WorkerProcesses(0)
 
 
 class GeneratorOptions(Group):
@@ -674,6 +681,12 @@ class GeneratorOptions(Group):
         start_inventory -> Move remaining items to start_inventory, generate additional filler items to fill locations.
         """
 
+    class FastFill(Bool):
+        """
+        Only check reachability of each location once per fill step iteration, instead of once per item.
+        Placements may differ from a regular fill with the same seed, but are still valid.
+        """
+
     enemizer_path: EnemizerPath = EnemizerPath("EnemizerCLI/EnemizerCLI.Core")  # + ".exe" is implied on Windows
     player_files_path: PlayerFilesPath = PlayerFilesPath("Players")
     players: Players = Players(0)
@@ -683,6 +696,7 @@ class GeneratorOptions(Group):
     race: Race = Race(0)
     plando_options: PlandoOptions = PlandoOptions("bosses, connections, texts")
     panic_method: PanicMethod = PanicMethod("swap")
+    fast_fill: Union[FastFill, bool] = False
     loglevel: str = "info"
     logtime: bool = False
 
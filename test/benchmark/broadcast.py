@@ -0,0 +1,79 @@
+def run_broadcast_benchmark():
+    """Compares encoding the same messages for every client of a room with encoding them once and sharing the result,
+    which is what MultiServer's broadcasts do."""
+    import asyncio
+    import logging
+    import types
+    import typing
+    from unittest import mock
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from MultiServer import Client, Context, json_format_send_event
+    from NetUtils import NetworkItem
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    class BenchmarkRunner:
+        clients: int = 1000
+        rounds: int = 3
+        """number of times each broadcast is done"""
+
+        def __init__(self) -> None:
+            self.ctx = Context("", 0, "", "", 0, 0, False)
+            self.ctx.clients[0] = {}
+            for slot in range(1, self.clients + 1):
+                socket = types.SimpleNamespace(open=True, remote_address=("127.0.0.1", slot),
+                                               transport=types.SimpleNamespace(get_write_buffer_size=lambda: 0))
+                client = Client(socket, self.ctx)
+                client.auth = True
+                client.team = 0
+                client.slot = slot
+                client.no_text = False
+                self.ctx.clients[0][slot] = [client]
+                self.ctx.endpoints.append(client)
+
+        def per_client(self, msgs: typing.List[dict]) -> int:
+            """Encodes msgs for each client, like sending to each of them one at a time did."""
+            size = 0
+            for _ in range(self.rounds):
+                for endpoint in self.ctx.endpoints:
+                    size += len(self.ctx.dumper(msgs))
+            return size
+
+        def broadcast(self, msgs: typing.List[dict]) -> int:
+            """Broadcasts msgs to the room, including merging the queued messages of each client into its frame."""
+            sent: typing.List[str] = []
+            with mock.patch("websockets.broadcast", lambda sockets, msg: sent.append(msg)):
+                for _ in range(self.rounds):
+                    self.ctx.broadcast_team(0, msgs)
+                    self.ctx._send_outgoing()
+            return sum(len(msg) for msg in sent)
+
+        async def main(self):
+            # one chunk of item send texts, as register_location_checks broadcasts them during a release
+            item_sends = [json_format_send_event(NetworkItem(item, 1000 + item, 1, 0b001), item % self.clients + 1)
+                          for item in range(140)]
+            chat = [{"cmd": "PrintJSON", "data": [{"text": "Tester1: " + "hello " * 20}], "type": "Chat"}]
+            for name, msgs in (("item sends", item_sends), ("chat", chat)):
+                with TimeIt(f"{name} encoded per client", logger) as per_client:
+                    per_client_size = self.per_client(msgs)
+                with TimeIt(f"{name} broadcast", logger) as broadcast:
+                    broadcast_size = self.broadcast(msgs)
+                if per_client_size != broadcast_size:
+                    logger.warning(f"{name}: {per_client_size} characters encoded per client, "
+                                   f"but {broadcast_size} broadcast.")
+                logger.info(f"{name} to {self.clients} clients {self.rounds} times: "
+                            f"{per_client.dif:.4f} seconds encoded per client, {broadcast.dif:.4f} seconds broadcast "
+                            f"({per_client.dif / max(broadcast.dif, 1e-9):.2f}x).")
+
+    runner = BenchmarkRunner()
+    asyncio.run(runner.main())
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_broadcast_benchmark()
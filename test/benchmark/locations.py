@@ -48,6 +48,36 @@ def run_locations_benchmark():
                 gc.collect()
             return t.dif
 
+        def item_test(self, game: str, multiworld: MultiWorld) -> None:
+            """Compares has() on Counter backed prog_items with has() and has_index() on indexed item counts."""
+            world = multiworld.worlds[1]
+            counter_state = multiworld.get_all_state(False)
+            world.indexed_item_counts = True
+            indexed_state = multiworld.get_all_state(False)
+            world.indexed_item_counts = False
+            item_names = sorted(counter_state.prog_items[1])
+            item_indices = [world.item_index.get(item_name) for item_name in item_names]
+            iterations = max(1, self.rule_iterations // max(1, len(item_names)))
+            with TimeIt(f"{game} {iterations} runs of has() on {len(item_names)} items with Counter", logger) as t:
+                for _ in range(iterations):
+                    for item_name in item_names:
+                        counter_state.has(item_name, 1)
+            counter_time = t.dif
+            with TimeIt(f"{game} {iterations} runs of has() on {len(item_names)} items with indexed item counts",
+                        logger) as t:
+                for _ in range(iterations):
+                    for item_name in item_names:
+                        indexed_state.has(item_name, 1)
+            indexed_name_time = t.dif
+            with TimeIt(f"{game} {iterations} runs of has_index() on {len(item_names)} items with indexed item counts",
+                        logger) as t:
+                for _ in range(iterations):
+                    for item_index in item_indices:
+                        indexed_state.has_index(item_index, 1)
+            indexed_time = t.dif
+            logger.info(f"{game} item checks: {counter_time:.4f} Counter has(), {indexed_name_time:.4f} indexed has(), "
+                        f"{indexed_time:.4f} indexed has_index()")
+
         def main(self):
             for game in sorted(AutoWorld.AutoWorldRegister.world_types):
                 summary_data: typing.Dict[str, collections.Counter[str]] = {
@@ -96,6 +126,8 @@ def run_locations_benchmark():
                     logger.info(f"Top times in all_state:\n"
                                 f"{self.format_times_from_counter(summary_data['all_state'])}")
 
+                    self.item_test(game, multiworld)
+
                 except Exception as e:
                     logger.exception(e)
 
@@ -0,0 +1,98 @@
+def run_reachability_benchmark():
+    """Compares sweep time of full and incremental reachability updates on multiworlds with many players per game.
+    Incremental reachability is forced on for every game with explicit indirect conditions, so results of worlds whose
+    rules do not fulfill the requirements of World.incremental_reachability are only indicative."""
+    import argparse
+    import gc
+    import logging
+    import random
+    import typing
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from BaseClasses import MultiWorld, CollectionState, Item
+    from worlds import AutoWorld
+    from worlds.AutoWorld import call_all
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    class BenchmarkRunner:
+        gen_steps: typing.Tuple[str, ...] = (
+            "generate_early",
+            "create_regions",
+            "create_items",
+            "set_rules",
+            "connect_entrances",
+            "generate_basic",
+            "pre_fill",
+        )
+
+        players: int = 20
+
+        def setup_multiworld(self, game: str) -> MultiWorld:
+            multiworld = MultiWorld(self.players)
+            multiworld.game = {player: game for player in multiworld.player_ids}
+            multiworld.player_name = {player: f"Tester{player}" for player in multiworld.player_ids}
+            multiworld.set_seed(0)
+            multiworld.state = CollectionState(multiworld)
+            args = argparse.Namespace()
+            for name, option in AutoWorld.AutoWorldRegister.world_types[game].options_dataclass.type_hints.items():
+                setattr(args, name, {
+                    player: option.from_any(getattr(option, "default")) for player in multiworld.player_ids
+                })
+            multiworld.set_options(args)
+            for step in self.gen_steps:
+                call_all(multiworld, step)
+            return multiworld
+
+        @staticmethod
+        def sweep(multiworld: MultiWorld, items: typing.List[Item]) -> int:
+            """Collects items one at a time and updates reachability after each, like a fill's search does."""
+            state = CollectionState(multiworld)
+            for item in items:
+                state.collect(item, True)
+                state.update_reachable_regions(item.player)
+            multiworld.get_all_state(False)
+            return sum(location.can_reach(state) for location in multiworld.get_locations())
+
+        def main(self):
+            for game, world_type in sorted(AutoWorld.AutoWorldRegister.world_types.items()):
+                if not world_type.explicit_indirect_conditions:
+                    continue
+                try:
+                    multiworld = self.setup_multiworld(game)
+                    items = [item for item in multiworld.itempool if item.advancement]
+                    if not items:
+                        continue
+                    random.Random(0).shuffle(items)
+
+                    results: typing.Dict[bool, float] = {}
+                    reachable: typing.Dict[bool, int] = {}
+                    for incremental in (False, True):
+                        for world in multiworld.worlds.values():
+                            world.incremental_reachability = incremental
+                        multiworld.entrance_item_dependencies.clear()
+                        gc.collect()
+                        with TimeIt(f"{game} {'incremental' if incremental else 'full'} sweep", logger) as t:
+                            reachable[incremental] = self.sweep(multiworld, items)
+                        results[incremental] = t.dif
+
+                    if reachable[False] != reachable[True]:
+                        logger.warning(f"{game} reached {reachable[False]} locations with full and "
+                                       f"{reachable[True]} with incremental reachability.")
+                    logger.info(f"{game} with {self.players} players: {results[False]:.4f} seconds full, "
+                                f"{results[True]:.4f} seconds incremental "
+                                f"({results[False] / max(results[True], 1e-9):.2f}x).")
+                except Exception as e:
+                    logger.exception(e)
+
+    runner = BenchmarkRunner()
+    runner.main()
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_reachability_benchmark()
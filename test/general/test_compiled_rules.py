@@ -0,0 +1,69 @@
+import unittest
+
+from BaseClasses import CollectionState, Region
+from worlds.generic.CompiledRules import And, CanReachRegion, Count, FALSE, Func, Has, HasAll, HasAny, Or, TRUE
+from worlds.generic.Rules import add_rule, set_rule
+from . import generate_items, generate_locations, generate_test_multiworld
+
+
+class TestCompiledRules(unittest.TestCase):
+    def test_simplification(self):
+        """Ensure nested rules are flattened, duplicates removed and constants folded"""
+        a, b, c = Has("A", 1), Has("B", 1), Has("C", 1)
+        self.assertEqual(And(a, b, c), a & (b & c) & a)
+        self.assertEqual(And(a, b, c).rules, (a, b, c))
+        self.assertEqual(Or(a, And(b, c)).rules, (a, And(b, c)))
+        self.assertIs(a & FALSE, FALSE)
+        self.assertIs(a | TRUE, TRUE)
+        self.assertIs(a & TRUE, a)
+        self.assertIs(a & a, a)
+        self.assertIs((a & b).compile(), And(Has("A", 1), Has("B", 1)).compile())
+
+    def test_evaluation(self):
+        """Ensure compiled rules match the CollectionState methods they replace"""
+        multiworld = generate_test_multiworld()
+        items = generate_items(3, 1, True)
+        menu = multiworld.get_region("Menu", 1)
+        region = Region("Locked", 1, multiworld)
+        multiworld.regions.append(region)
+        menu.connect(region, rule=Has(items[2].name, 1).compile())
+        names = [item.name for item in items]
+        rules = {
+            "has 2": (Has(names[0], 1, 2), lambda state: state.has(names[0], 1, 2)),
+            "has_all": (HasAll(names[:2], 1), lambda state: state.has_all(names[:2], 1)),
+            "has_any": (HasAny(names[1:], 1), lambda state: state.has_any(names[1:], 1)),
+            "count": (Count(names, 1, 3), lambda state: state.has_from_list(names, 1, 3)),
+            "region": (CanReachRegion("Locked", 1), lambda state: state.can_reach_region("Locked", 1)),
+            "mixed": (Has(names[0], 1) & (Has(names[1], 1) | CanReachRegion("Locked", 1)),
+                      lambda state: state.has(names[0], 1) and (state.has(names[1], 1)
+                                                                or state.can_reach_region("Locked", 1))),
+        }
+        state = CollectionState(multiworld)
+        for item in [None, items[0], items[2], items[0], items[1]]:
+            if item:
+                state.collect(item, True)
+            for name, (rule, expected) in rules.items():
+                with self.subTest(name, item=item):
+                    self.assertEqual(rule.compile()(state), expected(state))
+
+    def test_add_rule_merges(self):
+        """Ensure add_rule merges into one flat rule, including plain functions"""
+        multiworld = generate_test_multiworld()
+        location = generate_locations(1, 1, multiworld.get_region("Menu", 1))[0]
+        checked = []
+
+        def function(state: CollectionState) -> bool:
+            checked.append(state)
+            return True
+
+        add_rule(location, Has("A", 1))
+        add_rule(location, function)
+        add_rule(location, Has("B", 1) & Has("A", 1))
+        self.assertEqual(location.access_rule.rule.rules, (Has("B", 1), Has("A", 1), Func(function)))
+        add_rule(location, Has("C", 1), "or")
+        self.assertIsInstance(location.access_rule.rule, Or)
+
+        set_rule(location, HasAll(("A", "B"), 1))
+        state = CollectionState(multiworld)
+        self.assertFalse(location.access_rule(state))
+        self.assertFalse(checked)
@@ -2,7 +2,7 @@ from typing import List, Iterable
 import unittest
 
 from Options import Accessibility
-from test.general import generate_items, generate_locations, generate_test_multiworld
+from test.general import generate_items, generate_locations, generate_test_multiworld, setup_multiworld
 from Fill import FillError, balance_multiworld_progression, fill_restrictive, \
     distribute_early_items, distribute_items_restrictive
 from BaseClasses import Entrance, LocationProgressType, MultiWorld, Region, Item, Location, \
@@ -660,6 +660,15 @@ class TestDistributeItemsRestrictive(unittest.TestCase):
         self.assertEqual(gen1.locations[2].item, gen2.locations[2].item)
         self.assertEqual(gen1.locations[3].item, gen2.locations[3].item)
 
+    def test_fast_fill(self):
+        """Test fast_fill results in valid placements"""
+        from worlds.AutoWorld import AutoWorldRegister
+        world_types = [AutoWorldRegister.world_types[game] for game in ("A Link to the Past", "Clique", "ChecksFinder")]
+        multiworld = setup_multiworld(world_types, seed=0)
+        distribute_items_restrictive(multiworld, fast_fill=True)
+        self.assertFalse(multiworld.get_unfilled_locations())
+        self.assertTrue(multiworld.fulfills_accessibility())
+
     def test_can_reserve_advancement_items_for_general_fill(self):
         """Test that priority locations fill still satisfies item rules"""
         multiworld = generate_test_multiworld()
@@ -1,8 +1,8 @@
 import unittest
 
-from BaseClasses import CollectionState
+from BaseClasses import CollectionState, Region
 from worlds.AutoWorld import AutoWorldRegister
-from . import setup_solo_multiworld, gen_steps
+from . import generate_items, generate_locations, generate_test_multiworld, setup_solo_multiworld, gen_steps
 
 
 class TestBase(unittest.TestCase):
@@ -79,3 +79,234 @@ class TestBase(unittest.TestCase):
                             locations.add(location)
                     self.assertGreater(len(locations), 0,
                                        msg="Need to be able to reach at least one location to get started.")
+
+
+class TestIncrementalReachability(unittest.TestCase):
+    def test_matches_full_update(self):
+        """Ensure incremental reachability reaches the same regions as a full update after each collect"""
+        multiworld = generate_test_multiworld()
+        items = generate_items(4, 1, True)
+        menu = multiworld.get_region("Menu", 1)
+        regions = [Region(f"Region {i}", 1, multiworld) for i in range(4)]
+        multiworld.regions += regions
+        menu.connect(regions[0], rule=lambda state: state.has(items[0].name, 1))
+        regions[0].connect(regions[1], rule=lambda state: state.has_all((items[1].name, items[2].name), 1))
+        # region 3 depends on reaching region 1, which has to be registered as an indirect condition
+        entrance = menu.connect(regions[2], rule=lambda state: state.can_reach_region("Region 1", 1))
+        multiworld.register_indirect_condition(regions[1], entrance)
+        regions[2].connect(regions[3], rule=lambda state: state.count(items[3].name, 1) >= 2)
+
+        def reachable_after_each_collect(incremental: bool):
+            multiworld.worlds[1].incremental_reachability = incremental
+            state = CollectionState(multiworld)
+            result = []
+            for item in [items[3], items[1], items[0], items[2], items[3]]:
+                state.collect(item, True)
+                result.append({region.name for region in multiworld.get_regions(1) if region.can_reach(state)})
+                # copies have to keep the pending changes
+                state = state.copy()
+            return result
+
+        full = reachable_after_each_collect(False)
+        incremental = reachable_after_each_collect(True)
+        self.assertEqual(full, incremental)
+        self.assertEqual({"Menu", "Region 0", "Region 1", "Region 2", "Region 3"}, incremental[-1])
+        self.assertIn(items[3].name, multiworld.entrance_item_dependencies[1])
+
+
+class TestStateCopy(unittest.TestCase):
+    def test_copy_does_not_leak_changes(self):
+        """Ensure copies share unchanged data with their original, but changes to either don't affect the other"""
+        multiworld = generate_test_multiworld(2)
+        item = generate_items(1, 1, True)[0]
+        menu = multiworld.get_region("Menu", 1)
+        region = Region("Locked", 1, multiworld)
+        multiworld.regions.append(region)
+        menu.connect(region, rule=lambda state: state.has(item.name, 1))
+
+        state = CollectionState(multiworld)
+        self.assertFalse(region.can_reach(state))
+        copied_state = state.copy()
+        self.assertIs(state.reachable_regions[2], copied_state.reachable_regions[2])
+
+        location = generate_locations(1, 1, menu)[0]
+        copied_state.collect(item, True, location)
+        self.assertTrue(region.can_reach(copied_state))
+        self.assertFalse(region.can_reach(state))
+        self.assertNotIn(location, state.locations_checked)
+        self.assertIn(location, copied_state.locations_checked)
+        self.assertIsNot(state.reachable_regions[1], copied_state.reachable_regions[1])
+        self.assertIs(state.reachable_regions[2], copied_state.reachable_regions[2])
+
+    def test_mutating_copy_collections(self):
+        """Ensure mutating the advancements and locations_checked of a copy directly leaves the original unchanged"""
+        multiworld = generate_test_multiworld()
+        menu = multiworld.get_region("Menu", 1)
+        locations = generate_locations(2, 1, menu)
+        state = CollectionState(multiworld)
+        state.advancements.add(locations[0])
+        state.locations_checked.add(locations[0])
+
+        copied_state = state.copy()
+        copied_state.advancements.add(locations[1])
+        copied_state.locations_checked.add(locations[1])
+        copied_state.advancements.discard(locations[0])
+        copied_state.locations_checked.discard(locations[0])
+        self.assertEqual({locations[0]}, state.advancements)
+        self.assertEqual({locations[0]}, state.locations_checked)
+
+
+class TestIndexedItemCounts(unittest.TestCase):
+    def test_matches_counter(self):
+        """Ensure indexed item counts answer name and index based queries like a Counter"""
+        from worlds.generic.Rules import has_all_rule, has_any_rule, has_rule
+
+        multiworld = generate_test_multiworld()
+        world = multiworld.worlds[1]
+        items = generate_items(3, 1, True)
+        world.indexed_item_counts = True
+        state = CollectionState(multiworld)
+        # bound before any of the item names are indexed
+        rules = [has_rule(world, items[0].name, 2), has_all_rule(world, [items[0].name, items[1].name]),
+                 has_any_rule(world, [items[1].name, items[2].name])]
+        world.indexed_item_counts = False
+        counter_state = CollectionState(multiworld)
+        counter_rules = [has_rule(world, items[0].name, 2), has_all_rule(world, [items[0].name, items[1].name]),
+                         has_any_rule(world, [items[1].name, items[2].name])]
+        self.assertEqual([rule(state) for rule in rules], [False, False, False])
+
+        for item in [items[0], items[1], items[0]]:
+            state.collect(item, True)
+            counter_state.collect(item, True)
+            copy = state.copy()
+            self.assertEqual([rule(state) for rule in rules], [rule(counter_state) for rule in counter_rules])
+            self.assertEqual(dict(state.prog_items[1]), dict(counter_state.prog_items[1]))
+            self.assertEqual(state.count(items[0].name, 1), state.count_index(world.item_index.get(items[0].name), 1))
+            # index based rules also work on prog_items that are not ItemCounts
+            self.assertEqual([rule(counter_state) for rule in rules], [rule(counter_state) for rule in counter_rules])
+            self.assertEqual(counter_state.count(items[0].name, 1),
+                             counter_state.count_index(world.item_index.get(items[0].name), 1))
+        self.assertEqual(3, state.prog_items[1].total())
+
+        state.remove(items[1])
+        self.assertFalse(state.has(items[1].name, 1))
+        self.assertNotIn(items[1].name, state.prog_items[1])
+        self.assertTrue(copy.has(items[1].name, 1), "copy was modified by remove")
+
+    def test_update_adds(self):
+        """Ensure ItemCounts.update adds to the counts like Counter.update"""
+        from collections import Counter
+        from BaseClasses import ItemCounts
+
+        multiworld = generate_test_multiworld()
+        counts = ItemCounts(multiworld.worlds[1].item_index)
+        counter = Counter()
+        for update in ({"A": 2, "B": 1}, ["A", "C", "C"], {"B": -1}):
+            counts.update(update)
+            counter.update(update)
+            self.assertEqual(+counter, dict(counts.items()))
+
+    def test_index_scoped_to_multiworld(self):
+        """Ensure names indexed during one generation don't grow the item index of another"""
+        multiworld = generate_test_multiworld()
+        other_multiworld = generate_test_multiworld()
+        item_index = multiworld.worlds[1].item_index
+        self.assertIs(item_index, multiworld.get_item_index(multiworld.worlds[1].game))
+        size = len(other_multiworld.worlds[1].item_index)
+        item_index.get("Event only known to this multiworld")
+        self.assertEqual(size, len(other_multiworld.worlds[1].item_index))
+
+
+class TestReachableLocations(unittest.TestCase):
+    def test_matches_can_reach(self):
+        """Ensure reachable_locations returns the same locations as filtering with can_reach"""
+        multiworld = generate_test_multiworld()
+        item = generate_items(1, 1, True)[0]
+        menu = multiworld.get_region("Menu", 1)
+        region = Region("Locked", 1, multiworld)
+        multiworld.regions.append(region)
+        menu.connect(region, rule=lambda state: state.has(item.name, 1))
+        open_locations = generate_locations(2, 1, menu)
+        locked_locations = generate_locations(2, 1, region, tag="_locked")
+        checked = []
+
+        def rule(state: CollectionState) -> bool:
+            checked.append(state)
+            return state.has(item.name, 1)
+
+        for location in [open_locations[1], *locked_locations]:
+            location.access_rule = rule
+
+        state = CollectionState(multiworld)
+        locations = multiworld.get_locations()
+        self.assertEqual({open_locations[0]}, state.reachable_locations(locations))
+        self.assertEqual(1, len(checked), "access rules of locations in unreachable regions were called")
+        state.collect(item, True)
+        self.assertEqual({location for location in locations if location.can_reach(state)},
+                         state.reachable_locations(locations))
+        self.assertEqual(set(locations), state.reachable_locations(locations))
+
+
+class TestSweep(unittest.TestCase):
+    def test_matches_without_dependencies(self):
+        """Ensure sweeping collects the same advancements with and without incremental reachability"""
+        multiworld = generate_test_multiworld()
+        items = generate_items(4, 1, True)
+        menu = multiworld.get_region("Menu", 1)
+        region = Region("Locked", 1, multiworld)
+        multiworld.regions.append(region)
+        menu.connect(region, rule=lambda state: state.has(items[1].name, 1))
+        open_locations = generate_locations(2, 1, menu)
+        locked_locations = generate_locations(2, 1, region, tag="_locked")
+        # each item unlocks the location of the next one, partly through the locked region
+        open_locations[1].access_rule = lambda state: state.has(items[0].name, 1)
+        locked_locations[0].access_rule = lambda state: state.has_all((items[0].name, items[2].name), 1)
+        for location, item in zip([open_locations[0], open_locations[1], locked_locations[1], locked_locations[0]],
+                                  items):
+            location.place_locked_item(item)
+        item_locations = [location for location in multiworld.get_locations() if location.item]
+
+        def sweep(incremental: bool):
+            multiworld.worlds[1].incremental_reachability = incremental
+            state = CollectionState(multiworld)
+            state.sweep_for_advancements(item_locations)
+            return state.advancements, dict(state.prog_items[1])
+
+        full = sweep(False)
+        incremental = sweep(True)
+        self.assertEqual(full, incremental)
+        self.assertEqual(set(item_locations), incremental[0])
+
+    def test_rechecks_region_and_other_reads(self):
+        """Ensure locations are checked again when a region or another player's item their access rule read changed,
+        and when they read items other than through state.has"""
+        multiworld = generate_test_multiworld(2)
+        items = generate_items(3, 1, True)
+        other_item = generate_items(1, 2, True)[0]
+        menu = multiworld.get_region("Menu", 1)
+        region = Region("Locked", 1, multiworld)
+        multiworld.regions.append(region)
+        menu.connect(region, rule=lambda state: state.has(items[0].name, 1))
+        never = "Never Collected"
+        locations = generate_locations(4, 1, menu)
+        other_location = generate_locations(1, 2, multiworld.get_region("Menu", 2))[0]
+        locations[1].access_rule = lambda state: state.has(never, 1) or state.can_reach_region("Locked", 1)
+        locations[2].access_rule = lambda state: state.has(never, 1) or state.has(other_item.name, 2)
+        locations[3].access_rule = lambda state: state.has(never, 1) or items[0].name in state.prog_items[1]
+        locations[0].place_locked_item(items[0])
+        other_location.place_locked_item(other_item)
+        for location, item in zip(locations[1:], generate_items(3, 1, True)):
+            location.place_locked_item(item)
+        item_locations = [location for location in multiworld.get_locations() if location.item]
+
+        def sweep(incremental: bool):
+            for world in multiworld.worlds.values():
+                world.incremental_reachability = incremental
+            state = CollectionState(multiworld)
+            state.sweep_for_advancements(item_locations)
+            return state.advancements
+
+        full = sweep(False)
+        incremental = sweep(True)
+        self.assertEqual(full, incremental)
+        self.assertEqual(set(item_locations), incremental)
@@ -0,0 +1,62 @@
+import unittest
+from unittest import mock
+
+from BaseClasses import CollectionState, Location
+from Fill import distribute_items_restrictive, swap_location_item
+from worlds.AutoWorld import AutoWorldRegister, call_all
+from . import setup_multiworld
+
+
+class TestSphereIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        world_types = [AutoWorldRegister.world_types[game] for game in ("A Link to the Past", "Clique", "ChecksFinder")]
+        self.multiworld = setup_multiworld(world_types, seed=0)
+        distribute_items_restrictive(self.multiworld)
+        call_all(self.multiworld, "post_fill")
+
+    def test_matches_sweeps(self):
+        """Ensure sphere based methods return the same results with and without a sphere index"""
+        multiworld = self.multiworld
+        spheres = list(multiworld.get_spheres())
+        sendable_spheres = list(multiworld.get_sendable_spheres())
+        fulfills_accessibility = multiworld.fulfills_accessibility()
+        multiworld.spoiler.create_playthrough(create_paths=False)
+        playthrough = multiworld.spoiler.playthrough
+
+        multiworld.build_sphere_index()
+        self.assertEqual(spheres, list(multiworld.get_spheres()))
+        self.assertEqual(sendable_spheres, list(multiworld.get_sendable_spheres()))
+        self.assertEqual(fulfills_accessibility, multiworld.fulfills_accessibility())
+        multiworld.spoiler.create_playthrough(create_paths=False)
+        self.assertEqual(playthrough, multiworld.spoiler.playthrough)
+
+    def test_accessibility_uses_index(self):
+        """Ensure fulfills_accessibility takes its result from the sphere index instead of sweeping again"""
+        multiworld = self.multiworld
+        fulfills_accessibility = multiworld.fulfills_accessibility()
+        multiworld.build_sphere_index()
+        with mock.patch.object(Location, "can_reach", autospec=True, side_effect=Location.can_reach) as can_reach:
+            self.assertEqual(fulfills_accessibility, multiworld.fulfills_accessibility())
+            can_reach.assert_not_called()
+            multiworld.fulfills_accessibility(CollectionState(multiworld))
+            can_reach.assert_called()
+
+    def test_invalidation(self):
+        """Ensure moving items discards the sphere index"""
+        multiworld = self.multiworld
+        multiworld.build_sphere_index()
+        location_1, location_2 = multiworld.get_filled_locations(2)[:2]
+        swap_location_item(location_1, location_2)
+        self.assertIsNone(multiworld.sphere_index)
+
+        multiworld.build_sphere_index()
+        location = multiworld.get_filled_locations(2)[0]
+        multiworld.push_item(location, location.item, False)
+        self.assertIsNone(multiworld.sphere_index)
+
+        multiworld.build_sphere_index()
+        location.item = None
+        self.assertIsNone(multiworld.sphere_index)
+        multiworld.build_sphere_index()
+        multiworld.spoiler.create_playthrough(create_paths=False)
+        self.assertIsNone(multiworld.sphere_index, "culling the playthrough temporarily removes items")
@@ -0,0 +1,36 @@
+# Tests for NetUtils.encode
+import unittest
+
+from NetUtils import ClientStatus, NetworkItem, NetworkPlayer, NetworkSlot, SlotType, _encode, _scan_for_TypedTuples, \
+    encode
+
+
+class TestEncode(unittest.TestCase):
+    def test_matches_json_encoder(self) -> None:
+        """Ensure encode produces the same output as encoding the scanned object with JSONEncoder"""
+        messages = [
+            [{"cmd": "ReceivedItems", "index": 0,
+              "items": [NetworkItem(item, 1000 + item, item % 7, item % 8) for item in range(1000)]}],
+            [{"cmd": "LocationInfo",
+              "locations": [NetworkItem(True, 1.5, 2, SlotType.group), NetworkItem(2 ** 70, 1, 2)]}],
+            [{"cmd": "Connected", "team": 0, "slot": 1, "missing_locations": {3, 4}, "checked_locations": frozenset(),
+              "players": [NetworkPlayer(0, 1, "Alias", "Ñame 😀")],
+              "slot_info": {1: NetworkSlot("Ñame 😀", "Game", SlotType.player),
+                            2: NetworkSlot("Group", "Game", SlotType.group, [1])},
+              "slot_data": {"nested": {"list": [1, 2.5, True, False], "tuple": (1, "two")}, "none": None}}],
+            [{"cmd": "RoomInfo", "time": 1729280000.123456, "tags": ["AP"], "status": ClientStatus.CLIENT_GOAL}],
+            [{"cmd": "PrintJSON", "data": [{"text": "quote \" backslash \\ control \x01\n\t line separator  "}]}],
+            [{"cmd": "SetReply", "key": "floats", "value": [1e-05, 6.9e-08, 1e16, 1e300, -0.0, float("nan"),
+                                                              float("inf")]}],
+            [{"cmd": "SetReply", "key": "big", "value": 2 ** 100, "original_value": -2 ** 64}],
+            [{"cmd": "Retrieved", "keys": {"missing": None, 1: 2, 1.5: 3, True: 4}}],
+            [{"cmd": "Bounced", "data": {"surrogate": "\ud800"}}],
+        ]
+        for msg in messages:
+            with self.subTest(cmd=msg[0]["cmd"]):
+                self.assertEqual(_encode(_scan_for_TypedTuples(msg)), encode(msg))
+
+    def test_rejects_unknown_types(self) -> None:
+        """Ensure objects JSONEncoder can't encode are still rejected"""
+        with self.assertRaises(TypeError):
+            encode([{"cmd": "Bounced", "data": object()}])
@@ -1,5 +1,6 @@
 # Tests for Generate.py (ArchipelagoGenerate.exe)
 
+import json
 import unittest
 import os
 import os.path
@@ -10,6 +11,7 @@ from tempfile import TemporaryDirectory
 
 import Generate
 import Main
+from BaseClasses import Region
 
 
 class TestGenerateMain(unittest.TestCase):
@@ -72,6 +74,24 @@ class TestGenerateMain(unittest.TestCase):
 
         self.assertOutput(self.output_tempdir.name)
 
+    def test_generate_profile_report(self):
+        report_path = os.path.join(self.output_tempdir.name, "profile.json")
+        sys.argv = [sys.argv[0], '--seed', '0',
+                    '--player_files_path', str(self.abs_input_dir),
+                    '--outputpath', self.output_tempdir.name,
+                    '--profile_report', report_path]
+        print(f'Testing Generate.py {sys.argv} in {os.getcwd()}')
+        Main.main(*Generate.main())
+
+        self.assertOutput(self.output_tempdir.name)
+        with open(report_path, encoding="utf-8") as f:
+            report = json.load(f)
+        self.assertIn("progression", report["phases"])
+        self.assertIn("generate_early", report["players"]["1"]["stages"])
+        self.assertGreater(report["calls"]["progression"]["Region.can_reach"], 0)
+        self.assertTrue(report["slowest_rules"])
+        self.assertNotIn("__wrapped__", vars(Region.can_reach), "reachability checks are still being counted")
+
     def test_generate_yaml(self):
         # override host.yaml
         from settings import get_settings
@@ -108,6 +128,7 @@ class TestGenerateWeights(TestGenerateMain):
     # don't need to run these tests
     test_generate_absolute = None
     test_generate_relative = None
+    test_generate_profile_report = None
 
     def test_generate_yaml(self):
         from settings import get_settings
@@ -1,5 +1,5 @@
 import unittest
-from MultiServer import Context, ServerCommandProcessor
+from MultiServer import Client, Context, ServerCommandProcessor
 
 
 class TestResolvePlayerName(unittest.TestCase):
@@ -38,3 +38,308 @@ class TestResolvePlayerName(unittest.TestCase):
         assert p.resolve_player("ABC") == (1, 2, "abc"), "case insensitive resolves when 1 match"
         assert p.resolve_player("abcd") == (1, 3, "abCD"), "case insensitive resolves when 1 match"
         assert not p.resolve_player("aB"), "partial name shouldn't resolve to player"
+
+
+class TestSaveJournal(unittest.TestCase):
+    def test_journal_matches_full_save(self) -> None:
+        """Ensure a save made of a full save and journaled changes loads the same as a full save"""
+        import os
+        from tempfile import TemporaryDirectory
+        from unittest import mock
+
+        from NetUtils import Hint, HintStatus, NetworkItem
+
+        # game data isn't saved, and can only be loaded by one Context
+        with TemporaryDirectory() as tempdir, mock.patch.object(Context, "_start_async_saving"), \
+                mock.patch.object(Context, "_load_game_data"):
+            ctx = Context("", 0, "", "", 0, 0, False)
+            ctx.save_filename = os.path.join(tempdir, "test.apsave")
+            ctx.init_save()
+            hint = Hint(1, 2, 3, 4, False, status=HintStatus.HINT_PRIORITY)
+            ctx.received_items[0, 1, True] = [NetworkItem(4, 3, 2, 0)]
+            ctx.hints[0, 1].add(hint)
+            ctx.stored_data["key"] = [1]
+            ctx.stored_data_changed.add("key")
+            self.assertTrue(ctx._save())
+            self.assertEqual(0, ctx.journal_size, "the first save has to be a full save")
+
+            ctx.received_items[0, 1, True].append(NetworkItem(5, 6, 2, 0))
+            ctx.received_items[0, 2, True] = [NetworkItem(7, 8, 1, 0)]
+            ctx.location_checks[0, 2] = {3}
+            # same hash, changed status
+            ctx.hints[0, 1].remove(hint)
+            ctx.hints[0, 1].add(hint._replace(status=HintStatus.HINT_AVOID))
+            ctx.stored_data["key"].append(2)
+            ctx.stored_data_changed.add("key")
+            ctx.snapshot_size = 1 << 20  # keep journaling
+            self.assertTrue(ctx._save())
+            ctx.hints_used[0, 1] += 1
+            self.assertTrue(ctx._save())
+            self.assertGreater(ctx.journal_size, 0)
+            # a record that was cut off while writing is dropped
+            with open(ctx.journal_filename, "ab") as f:
+                f.write(b"\x00\x00\x01\x00partial")
+
+            loaded = Context("", 0, "", "", 0, 0, False)
+            loaded.save_filename = ctx.save_filename
+            loaded.init_save()
+            self.assertEqual(ctx.get_save(), loaded.get_save())
+            self.assertEqual(ctx.journal_size, loaded.journal_size)
+
+            # a full save replaces the journal
+            self.assertTrue(ctx._save(True))
+            self.assertEqual(0, os.path.getsize(ctx.journal_filename))
+            loaded = Context("", 0, "", "", 0, 0, False)
+            loaded.save_filename = ctx.save_filename
+            loaded.init_save()
+            self.assertEqual(ctx.get_save(), loaded.get_save())
+
+
+class TestOutgoingQueue(unittest.TestCase):
+    def test_merges_in_order(self) -> None:
+        """Ensure messages queued for a client are sent in one frame per event loop iteration, keeping their order,
+        and clients that fall behind get disconnected"""
+        import asyncio
+        from unittest import mock
+
+        from NetUtils import decode
+
+        class Transport:
+            write_buffer_size = 0
+
+            def get_write_buffer_size(self) -> int:
+                return self.write_buffer_size
+
+        class Socket:
+            open = True
+            remote_address = ("127.0.0.1", 0)
+
+            def __init__(self) -> None:
+                self.transport = Transport()
+                self.close = mock.AsyncMock()
+
+        async def run() -> None:
+            with mock.patch.object(Context, "_load_game_data"):
+                ctx = Context("", 0, "", "", 0, 0, False)
+            clients = [Client(Socket(), ctx) for _ in range(3)]
+            clients[2].socket.transport.write_buffer_size = ctx.max_outgoing_size
+            sent = []
+            with mock.patch("websockets.broadcast",
+                            lambda sockets, msg: sent.extend((socket, msg) for socket in sockets)):
+                ctx.queue_msgs(clients[0], [{"cmd": "First"}])
+                ctx.broadcast(clients, [{"cmd": "Second"}, {"cmd": "Third"}])
+                ctx.queue_msgs(clients[0], [])
+                ctx.queue_msgs(clients[0], [{"cmd": "Fourth"}])
+                self.assertEqual([], sent, "messages were sent before the event loop got to them")
+                await asyncio.sleep(0)
+
+                self.assertEqual(2, len(sent))
+                frames = {socket: decode(msg) for socket, msg in sent}
+                self.assertEqual(["First", "Second", "Third", "Fourth"],
+                                 [msg["cmd"] for msg in frames[clients[0].socket]])
+                self.assertEqual(["Second", "Third"], [msg["cmd"] for msg in frames[clients[1].socket]])
+                clients[2].socket.close.assert_called_once()
+
+                # send_msgs returns once its messages were written, or could not be
+                self.assertTrue(await ctx.send_msgs(clients[0], [{"cmd": "Fifth"}]))
+                self.assertEqual(3, len(sent))
+                self.assertFalse(await ctx.send_msgs(clients[2], [{"cmd": "Fifth"}]))
+                clients[1].socket.open = False
+                self.assertFalse(await ctx.send_msgs(clients[1], [{"cmd": "Fifth"}]))
+                self.assertEqual(3, len(sent))
+
+        asyncio.run(run())
+
+
+class TestReceivedItemsCache(unittest.TestCase):
+    def test_matches_encoding_all_items(self) -> None:
+        """Ensure cached ReceivedItems messages match encoding all items, as items get added and entries evicted"""
+        import types
+        from unittest import mock
+
+        from MultiServer import ReceivedItemsCache, get_received_items
+        from NetUtils import NetworkItem
+
+        with mock.patch.object(Context, "_load_game_data"):
+            ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.start_inventory[1] = [NetworkItem(1, -2, 0)]
+        clients = [types.SimpleNamespace(team=0, slot=1, remote_items=remote_items,
+                                         remote_start_inventory=remote_start_inventory)
+                   for remote_items in (False, True) for remote_start_inventory in (False, True)]
+
+        def expected(client: types.SimpleNamespace):
+            items = (ctx.start_inventory[1] if client.remote_start_inventory else []) + \
+                    get_received_items(ctx, 0, 1, client.remote_items)
+            return (ctx.dumper([{"cmd": "ReceivedItems", "index": 0, "items": items}]) if items else None), len(items)
+
+        for cache in (ReceivedItemsCache(), ReceivedItemsCache(max_size=100)):
+            ctx.received_items = {}
+            ctx.received_items_cache = cache
+            for item in range(3):
+                for client in clients:
+                    self.assertEqual(expected(client), cache.get_msg(ctx, client))
+                get_received_items(ctx, 0, 1, True).append(NetworkItem(item, item, 2))
+            self.assertLessEqual(cache.size, cache.max_size)
+            self.assertEqual(cache.size, sum(len(entry[3]) for entry in cache.entries.values()))
+            # loading a save replaces the lists of received items
+            ctx.received_items = {(0, 1, True): [NetworkItem(5, 5, 2)]}
+            for client in clients:
+                self.assertEqual(expected(client), cache.get_msg(ctx, client))
+
+    def test_reconnects_use_cache(self) -> None:
+        """Ensure reconnecting clients only encode their items once, with and without remote start inventory"""
+        import types
+        from unittest import mock
+
+        from MultiServer import get_received_items
+        from NetUtils import NetworkItem
+
+        with mock.patch.object(Context, "_load_game_data"):
+            ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.start_inventory[1] = [NetworkItem(1, -2, 0)]
+        get_received_items(ctx, 0, 1, True).append(NetworkItem(2, 2, 2))
+        for remote_start_inventory in (False, True):
+            with self.subTest(remote_start_inventory=remote_start_inventory):
+                client = types.SimpleNamespace(team=0, slot=1, remote_items=True,
+                                               remote_start_inventory=remote_start_inventory)
+                with mock.patch.object(ctx, "dumper", wraps=ctx.dumper) as dumper:
+                    for _ in range(5):
+                        ctx.received_items_cache.get_msg(ctx, client)
+                    self.assertEqual(1, dumper.call_count)
+
+    def test_new_items_hook(self) -> None:
+        """Ensure items sent by server commands reach on_new_items, for each member of a receiving group"""
+        from unittest import mock
+
+        from MultiServer import send_items_to
+        from NetUtils import NetworkItem
+
+        with mock.patch.object(Context, "_load_game_data"):
+            ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.groups = {3: {1, 2}}
+        item = NetworkItem(1, -1, 0)
+        with mock.patch.object(ctx, "on_new_items") as on_new_items:
+            send_items_to(ctx, 0, 3, item)
+        on_new_items.assert_has_calls([mock.call(0, 1, (item,)), mock.call(0, 2, (item,))], any_order=True)
+        self.assertEqual(2, on_new_items.call_count)
+
+
+class TestHintIndex(unittest.TestCase):
+    def test_matches_recheck_hints(self) -> None:
+        """Ensure rechecking the hints of checked locations updates hints like rechecking all hints of the slot"""
+        from unittest import mock
+
+        from NetUtils import Hint, HintStatus
+
+        hints = [Hint(2, 1, 10, 100, False), Hint(3, 1, 11, 101, False, status=HintStatus.HINT_PRIORITY),
+                 Hint(1, 2, 10, 102, False), Hint(1, 1, 12, 103, False)]
+        contexts = []
+        for _ in range(2):
+            with mock.patch.object(Context, "_load_game_data"):
+                ctx = Context("", 0, "", "", 0, 0, False)
+            ctx.groups = {3: {2, 4}}
+            for hint in hints:
+                for slot in ctx.slot_set(hint.receiving_player) | {hint.finding_player}:
+                    ctx.hints[0, slot].add(hint)
+            ctx.index_hints(0, hints)
+            ctx.location_checks[0, 1] = {10, 11}
+            contexts.append(ctx)
+
+        indexed_changed, changed = set(), set()
+        contexts[0].recheck_location_hints(0, 1, {10, 11}, indexed_changed)
+        contexts[1].recheck_hints(0, 1, changed)
+        self.assertEqual(changed, indexed_changed)
+        self.assertEqual({(0, 1), (0, 2), (0, 4)}, indexed_changed)
+        self.assertEqual(dict(contexts[1].hints), dict(contexts[0].hints))
+        ctx = contexts[0]
+        self.assertEqual(hints[0]._replace(found=True, status=HintStatus.HINT_FOUND), ctx.get_hint(0, 1, 10))
+        self.assertEqual(hints[2], ctx.get_hint(0, 2, 10))
+        self.assertEqual(hints[3], ctx.get_hint(0, 1, 12))
+        self.assertIsNone(ctx.get_hint(0, 2, 12))
+
+        new_hint = hints[3].re_prioritize(ctx, HintStatus.HINT_AVOID)
+        ctx.replace_hint(0, 1, hints[3], new_hint)
+        self.assertEqual(new_hint, ctx.get_hint(0, 1, 12))
+
+
+class TestDataStorage(unittest.TestCase):
+    def test_prefixes_and_versions(self) -> None:
+        """Ensure Get and SetNotify handle prefixes, Get omits values of known versions
+        and the original value of a Set is not changed by its operations"""
+        import asyncio
+        from unittest import mock
+
+        from MultiServer import process_client_cmd
+
+        class FakeClient:
+            auth = True
+
+            def __init__(self, slot: int) -> None:
+                self.slot = slot
+
+        async def run() -> None:
+            with mock.patch.object(Context, "_load_game_data"):
+                ctx = Context("", 0, "", "", 0, 0, False)
+            ctx.stored_data_version = 0
+            clients = [FakeClient(slot) for slot in (1, 2)]
+            replies = {client.slot: [] for client in clients}
+            ctx.queue_msgs = lambda client, msgs: replies[client.slot].extend(msgs)
+            ctx.broadcast = lambda targets, msgs: [ctx.queue_msgs(client, msgs) for client in targets]
+
+            await process_client_cmd(ctx, clients[1], {"cmd": "SetNotify", "keys": [], "prefixes": ["a_"]})
+            for key in ("b", "a_2", "a", "a_1"):
+                await process_client_cmd(ctx, clients[0], {"cmd": "Set", "key": key, "want_reply": False,
+                                                           "operations": [{"operation": "replace", "value": [key]}]})
+            self.assertEqual(["a", "a_1", "a_2", "b"], ctx.stored_data_keys)
+            self.assertEqual([], replies[1])
+            self.assertEqual(["a_2", "a_1"], [reply["key"] for reply in replies[2]])
+
+            await process_client_cmd(ctx, clients[0], {"cmd": "Set", "key": "a_1",
+                                                       "operations": [{"operation": "remove", "value": "a_1"}]})
+            self.assertEqual(["a_1"], replies[1][0]["original_value"])
+            self.assertEqual([], replies[1][0]["value"])
+
+            await process_client_cmd(ctx, clients[0], {"cmd": "Get", "keys": ["b", "missing"], "prefixes": ["a_"],
+                                                       "known_versions": {"a_1": 4, "a_2": 2, "b": 4}})
+            retrieved = replies[1][-1]
+            self.assertEqual({"a_1": 5, "a_2": 2, "b": 1}, retrieved["versions"])
+            self.assertEqual({"b": ["b"], "missing": None, "a_1": []}, retrieved["keys"])
+
+        asyncio.run(run())
+
+
+class TestWorkerPool(unittest.TestCase):
+    def test_command_matches_in_worker(self) -> None:
+        """Ensure text commands that match names in the worker pool still change state on the loop"""
+        import asyncio
+        import concurrent.futures
+        from unittest import mock
+
+        from MultiServer import ClientMessageProcessor, get_received_items, process_client_cmd
+        from Utils import get_fuzzy_index
+
+        class FakeClient:
+            auth = True
+            team = 0
+            slot = 1
+
+        async def run() -> None:
+            with mock.patch.object(Context, "_load_game_data"):
+                ctx = Context("", 0, "", "", 0, 0, True)
+            ctx.games = {1: "Game"}
+            ctx.gamespackage = {"Game": {"item_name_to_id": {"Lamp": 1, "Hammer": 2}}}
+            ctx.item_name_indexes = {"Game": get_fuzzy_index(frozenset(ctx.gamespackage["Game"]["item_name_to_id"]))}
+            ctx.player_names = {(0, 1): "Player1"}
+            client = FakeClient()
+            client.messageprocessor = ClientMessageProcessor(ctx, client)
+            outputs = []
+            client.messageprocessor.output = outputs.append
+            with concurrent.futures.ProcessPoolExecutor(1) as ctx.worker_pool:
+                self.assertEqual(("Lamp", True, "Perfect Match"),
+                                 await ctx.get_intended_text("lamp", ["Lamp", "Hammer"]))
+                await process_client_cmd(ctx, client, {"cmd": "Say", "text": "!getitem Hammer"})
+                await process_client_cmd(ctx, client, {"cmd": "Say", "text": "!getitem Anvil"})
+            self.assertEqual([2], [item.item for item in get_received_items(ctx, 0, 1, True)])
+            self.assertEqual(1, len(outputs), "the unmatched item should have been reported")
+
+        asyncio.run(run())
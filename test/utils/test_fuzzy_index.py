@@ -0,0 +1,46 @@
+# Tests for FuzzyIndex in Utils.py
+
+import pickle
+import unittest
+
+from Utils import FuzzyIndex, get_fuzzy_index, get_fuzzy_results, get_intended_text
+
+
+class TestFuzzyIndex(unittest.TestCase):
+    """This tests that FuzzyIndex finds the same results as comparing the input to every name"""
+    names = frozenset({"Progressive Sword", "Progressive Shield", "Bow", "Silver Arrows", "Hookshot", "Lamp",
+                       "lamp", "Magic Mirror", "Moon Pearl", "Bottle", "Bottle (Red Potion)", "İstanbul Key",
+                       "Small Key (Tower of Hera)", "Big Key (Tower of Hera)", "Piece of Heart"})
+    inputs = ("Progressive Sword", "progressive sword", "Progresive Swrod", "bow", "bo", "Lamp", "LAMP", "lmap",
+              "Key", "small key hera", "Bottle", "botle red potion", "istanbul key", "i̇stanbul key", "", "x" * 40)
+
+    def test_same_scores(self) -> None:
+        index = FuzzyIndex(self.names)
+        for input_text in self.inputs:
+            for limit in (1, 2, 5):
+                with self.subTest(input_text=input_text, limit=limit):
+                    expected = get_fuzzy_results(input_text, self.names, limit)
+                    results = index.get_fuzzy_results(input_text, limit)
+                    # names with the same score can be in any order
+                    self.assertEqual([score for _, score in expected], [score for _, score in results])
+                    for name, score in results:
+                        self.assertIn((name, score), get_fuzzy_results(input_text, self.names))
+
+    def test_same_intended_text(self) -> None:
+        index = FuzzyIndex(self.names)
+        for input_text in self.inputs:
+            with self.subTest(input_text=input_text):
+                name, usable, response = get_intended_text(input_text, index)
+                expected_name, expected_usable, expected_response = get_intended_text(input_text, self.names)
+                self.assertEqual(expected_usable, usable)
+                if expected_name != name:
+                    self.assertEqual(expected_response.replace(expected_name, name), response)
+                else:
+                    self.assertEqual(expected_response, response)
+        self.assertEqual(("Bow", True, "Only Option Match"),
+                         get_intended_text("bow", FuzzyIndex(frozenset({"Bow"}))))
+
+    def test_shared(self) -> None:
+        index = get_fuzzy_index(self.names)
+        self.assertIs(index, get_fuzzy_index(frozenset(self.names)))
+        self.assertIs(index, pickle.loads(pickle.dumps(index)))
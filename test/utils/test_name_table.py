@@ -0,0 +1,55 @@
+# Tests for NameTable in Utils.py
+
+import os
+import pickle
+import tempfile
+import unittest
+
+from Utils import NameTable, share_name_tables
+
+
+class TestNameTable(unittest.TestCase):
+    names = {1: "Bow", -1: "Cheat Console", 2 ** 53: "Big", 7: "İstanbul Key 😀", 3: ""}
+
+    def test_lookup(self) -> None:
+        table = NameTable.build(self.names, "Unknown item (ID:{})")
+        self.assertEqual(self.names, dict(table.items()))
+        self.assertEqual(sorted(self.names), list(table))
+        for name_id, name in self.names.items():
+            self.assertIn(name_id, table)
+            self.assertEqual(name, table[name_id])
+        for unknown_id in (0, 2, 8, -2, 2 ** 64, "Bow"):
+            self.assertNotIn(unknown_id, table)
+            self.assertEqual(f"Unknown item (ID:{unknown_id})", table[unknown_id])
+            self.assertIsNone(table.get(unknown_id))
+        self.assertNotIn(0, table, "looking up an unknown id should not add it")
+        self.assertEqual(0, len(NameTable.build({}, "{}")))
+
+    def test_shared(self) -> None:
+        # the file stays mapped, which prevents deleting it on Windows
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as folder:
+            tables = {"items": NameTable.build(self.names, "Unknown item (ID:{})"),
+                      "empty": NameTable.build({}, "Unknown location (ID:{})"),
+                      "locations": NameTable.build({5: "Link's House"}, "Unknown location (ID:{})")}
+            shared = share_name_tables(tables, folder)
+            self.assertEqual(shared, share_name_tables(tables, folder))
+            for key, table in tables.items():
+                with self.subTest(key=key):
+                    self.assertEqual(dict(table.items()), dict(shared[key].items()))
+                    self.assertEqual(table[8], shared[key][8])
+                    copy = pickle.loads(pickle.dumps(shared[key]))
+                    self.assertEqual(dict(table.items()), dict(copy.items()))
+            self.assertNotIn(b"Bow", pickle.dumps(shared["items"]), "other processes should map the file instead")
+
+    def test_shared_pruning(self) -> None:
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as folder:
+            # not mapped, which would prevent deleting it on Windows
+            outdated = os.path.join(folder, "names_outdated.bin")
+            with open(outdated, "wb"):
+                pass
+            os.utime(outdated, (0, 0))
+            current = share_name_tables({"items": NameTable.build(self.names, "{}")}, folder)["items"]._source[0]
+            self.assertFalse(os.path.exists(outdated), "files that were not shared for a while should be deleted")
+            os.utime(current, (0, 0))
+            share_name_tables({"items": NameTable.build(self.names, "{}")}, folder)
+            self.assertTrue(os.path.exists(current), "files that are shared again should be kept")
@@ -0,0 +1,50 @@
+import tempfile
+import threading
+import unittest
+
+from WebHostLib.notifications import FileNotifier
+
+
+class TestFileNotifier(unittest.TestCase):
+    def test_wait(self) -> None:
+        """Verify that waiters wake up on notifications of their channel, from this and other notifiers"""
+        with tempfile.TemporaryDirectory() as folder:
+            notifier = FileNotifier(folder)
+            version = notifier.get_version("rooms")
+            self.assertFalse(notifier.wait("rooms", version, 0.2))
+            FileNotifier(folder).notify("generations")
+            self.assertFalse(notifier.wait("rooms", version, 0.3))
+            FileNotifier(folder).notify("rooms")
+            self.assertTrue(notifier.wait("rooms", version, 5))
+            self.assertNotEqual(version, notifier.get_version("rooms"))
+
+            version = notifier.get_version("rooms")
+            notifier.notify("rooms")
+            self.assertTrue(notifier.wait("rooms", version, 5))
+
+    def test_wake_up(self) -> None:
+        """Verify that wake_up ends waits without a notification"""
+        with tempfile.TemporaryDirectory() as folder:
+            notifier = FileNotifier(folder)
+            version = notifier.get_version("rooms")
+            threading.Timer(0.1, notifier.wake_up).start()
+            self.assertFalse(notifier.wait("rooms", version, 60))
+
+    def test_room_channels(self) -> None:
+        """Verify that a room's channel isn't notified by other rooms and that stopping to listen removes its file"""
+        import os
+        from uuid import uuid4
+        from WebHostLib.notifications import COMMANDS, room_channel
+
+        with tempfile.TemporaryDirectory() as folder:
+            notifier = FileNotifier(folder)
+            channel = room_channel(COMMANDS, uuid4())
+            version = notifier.get_version(channel)
+            notifier.notify(room_channel(COMMANDS, uuid4()))
+            self.assertFalse(notifier.wait(channel, version, 0.3))
+            notifier.notify(channel)
+            self.assertTrue(notifier.wait(channel, version, 5))
+
+            notifier.stop_listening(channel)
+            self.assertNotIn(channel, notifier.channels)
+            self.assertFalse(os.path.exists(os.path.join(folder, channel)))
@@ -93,3 +93,135 @@ class TestTracker(TestBase):
                 headers={"If-Modified-Since": "Wed, 21 Oct 2015 07:28:00"},  # missing timezone
             )
             self.assertEqual(response.status_code, 400)
+
+    def test_decoded_data_cached(self) -> None:
+        """
+        Verify that trackers share decoded data, and load the save again when the room saved
+        """
+        import datetime
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+        from WebHostLib.tracker import TrackerData
+
+        with db_session:
+            room = Room.get(id=self.room_id)
+            room.multisave = pickle.dumps({"location_checks": {(0, 1): {1}}})
+            first = TrackerData(room)
+        with db_session:
+            room = Room.get(id=self.room_id)
+            second = TrackerData(room)
+            self.assertIs(first._multidata, second._multidata)
+            self.assertIs(first._multisave, second._multisave)
+            self.assertIs(first.item_id_to_name["Archipelago"], second.item_id_to_name["Archipelago"])
+            item_names = first.item_id_to_name["Archipelago"]
+            length = len(item_names)
+            self.assertEqual("Unknown Item (ID: -999)", item_names[-999])
+            self.assertEqual(length, len(item_names), "unknown ids must not be added to shared tables")
+
+            room.multisave = pickle.dumps({"location_checks": {(0, 1): {1, 2}}})
+            room.last_activity = room.last_activity + datetime.timedelta(seconds=1)
+            third = TrackerData(room)
+            self.assertIs(first._multidata, third._multidata)
+            self.assertEqual({1, 2}, third.get_player_checked_locations(0, 1))
+
+    def test_api_changes_since(self) -> None:
+        """
+        Verify that the tracker API returns only what changed since a version it returned, and 304 for the current one
+        """
+        import datetime
+        from pony.orm import db_session
+        from NetUtils import NetworkItem
+        from WebHostLib.models import Room
+
+        def set_save(save: dict, seconds: int) -> None:
+            with db_session:
+                room = Room.get(id=self.room_id)
+                room.multisave = pickle.dumps(save)
+                room.last_activity = datetime.datetime(2024, 1, 1, 0, 0, seconds)
+
+        set_save({"location_checks": {(0, 1): {1}}, "received_items": {(0, 1, True): [NetworkItem(1, 1, 1, 0)]}}, 1)
+        with self.app.app_context(), self.app.test_request_context():
+            url = url_for("api.tracker_info", tracker=self.tracker_uuid)
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, 200)
+            self.assertTrue(first.json["full"])
+            self.assertEqual([1], first.json["slots"][0]["checked_locations"])
+            self.assertEqual(304, self.client.get(url, headers={"If-None-Match": first.headers["ETag"]}).status_code)
+
+            set_save({"location_checks": {(0, 1): {1, 2}},
+                      "received_items": {(0, 1, True): [NetworkItem(1, 1, 1, 0), NetworkItem(2, 2, 1, 0)]}}, 2)
+            changes = self.client.get(url, query_string={"since": first.json["version"]})
+            self.assertEqual(changes.status_code, 200)
+            self.assertFalse(changes.json["full"])
+            slot = changes.json["slots"][0]
+            self.assertEqual([2], slot["checked_locations"])
+            self.assertEqual(1, slot["received_items_index"])
+            self.assertEqual([[2, 2, 1, 0]], slot["received_items"])
+            self.assertNotIn("hints", slot)
+            unchanged = self.client.get(url, query_string={"since": changes.json["version"]})
+            self.assertEqual([], unchanged.json["slots"])
+            self.assertTrue(self.client.get(url, query_string={"since": 1}).json["full"])
+            self.assertEqual(400, self.client.get(url, query_string={"since": "x"}).status_code)
+
+    def test_api_events(self) -> None:
+        """Verify that the event stream replays events after Last-Event-ID and relays new events of its room"""
+        from unittest import mock
+        from pony.orm import db_session
+        from WebHostLib.api import tracker
+        from WebHostLib.models import Room, RoomEvent
+
+        with db_session:
+            room = Room.get(id=self.room_id)
+            first = RoomEvent(room=room, data='[{"type": "checks"}]')
+            second = RoomEvent(room=room, data='[{"type": "saved"}]')
+        # don't poll in the background, relay is called below instead
+        with mock.patch.object(tracker._event_relay, "thread", True), \
+                mock.patch.dict(self.app.config, {"TRACKER_EVENT_STREAMS": 1}), \
+                self.app.app_context(), self.app.test_request_context():
+            url = url_for("api.tracker_events", tracker=self.tracker_uuid)
+            response = self.client.get(url, headers={"Last-Event-ID": str(first.id)}, buffered=False)
+            self.assertEqual(200, response.status_code)
+            self.assertEqual("text/event-stream", response.mimetype)
+            stream = response.iter_encoded()
+            self.assertEqual(f'id: {second.id}\ndata: [{{"type": "saved"}}]\n\n'.encode(), next(stream))
+
+            with db_session:
+                third = RoomEvent(room=Room.get(id=self.room_id), data='[{"type": "status"}]')
+            self.assertEqual(third.id, tracker._event_relay.relay(first.id))
+            self.assertEqual(f'id: {third.id}\ndata: [{{"type": "status"}}]\n\n'.encode(), next(stream))
+            self.assertEqual(503, self.client.get(url).status_code, "streams are limited by TRACKER_EVENT_STREAMS")
+            response.close()
+            self.assertNotIn(self.room_id, tracker._event_relay.listeners)
+            self.assertEqual(0, tracker._event_relay.streams)
+            self.assertEqual(404, self.client.get(url_for("api.tracker_events", tracker=uuid4())).status_code)
+
+        with self.app.app_context(), self.app.test_request_context():
+            self.assertEqual(404, self.client.get(url).status_code, "streams are disabled by default")
+
+    def test_cleanup_events(self) -> None:
+        """Verify that the autohost deletes only events older than their lifetime"""
+        from datetime import datetime
+        from pony.orm import db_session
+        from WebHostLib.autolauncher import EVENT_LIFETIME, cleanup_events
+        from WebHostLib.models import Room, RoomEvent
+
+        with db_session:
+            room = Room.get(id=self.room_id)
+            old = RoomEvent(room=room, data="[]", time=datetime.utcnow() - EVENT_LIFETIME * 2)
+            new = RoomEvent(room=room, data="[]")
+        cleanup_events()
+        with db_session:
+            self.assertFalse(RoomEvent.exists(id=old.id))
+            self.assertTrue(RoomEvent.exists(id=new.id))
+
+    def test_event_relay_stops(self) -> None:
+        """Verify that the event relay stops checking the database once no stream is open"""
+        from unittest import mock
+        from WebHostLib.api import tracker
+
+        relay = tracker._EventRelay()
+        relay.thread = mock.Mock()
+        with mock.patch.object(tracker.time, "sleep"), mock.patch.object(relay, "relay") as relay_events:
+            relay.run()
+        relay_events.assert_not_called()
+        self.assertIsNone(relay.thread)
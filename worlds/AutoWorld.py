@@ -11,7 +11,7 @@ from typing import (Any, Callable, ClassVar, Dict, FrozenSet, Iterable, List, Ma
                     TYPE_CHECKING, Type, Union)
 
 from Options import item_and_loc_options, ItemsAccessibility, OptionGroup, PerGameCommonOptions
-from BaseClasses import CollectionState
+from BaseClasses import CollectionState, ItemIndex
 
 if TYPE_CHECKING:
     from BaseClasses import MultiWorld, Item, Location, Tutorial, Region, Entrance
@@ -152,6 +152,8 @@ def _timed_call(method: Callable[..., Any], *args: Any,
     start = time.perf_counter()
     ret = method(*args)
     taken = time.perf_counter() - start
+    if multiworld and multiworld.profile:
+        multiworld.profile.add_call(method, taken, player)
     if taken > 1.0:
         if player and multiworld:
             perf_logger.info(f"Took {taken:.4f} seconds in {method.__qualname__} for player {player}, "
@@ -198,7 +200,7 @@ def call_stage(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
     for world_type in sorted(world_types, key=lambda world: world.__name__):
         stage_callable = getattr(world_type, f"stage_{method_name}", None)
         if stage_callable:
-            _timed_call(stage_callable, multiworld, *args)
+            _timed_call(stage_callable, multiworld, *args, multiworld=multiworld)
 
 
 class WebWorld(metaclass=WebWorldRegister):
@@ -303,6 +305,21 @@ class World(metaclass=AutoWorldRegister):
     If False, everything is rechecked at every step, which is slower computationally, 
     but may be desirable in complex/dynamic worlds."""
 
+    incremental_reachability: bool = False
+    """If True, CollectionState records which item names the access rule of each blocked Entrance reads and, after
+    collecting, only re-tests the blocked Entrances that depend on a changed item name. Sweeps likewise only re-test
+    unreachable Locations once an item name or Region their access rule read changed. Rules that read prog_items as a
+    whole, for example by iterating, are re-tested on every change instead. Requires explicit_indirect_conditions and
+    has no effect if this World overrides collect or remove, as those may change state other than prog_items.
+    Only enable this if Entrance and Location access rules read state solely through prog_items and reachability,
+    such as state.has, state.count, state.has_group or state.can_reach.
+    If False, all blocked Entrances are re-tested every time reachability is updated."""
+
+    indexed_item_counts: bool = False
+    """If True, CollectionState stores this player's prog_items as an array indexed through item_index, instead of a
+    Counter. Name based lookups such as state.has keep working, while state.has_index and the other index based
+    variants skip hashing the item name. Takes precedence over incremental_reachability."""
+
     multiworld: "MultiWorld"
     """autoset on creation. The MultiWorld object for the currently generating multiworld."""
     player: int
@@ -338,6 +355,12 @@ class World(metaclass=AutoWorldRegister):
         self.random = Random(multiworld.random.getrandbits(64))
         multiworld.per_slot_randoms[player] = self.random
 
+    @property
+    def item_index(self) -> ItemIndex:
+        """dense integer indices of item names, used for indexed_item_counts. Shared by the worlds of this game in
+        the multiworld."""
+        return self.multiworld.get_item_index(self.game)
+
     def __getattr__(self, item: str) -> Any:
         if item == "settings":
             return self.__class__.settings
@@ -0,0 +1,301 @@
+"""
+Declarative access rules, which are compiled into a single function per rule.
+
+Rules are immutable and hashable. Nested And/Or are flattened, identical sub rules are removed and identical rules,
+even across locations and players, share one compiled function. The compiled function evaluates the whole rule
+without calling into the rule objects, so it costs one Python frame, plus one for each Func and CanReachRegion.
+
+Example::
+
+    set_rule(location, Has("Hookshot", player) & (HasAny(("Bombs", "Bow"), player) | CanReachRegion("Cave", player)))
+"""
+import functools
+import types
+import typing
+import weakref
+
+if typing.TYPE_CHECKING:
+    import BaseClasses
+
+    CollectionRule = typing.Callable[[BaseClasses.CollectionState], bool]
+else:
+    CollectionRule = typing.Callable[[object], bool]
+
+__all__ = ("Rule", "Constant", "TRUE", "FALSE", "Has", "HasAll", "HasAny", "Count", "CanReachRegion", "Func",
+           "And", "Or", "as_rule")
+
+
+class Rule:
+    """Base class of declarative access rules. Combine rules with & and |, then pass them to set_rule or add_rule,
+    or call compile() directly."""
+    __slots__ = ("_hash",)
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        raise NotImplementedError
+
+    def _expression(self, constant: typing.Callable[[typing.Any], str]) -> str:
+        """Returns a Python expression evaluating this rule for `state`. constant returns a name for a value."""
+        raise NotImplementedError
+
+    def __eq__(self, other: object) -> bool:
+        return self is other or (type(self) is type(other) and self._key() == other._key())
+
+    def __hash__(self) -> int:
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash((type(self), self._key()))
+            return self._hash
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(map(repr, self._key()))})"
+
+    def __and__(self, other: "Rule") -> "Rule":
+        return And(self, other)
+
+    def __or__(self, other: "Rule") -> "Rule":
+        return Or(self, other)
+
+    def __call__(self, state: "BaseClasses.CollectionState") -> bool:
+        return self.compile()(state)
+
+    def compile(self) -> CollectionRule:
+        """Returns a function evaluating this rule. The function carries the rule as its `rule` attribute."""
+        compiled = _compiled_rules.get(self, None)
+        if compiled is None:
+            constants: typing.Dict[str, typing.Any] = {}
+
+            def constant(value: typing.Any) -> str:
+                name = f"_c{len(constants)}"
+                constants[name] = value
+                return name
+
+            code = _compile_expression(self._expression(constant))
+            compiled = types.FunctionType(code, constants, "rule")
+            compiled.rule = self
+            if self._shareable():
+                _compiled_rules[self] = compiled
+        return compiled
+
+    def _shareable(self) -> bool:
+        """Whether the compiled function may be shared through _compiled_rules, which keeps the rule itself alive."""
+        return True
+
+
+# identical rules share the compiled function, as long as any location or entrance uses it.
+# Rules wrapping functions are left out, as those functions commonly reference their World, which would keep the
+# World and its compiled rules alive through the key.
+_compiled_rules: "weakref.WeakValueDictionary[Rule, CollectionRule]" = weakref.WeakValueDictionary()
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_expression(expression: str) -> types.CodeType:
+    # constants are passed as globals of the function, so rules of the same shape share their code object
+    module = compile(f"def rule(state):\n    return {expression}", "<compiled rule>", "exec")
+    return next(const for const in module.co_consts if isinstance(const, types.CodeType))
+
+
+class Constant(Rule):
+    __slots__ = ("value",)
+
+    value: bool
+
+    def __init__(self, value: bool) -> None:
+        self.value = value
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.value,
+
+    def _expression(self, constant: typing.Callable[[typing.Any], str]) -> str:
+        return repr(self.value)
+
+
+TRUE = Constant(True)
+FALSE = Constant(False)
+
+
+class Has(Rule):
+    """Requires at least count of item for player, like state.has."""
+    __slots__ = ("item", "player", "count")
+
+    item: str
+    player: int
+    count: int
+
+    def __init__(self, item: str, player: int, count: int = 1) -> None:
+        self.item = item
+        self.player = player
+        self.count = count
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.item, self.player, self.count
+
+    def _expression(self, constant: typing.Callable[[typing.Any], str]) -> str:
+        return f"state.prog_items[{constant(self.player)}][{constant(self.item)}] >= {constant(self.count)}"
+
+
+class HasAll(Rule):
+    """Requires each of items for player, like state.has_all."""
+    __slots__ = ("items", "player")
+
+    items: typing.Tuple[str, ...]
+    player: int
+
+    def __init__(self, items: typing.Iterable[str], player: int) -> None:
+        self.items = tuple(dict.fromkeys(items))
+        self.player = player
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.items, self.player
+
+    def _expression(self, constant: typing.Callable[[typing.Any], str]) -> str:
+        if not self.items:
+            return "True"
+        player = constant(self.player)
+        return "(" + " and ".join(f"state.prog_items[{player}][{constant(item)}] >= 1" for item in self.items) + ")"
+
+
+class HasAny(Rule):
+    """Requires at least one of items for player, like state.has_any."""
+    __slots__ = ("items", "player")
+
+    items: typing.Tuple[str, ...]
+    player: int
+
+    def __init__(self, items: typing.Iterable[str], player: int) -> None:
+        self.items = tuple(dict.fromkeys(items))
+        self.player = player
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.items, self.player
+
+    def _expression(self, constant: typing.Callable[[typing.Any], str]) -> str:
+        if not self.items:
+            return "False"
+        player = constant(self.player)
+        return "(" + " or ".join(f"state.prog_items[{player}][{constant(item)}] >= 1" for item in self.items) + ")"
+
+
+class Count(Rule):
+    """Requires at least count items for player, summed over items, like state.has_from_list."""
+    __slots__ = ("items", "player", "count")
+
+    items: typing.Tuple[str, ...]
+    player: int
+    count: int
+
+    def __init__(self, items: typing.Iterable[str], player: int, count: int) -> None:
+        self.items = tuple(items)
+        self.player = player
+        self.count = count
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.items, self.player, self.count
+
+    def _expression(self, constant: typing.Callable[[typing.Any], str]) -> str:
+        if not self.items:
+            return f"0 >= {constant(self.count)}"
+        player = constant(self.player)
+        total = " + ".join(f"state.prog_items[{player}][{constant(item)}]" for item in self.items)
+        return f"({total}) >= {constant(self.count)}"
+
+
+class CanReachRegion(Rule):
+    """Requires the region of player to be reachable, like state.can_reach_region.
+    Remember to register an indirect condition if this is used for an Entrance."""
+    __slots__ = ("region", "player")
+
+    region: str
+    player: int
+
+    def __init__(self, region: str, player: int) -> None:
+        self.region = region
+        self.player = player
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.region, self.player
+
+    def _expression(self, constant: typing.Callable[[typing.Any], str]) -> str:
+        return f"state.can_reach_region({constant(self.region)}, {constant(self.player)})"
+
+
+class Func(Rule):
+    """Wraps an arbitrary access rule function, so it can be combined with other rules."""
+    __slots__ = ("function",)
+
+    function: CollectionRule
+
+    def __init__(self, function: CollectionRule) -> None:
+        self.function = function
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.function,
+
+    def _expression(self, constant: typing.Callable[[typing.Any], str]) -> str:
+        return f"{constant(self.function)}(state)"
+
+    def _shareable(self) -> bool:
+        return False
+
+
+class _Aggregate(Rule):
+    """Base of And and Or. Constructing one flattens nested rules of the same type, removes duplicates and
+    folds constants, so it may return a different rule, such as the only remaining sub rule."""
+    __slots__ = ("rules",)
+
+    rules: typing.Tuple[Rule, ...]
+    identity: typing.ClassVar[Constant]
+    absorbing: typing.ClassVar[Constant]
+    operator: typing.ClassVar[str]
+
+    def __new__(cls, *rules: Rule) -> Rule:
+        flattened: typing.Dict[Rule, None] = {}
+        for rule in rules:
+            if type(rule) is cls:
+                flattened.update(dict.fromkeys(rule.rules))
+            elif rule == cls.absorbing:
+                return cls.absorbing
+            elif rule != cls.identity:
+                flattened[rule] = None
+        if not flattened:
+            return cls.identity
+        if len(flattened) == 1:
+            return next(iter(flattened))
+        aggregate = super().__new__(cls)
+        aggregate.rules = tuple(flattened)
+        return aggregate
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.rules
+
+    def _expression(self, constant: typing.Callable[[typing.Any], str]) -> str:
+        return "(" + f" {self.operator} ".join(rule._expression(constant) for rule in self.rules) + ")"
+
+    def _shareable(self) -> bool:
+        return all(rule._shareable() for rule in self.rules)
+
+
+class And(_Aggregate):
+    """Requires all rules, evaluated in order."""
+    __slots__ = ()
+    identity = TRUE
+    absorbing = FALSE
+    operator = "and"
+
+
+class Or(_Aggregate):
+    """Requires at least one of rules, evaluated in order."""
+    __slots__ = ()
+    identity = FALSE
+    absorbing = TRUE
+    operator = "or"
+
+
+def as_rule(rule: typing.Union[Rule, CollectionRule]) -> Rule:
+    """Returns rule as a Rule, unwrapping compiled rules and wrapping any other function in Func."""
+    if isinstance(rule, Rule):
+        return rule
+    compiled_rule = getattr(rule, "rule", None)
+    if isinstance(compiled_rule, Rule):
+        return compiled_rule
+    return Func(rule)
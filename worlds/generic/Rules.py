@@ -3,9 +3,11 @@ import logging
 import typing
 
 from BaseClasses import LocationProgressType, MultiWorld, Location, Region, Entrance
+from .CompiledRules import And, Or, Rule, as_rule
 
 if typing.TYPE_CHECKING:
     import BaseClasses
+    from worlds.AutoWorld import World
 
     CollectionRule = typing.Callable[[BaseClasses.CollectionState], bool]
     ItemRule = typing.Callable[[BaseClasses.Item], bool]
@@ -96,20 +98,54 @@ def exclusion_rules(multiworld: MultiWorld, player: int, exclude_locations: typi
                 logging.warning(f"Unable to exclude location {loc_name} in player {player}'s world.")
 
 
-def set_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"], rule: CollectionRule):
-    spot.access_rule = rule
+def set_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"],
+             rule: typing.Union[CollectionRule, Rule]):
+    spot.access_rule = rule.compile() if isinstance(rule, Rule) else rule
 
 
-def add_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"], rule: CollectionRule, combine="and"):
+def add_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"],
+             rule: typing.Union[CollectionRule, Rule], combine="and"):
     old_rule = spot.access_rule
     # empty rule, replace instead of add
     if old_rule is Location.access_rule or old_rule is Entrance.access_rule:
-        spot.access_rule = rule if combine == "and" else old_rule
+        if combine == "and":
+            set_rule(spot, rule)
     else:
+        # merged into one flat compiled rule, instead of nesting another layer of closures
         if combine == "and":
-            spot.access_rule = lambda state: rule(state) and old_rule(state)
+            spot.access_rule = And(as_rule(rule), as_rule(old_rule)).compile()
         else:
-            spot.access_rule = lambda state: rule(state) or old_rule(state)
+            spot.access_rule = Or(as_rule(rule), as_rule(old_rule)).compile()
+
+
+def has_rule(world: "World", item: str, count: int = 1) -> CollectionRule:
+    """Creates a rule requiring count of item for world's player.
+    If world uses indexed_item_counts, the item index is looked up once here instead of on every call."""
+    player = world.player
+    if world.indexed_item_counts:
+        item_index = world.item_index.get(item)
+        return lambda state: state.has_index(item_index, player, count)
+    return lambda state: state.has(item, player, count)
+
+
+def has_all_rule(world: "World", items: typing.Iterable[str]) -> CollectionRule:
+    """Creates a rule requiring each of items for world's player, see has_rule."""
+    player = world.player
+    if world.indexed_item_counts:
+        item_indices = tuple(world.item_index.get(item) for item in items)
+        return lambda state: state.has_all_indices(item_indices, player)
+    items = tuple(items)
+    return lambda state: state.has_all(items, player)
+
+
+def has_any_rule(world: "World", items: typing.Iterable[str]) -> CollectionRule:
+    """Creates a rule requiring at least one of items for world's player, see has_rule."""
+    player = world.player
+    if world.indexed_item_counts:
+        item_indices = tuple(world.item_index.get(item) for item in items)
+        return lambda state: state.has_any_index(item_indices, player)
+    items = tuple(items)
+    return lambda state: state.has_any(items, player)
 
 
 def forbid_item(location: "BaseClasses.Location", item: str, player: int):